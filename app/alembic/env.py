@@ -7,7 +7,7 @@ sys.path.insert(0, BASE_DIR)
 from logging.config import fileConfig
 import pkgutil, importlib
 from alembic import context
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import engine_from_config, pool, text
 from app.common.base.base_model import Base
 from pathlib import Path
 import app.modules as modules_root
@@ -133,9 +133,24 @@ def run_migrations_online():
         poolclass=pool.NullPool,
     )
 
+    # set by `nova migrate up` (cli/migrations.py) for per-tenant runs
+    schema = config.attributes.get("tenant_schema")
+    lock_timeout = config.attributes.get("lock_timeout")
+
     with connectable.connect() as connection:
+        if schema:
+            # unqualified names in migrations resolve to the tenant's schema
+            connection.execute(text(f'SET search_path TO "{schema}", public'))
+        if lock_timeout:
+            # fail fast instead of queueing behind live traffic (and blocking it)
+            connection.execute(text(f"SET lock_timeout = '{lock_timeout}'"))
+        connection.commit()
+
         context.configure(
-            connection=connection, target_metadata=target_metadata, compare_type=True
+            connection=connection,
+            target_metadata=target_metadata,
+            compare_type=True,
+            version_table_schema=schema,
         )
 
         with context.begin_transaction():
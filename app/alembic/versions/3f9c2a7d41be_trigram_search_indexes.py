@@ -0,0 +1,52 @@
+"""trigram search indexes
+
+Revision ID: 3f9c2a7d41be
+Revises: fc8e49325d82
+Create Date: 2026-10-19 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.common.db.online_migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d41be'
+down_revision = 'fc8e49325d82'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, column) — GIN gin_trgm_ops so ILIKE '%term%' can use an index
+TRIGRAM_INDEXES = [
+    ('ix_users_username_trgm', 'users', 'username'),
+    ('ix_profiles_email_address_trgm', 'profiles', 'email_address'),
+    ('ix_profiles_first_name_trgm', 'profiles', 'first_name'),
+    ('ix_profiles_last_name_trgm', 'profiles', 'last_name'),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # CONCURRENTLY: users/profiles stay writable while the GIN indexes build
+    for name, table, column in TRIGRAM_INDEXES:
+        create_index_concurrently(
+            name,
+            table,
+            [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for name, table, _ in TRIGRAM_INDEXES:
+        drop_index_concurrently(name, table)
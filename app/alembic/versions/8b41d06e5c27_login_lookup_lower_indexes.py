@@ -0,0 +1,34 @@
+"""login lookup lower() indexes
+
+Revision ID: 8b41d06e5c27
+Revises: 3f9c2a7d41be
+Create Date: 2026-10-19 11:02:17.503391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.common.db.online_migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision = '8b41d06e5c27'
+down_revision = '3f9c2a7d41be'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Functional index so lower(username) = lower(:identifier) is an index seek,
+    # built concurrently and already in its final live-rows-only form.
+    # Not unique: existing rows may already differ only by case.
+    # The profiles email index needs the boolean is_deleted of d2b7e4c19a60
+    # for the same predicate, so it is built there, once.
+    create_index_concurrently(
+        'ix_users_username_lower_active', 'users', [sa.text('lower(username)')],
+        postgresql_where=sa.text('is_deleted = false'),
+    )
+
+
+def downgrade():
+    drop_index_concurrently('ix_users_username_lower_active', 'users')
@@ -0,0 +1,36 @@
+"""system settings version_id (optimistic concurrency)
+
+Revision ID: c5e0a93b7f12
+Revises: 8b41d06e5c27
+Create Date: 2026-10-19 14:36:52.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e0a93b7f12'
+down_revision = '8b41d06e5c27'
+branch_labels = None
+depends_on = None
+
+# 65704911fc4c creates "system_settings" while the model maps "system_settings1";
+# version whichever of the two exists.
+TABLES = ('system_settings', 'system_settings1')
+
+
+def _existing_tables():
+    existing = sa.inspect(op.get_bind()).get_table_names()
+    return [table for table in TABLES if table in existing]
+
+
+def upgrade():
+    for table in _existing_tables():
+        # server_default backfills existing rows with version 1
+        op.add_column(table, sa.Column('version_id', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    for table in _existing_tables():
+        op.drop_column(table, 'version_id')
@@ -0,0 +1,93 @@
+"""soft delete: boolean profiles.is_deleted, partial indexes on live rows
+
+Revision ID: d2b7e4c19a60
+Revises: c5e0a93b7f12
+Create Date: 2026-10-19 16:12:40.331907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.common.db.online_migrations import backfill, create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2b7e4c19a60'
+down_revision = 'c5e0a93b7f12'
+branch_labels = None
+depends_on = None
+
+SETTINGS_TABLES = ('system_settings', 'system_settings1')
+
+LIVE = sa.text('is_deleted = false')
+
+
+def _settings_tables():
+    existing = sa.inspect(op.get_bind()).get_table_names()
+    return [table for table in SETTINGS_TABLES if table in existing]
+
+
+def _retype_profiles_flag(new_type: str, default: str, convert: str):
+    """
+    profiles.is_deleted -> new_type without ALTER COLUMN TYPE (a rewrite under
+    ACCESS EXCLUSIVE): a shadow column kept in sync by a trigger, backfilled
+    in batches, then swapped in with catalog-only DROP / RENAME.
+    `convert` computes the new value from the old one, named `{col}`.
+    """
+    op.execute(f"ALTER TABLE profiles ADD COLUMN is_deleted_new {new_type} NOT NULL DEFAULT {default}")
+    op.execute(f"""
+        CREATE FUNCTION profiles_is_deleted_sync() RETURNS trigger AS $$
+        BEGIN
+            NEW.is_deleted_new := {convert.format(col='NEW.is_deleted')};
+            RETURN NEW;
+        END $$ LANGUAGE plpgsql
+    """)
+    op.execute(
+        "CREATE TRIGGER profiles_is_deleted_sync BEFORE INSERT OR UPDATE ON profiles "
+        "FOR EACH ROW EXECUTE FUNCTION profiles_is_deleted_sync()"
+    )
+
+    # rows written from here on are synced by the trigger
+    value = convert.format(col='is_deleted')
+    backfill('profiles', f"is_deleted_new = {value}", f"is_deleted_new IS DISTINCT FROM ({value})", pk='id')
+
+    op.execute("DROP TRIGGER profiles_is_deleted_sync ON profiles")
+    op.execute("DROP FUNCTION profiles_is_deleted_sync()")
+    op.execute("ALTER TABLE profiles DROP COLUMN is_deleted")
+    op.execute("ALTER TABLE profiles RENAME COLUMN is_deleted_new TO is_deleted")
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # profiles was the only table with an int flag; the global criteria
+    # compare against a boolean literal
+    _retype_profiles_flag('boolean', 'false', '{col} <> 0')
+
+    for table in _settings_tables():
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN is_deleted SET DEFAULT false")
+
+    # Login lookups only ever want live rows: index just those. The users
+    # one is built by 8b41d06e5c27.
+    create_index_concurrently(
+        'ix_profiles_email_address_lower_active', 'profiles', [sa.text('lower(email_address)')],
+        postgresql_where=LIVE,
+    )
+
+    for table in _settings_tables():
+        create_index_concurrently(f'ix_{table}_category_active', table, ['category'], postgresql_where=LIVE)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table in _settings_tables():
+        drop_index_concurrently(f'ix_{table}_category_active', table)
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN is_deleted DROP DEFAULT")
+
+    # the users index belongs to 8b41d06e5c27; the profiles one goes with the boolean flag
+    drop_index_concurrently('ix_profiles_email_address_lower_active', 'profiles')
+
+    _retype_profiles_flag('integer', '0', '{col}::int')
@@ -0,0 +1,67 @@
+"""monthly partitions for append-only IAM tables
+
+Revision ID: e7a3f1c86b24
+Revises: d2b7e4c19a60
+Create Date: 2026-10-19 17:40:08.926113
+
+"""
+from alembic import op
+
+from app.common.db.online_migrations import partition_table_online
+from app.common.db.partitioning import unpartition_table
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3f1c86b24'
+down_revision = 'd2b7e4c19a60'
+branch_labels = None
+depends_on = None
+
+CASCADE = "ON DELETE CASCADE ON UPDATE CASCADE"
+USER_FK = f"FOREIGN KEY (user_id) REFERENCES users (user_id) {CASCADE}"
+
+# table -> (serial pk, foreign keys, indexes {name: columns})
+TABLES = {
+    'refresh_tokens': ('token_id', [USER_FK], {
+        'ix_refresh_tokens_user_id': ['user_id'],
+        # a unique constraint must include the partition key, so token
+        # uniqueness is now per (token, created_at); tokens are random,
+        # lookups use the plain index
+        'ix_refresh_tokens_token': ['token'],
+    }),
+    'one_time_passwords': ('otp_id', [USER_FK], {
+        'ix_one_time_passwords_user_id': ['user_id'],
+    }),
+    'password_history': ('id', [USER_FK], {
+        'ix_password_history_user_id': ['user_id'],
+    }),
+    'login_attempt': ('attempt_id', ["FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE SET NULL"], {
+        'idx_login_attempt_user_id': ['user_id'],
+        'idx_login_attempt_ip_address': ['ip_address'],
+    }),
+    'access_log': ('access_id', [USER_FK], {}),
+}
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # in place: the old rows stay where they are, as one partition
+    for table, (pk, foreign_keys, indexes) in TABLES.items():
+        partition_table_online(table, pk, foreign_keys=foreign_keys, indexes=indexes)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    conn = op.get_bind()
+    for table, (pk, foreign_keys, indexes) in TABLES.items():
+        ddl = [f"ALTER TABLE {table} ADD {definition}" for definition in foreign_keys]
+        if table == 'login_attempt':
+            # the only table that had indexes before
+            ddl += [f"CREATE INDEX {name} ON {table} ({', '.join(columns)})" for name, columns in indexes.items()]
+        if table == 'refresh_tokens':
+            ddl.append("ALTER TABLE refresh_tokens ADD CONSTRAINT refresh_tokens_token_key UNIQUE (token)")
+        unpartition_table(conn, table, pk, ddl=ddl)
@@ -0,0 +1,27 @@
+"""last_used_at / last_login_at touch columns
+
+Revision ID: f4c8d2a91e37
+Revises: e7a3f1c86b24
+Create Date: 2026-10-19 18:25:51.604712
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4c8d2a91e37'
+down_revision = 'e7a3f1c86b24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # nullable, no default: metadata-only change, no table rewrite
+    op.add_column('refresh_tokens', sa.Column('last_used_at', sa.Integer(), nullable=True))
+    op.add_column('users', sa.Column('last_login_at', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('users', 'last_login_at')
+    op.drop_column('refresh_tokens', 'last_used_at')
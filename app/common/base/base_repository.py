@@ -1,5 +1,12 @@
+from typing import List, Optional
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import false, func, insert, inspect, select, update
+
+from app.common.db.jsonb import apply_patch, contains, document_contains, jsonb_set
+from app.common.db.loader import pk_loader
+from app.common.db.mixins.soft_delete import has_global_criteria
+from app.core.cache.model_cache import model_cache
 
 
 class BaseRepository:
@@ -13,18 +20,31 @@ class BaseRepository:
     # -------------------------
 
     async def get(self, id):
-        stmt = select(self.model).where(self.model.id == id)
-        result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        async def fetch():
+            stmt = select(self.model).where(self.model.id == id)
+            result = await self.session.execute(stmt)
+            return result.scalar_one_or_none()
+
+        # read-through second-level cache (no-op unless the model opted in)
+        return await model_cache.get(self.session, self.model, id, loader=fetch)
 
     async def get_active(self, id):
-        """Soft delete aware"""
-        stmt = select(self.model).where(
-            self.model.id == id,
-            getattr(self.model, "is_deleted", False) == False
-        )
-        result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        """
+        Soft delete aware. Selects on soft-delete models already carry the
+        global `is_deleted = false` criteria (db/mixins/soft_delete.py); the
+        check below covers instances served from the cache or identity map.
+        """
+        instance = await self.get(id)
+        if instance is not None and getattr(instance, "is_deleted", False):
+            return None
+        return instance
+
+    async def load(self, id):
+        """Batched get(): concurrent calls in one tick share a single IN query"""
+        return await pk_loader(self.session, self.model).load(id)
+
+    async def load_many(self, ids: list):
+        return await pk_loader(self.session, self.model).load_many(ids)
 
     async def list(self, filters=None):
         stmt = select(self.model)
@@ -34,7 +54,11 @@ class BaseRepository:
         return result.scalars().all()
 
     async def list_active(self, filters=None):
-        stmt = select(self.model).where(self.model.is_deleted == False)
+        stmt = select(self.model)
+        # registered models get is_deleted = false from the global soft-delete
+        # criteria; any other model with the column needs it spelled out
+        if not has_global_criteria(self.model) and "is_deleted" in inspect(self.model).columns:
+            stmt = stmt.where(self.model.is_deleted == false())
         if filters:
             stmt = stmt.filter_by(**filters)
         result = await self.session.execute(stmt)
@@ -56,3 +80,157 @@ class BaseRepository:
         for key, value in data.items():
             setattr(instance, key, value)
         return instance
+
+    # -------------------------
+    # BULK / SET-BASED (no commit)
+    # One statement per call, returning affected row counts
+    # -------------------------
+
+    def _pk(self):
+        mapper = inspect(self.model)
+        return getattr(self.model, mapper.get_property_by_column(mapper.primary_key[0]).key)
+
+    def _bumped(self, values: dict) -> dict:
+        """`values` plus the version bump of versioned models, so If-Match sees set-based writes"""
+        version = inspect(self.model).version_id_col
+        if version is not None and version.key not in values:
+            values = {**values, version.key: version + 1}
+        return values
+
+    def _dialect_insert(self):
+        dialect = self.session.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            raise NotImplementedError(f"bulk_upsert is not supported on {dialect}")
+        return dialect_insert
+
+    async def bulk_insert(self, rows: List[dict]) -> int:
+        if not rows:
+            return 0
+        await self.session.execute(insert(self.model), rows)
+        return len(rows)
+
+    async def bulk_upsert(
+        self,
+        rows: List[dict],
+        conflict_columns: Optional[List[str]] = None,
+        update_columns: Optional[List[str]] = None,
+    ) -> int:
+        """
+        INSERT ... ON CONFLICT (conflict_columns) DO UPDATE SET update_columns.
+        Defaults: conflict on the primary key, update every other supplied column.
+        """
+        if not rows:
+            return 0
+
+        table = self.model.__table__
+        conflict_columns = conflict_columns or [c.name for c in table.primary_key.columns]
+        if update_columns is None:
+            update_columns = [k for k in rows[0] if k not in conflict_columns]
+            if "updated_at" in table.c and "updated_at" not in update_columns:
+                update_columns.append("updated_at")
+
+        stmt = self._dialect_insert()(table).values(rows)
+        if update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=conflict_columns,
+                set_=self._bumped({c: stmt.excluded[c] for c in update_columns}),
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=conflict_columns)
+
+        result = await self.session.execute(stmt)
+
+        pk_name = self._pk().key
+        model_cache.mark_dirty(self.session, self.model, *[r[pk_name] for r in rows if pk_name in r])
+        return result.rowcount
+
+    async def bulk_update(self, ids: list, values: dict) -> int:
+        """
+        UPDATE ... SET values WHERE pk IN (ids). updated_at gets its onupdate
+        value and versioned models their version bump, as with ORM updates.
+        """
+        if not ids or not values:
+            return 0
+        stmt = update(self.model).where(self._pk().in_(ids)).values(**self._bumped(values))
+        result = await self.session.execute(stmt)
+        model_cache.mark_dirty(self.session, self.model, *ids)
+        return result.rowcount
+
+    async def bulk_soft_delete(self, *criteria, **filters) -> int:
+        """
+        Soft delete every live row matching the criteria / filter_by kwargs.
+        """
+        if not hasattr(self.model, "is_deleted"):
+            raise NotImplementedError(f"{self.model.__name__} does not support soft delete")
+
+        # Some tables still store is_deleted as an int flag
+        is_bool = self.model.is_deleted.type.python_type is bool
+        values = {"is_deleted": True if is_bool else 1}
+        if hasattr(self.model, "deleted_at"):
+            values["deleted_at"] = func.now()
+
+        stmt = (
+            update(self.model)
+            .where(self.model.is_deleted == (False if is_bool else 0), *criteria)
+            .filter_by(**filters)
+            .values(**self._bumped(values))
+        )
+
+        if model_cache.is_cached(self.model):
+            # RETURNING the keys so the second-level cache can drop them
+            result = await self.session.execute(stmt.returning(self._pk()))
+            ids = result.scalars().all()
+            model_cache.mark_dirty(self.session, self.model, *ids)
+            return len(ids)
+
+        result = await self.session.execute(stmt)
+        return result.rowcount
+
+    # -------------------------
+    # JSON DOCUMENTS (db/jsonb.py)
+    # -------------------------
+
+    async def find_containing(self, field: str, document: dict):
+        """
+        Rows whose JSON `field` contains `document` (@>, GIN-indexed).
+        Other dialects load every row and filter in Python: tests and tiny tables only.
+        """
+        column = getattr(self.model, field)
+
+        if self.session.get_bind().dialect.name != "postgresql":
+            result = await self.session.execute(select(self.model))
+            return [row for row in result.scalars().all() if document_contains(getattr(row, field), document)]
+
+        stmt = select(self.model).where(contains(column, document))
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    async def patch_json(self, id, field: str, changes: dict):
+        """
+        Set {"path.to.key": value, ...} inside a JSON column with one UPDATE
+        (jsonb_set), without loading or rewriting the rest of the document.
+        Returns the new document, or None when the row does not exist.
+        """
+        column = getattr(self.model, field)
+
+        if self.session.get_bind().dialect.name != "postgresql":
+            instance = await self.get(id)
+            if instance is None:
+                return None
+            setattr(instance, field, apply_patch(getattr(instance, field), changes))
+            return getattr(instance, field)
+
+        stmt = (
+            update(self.model)
+            .where(self._pk() == id)
+            .values(self._bumped({field: jsonb_set(column, changes)}))
+            .returning(column)
+        )
+        result = await self.session.execute(stmt)
+        document = result.scalar_one_or_none()
+        model_cache.mark_dirty(self.session, self.model, id)
+        return document
@@ -1,7 +1,11 @@
 from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.common.etag import version_etag
+from app.common.exceptions import ConflictError
+
 
 class BaseService:
     repo = None   # Child MUST override: repo = UserRepository
@@ -19,6 +23,10 @@ class BaseService:
         except IntegrityError as e:
             await self.session.rollback()
             raise HTTPException(400, detail=str(e))
+        except StaleDataError:
+            # VersionedMixin: another writer committed first
+            await self.session.rollback()
+            raise ConflictError()
 
     # -----------------------------------------------------
     # CRUD USING REPOSITORY
@@ -29,11 +37,18 @@ class BaseService:
         await self.commit()
         return instance
 
-    async def update(self, id, data: dict):
+    async def update(self, id, data: dict, expected_version: int | None = None):
+        """
+        expected_version: the version the client edited (If-Match), for
+        VersionedMixin models. A mismatch is a 409 before anything is written.
+        """
         instance = await self.repository.get(id)
         if not instance:
             raise HTTPException(404, f"{self.repository.model.__name__} not found")
 
+        if expected_version is not None and instance.version_id != expected_version:
+            raise ConflictError(etag=version_etag(instance.version_id))
+
         await self.repository.update(instance, data)
         await self.commit()
         return instance
@@ -66,6 +81,38 @@ class BaseService:
         await self.commit()
         return True
 
+    # -----------------------------------------------------
+    # BULK (single statement + one commit)
+    # -----------------------------------------------------
+    async def _bulk(self, operation) -> int:
+        try:
+            count = await operation
+        except IntegrityError as e:
+            await self.session.rollback()
+            raise HTTPException(400, detail=str(e))
+
+        await self.commit()
+        return count
+
+    async def bulk_insert(self, rows: list[dict]) -> int:
+        return await self._bulk(self.repository.bulk_insert(rows))
+
+    async def bulk_upsert(
+        self,
+        rows: list[dict],
+        conflict_columns: list[str] | None = None,
+        update_columns: list[str] | None = None,
+    ) -> int:
+        return await self._bulk(
+            self.repository.bulk_upsert(rows, conflict_columns, update_columns)
+        )
+
+    async def bulk_update(self, ids: list, data: dict) -> int:
+        return await self._bulk(self.repository.bulk_update(ids, data))
+
+    async def bulk_soft_delete(self, *criteria, **filters) -> int:
+        return await self._bulk(self.repository.bulk_soft_delete(*criteria, **filters))
+
     # -----------------------------------------------------
     # READ / FIND
     # -----------------------------------------------------
@@ -2,6 +2,7 @@ from typing import Callable
 from fastapi import APIRouter, Depends
 
 from app.core.router import create_module_router
+from app.common.db.sessions import release_db_after
 
 def route(method: str, path: str, *, auth: bool | None = None, **options):
     """
@@ -43,4 +44,4 @@ class BaseController:
 
             if callable(attr) and hasattr(attr, "_route_info"):
                 for method, path, auth, options in attr._route_info:
-                    getattr(self.router, method)(path, **options)(attr)
+                    getattr(self.router, method)(path, **options)(release_db_after(attr))
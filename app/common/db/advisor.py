@@ -0,0 +1,274 @@
+"""
+Index advisor for slow statements.
+
+Every statement over DB_SLOW_QUERY_MS (see instrumentation.py) is
+fingerprinted by its normalized SQL. The first sample of each fingerprint is
+EXPLAINed (FORMAT JSON, never ANALYZE) in the background, and sequential scans
+on tables with at least DB_ADVISOR_MIN_ROWS rows are flagged with a suggested
+index built from the scan's filter.
+
+Repository queries and raw text() SQL go through the same engine hooks, so
+both are covered. Each process writes its report to DB_ADVISOR_DIR;
+`nova db advise` merges them.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import socket
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import text
+
+from app.common.db import instrumentation
+from app.common.db.explain import plan_root
+from app.common.db.instrumentation import normalize_sql
+from config.config import settings
+
+logger = logging.getLogger("app.db.advisor")
+
+FLUSH_INTERVAL = 30      # seconds between report writes while idle
+MAX_FINGERPRINTS = 500
+QUEUE_SIZE = 100
+
+# "(lower((email_address)::text) = 'x'::text)" -> lower(, email_address, =
+_PREDICATE = re.compile(
+    r"(?P<lower>lower\()?\(*(?P<col>[a-z_][a-z0-9_]*)\)*(?:::[a-z ]+?)?\)*\s*"
+    r"(?P<op>=|<>|>=|<=|>|<|~~\*|~~|!~~|IS NULL|IS NOT NULL)",
+)
+_EQUALITY_OPS = ("=", "IS NULL")
+_RANGE_OPS = (">=", "<=", ">", "<")
+_LIKE_OPS = ("~~", "~~*")
+
+
+def fingerprint(statement: str) -> str:
+    return hashlib.sha1(normalize_sql(statement).encode()).hexdigest()[:16]
+
+
+def walk_plan(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk_plan(child)
+
+
+def suggest_index(table: str, condition: Optional[str]) -> Optional[str]:
+    """
+    CREATE INDEX suggestion for a seq scan filter: equality columns first,
+    then at most one range column; LIKE/ILIKE gets a trigram index instead.
+    """
+    if not condition:
+        return None
+
+    equality, ranges, likes = [], [], []
+    for match in _PREDICATE.finditer(condition):
+        col = match["col"]
+        expr = f"lower({col})" if match["lower"] else col
+        op = match["op"]
+        if op in _EQUALITY_OPS and expr not in equality:
+            equality.append(expr)
+        elif op in _RANGE_OPS and expr not in ranges:
+            ranges.append(expr)
+        elif op in _LIKE_OPS and col not in likes:
+            likes.append(col)
+
+    if equality or ranges:
+        columns = equality + ranges[:1]
+        name = "_".join(re.sub(r"\W+", "_", c).strip("_") for c in columns)
+        return f"CREATE INDEX CONCURRENTLY ix_{table}_{name} ON {table} ({', '.join(columns)});"
+
+    if likes:
+        col = likes[0]
+        return (
+            f"CREATE INDEX CONCURRENTLY ix_{table}_{col}_trgm "
+            f"ON {table} USING gin ({col} gin_trgm_ops);"
+        )
+    return None
+
+
+class QueryAdvisor:
+    def __init__(self):
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._engine = None
+        self._dirty = False
+
+    # -------------------------
+    # LIFECYCLE
+    # -------------------------
+
+    async def start(self, engine):
+        if self._task is not None or engine is None:
+            return
+        if engine.dialect.name != "postgresql":
+            logger.info("Query advisor needs PostgreSQL, not starting")
+            return
+
+        self._engine = engine
+        self._queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._task = asyncio.create_task(self._worker())
+        instrumentation.slow_query_listeners.append(self.observe)
+        logger.info("Query advisor started (report dir: %s)", settings.DB_ADVISOR_DIR)
+
+    async def stop(self):
+        if self.observe in instrumentation.slow_query_listeners:
+            instrumentation.slow_query_listeners.remove(self.observe)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._queue = None
+        self.flush()
+
+    # -------------------------
+    # COLLECTION (sync, called from the cursor event)
+    # -------------------------
+
+    def observe(self, statement: str, parameters, elapsed: float):
+        if statement.lstrip()[:7].upper() == "EXPLAIN":
+            return
+
+        fp = fingerprint(statement)
+        entry = self.entries.get(fp)
+        if entry is None:
+            if len(self.entries) >= MAX_FINGERPRINTS:
+                return
+            entry = self.entries[fp] = {
+                "fingerprint": fp,
+                "sql": normalize_sql(statement),
+                "calls": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "plan": None,
+                "findings": [],
+                "explained_at": None,
+            }
+            # only SELECTs are explained; the first sample stands for the fingerprint
+            if self._queue is not None and statement.split(None, 1)[0].upper() in ("SELECT", "WITH"):
+                try:
+                    self._queue.put_nowait((fp, statement, parameters))
+                except asyncio.QueueFull:
+                    pass
+
+        ms = elapsed * 1000
+        entry["calls"] += 1
+        entry["total_ms"] = round(entry["total_ms"] + ms, 3)
+        entry["max_ms"] = round(max(entry["max_ms"], ms), 3)
+        self._dirty = True
+
+    # -------------------------
+    # BACKGROUND EXPLAIN
+    # -------------------------
+
+    async def _worker(self):
+        while True:
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                if self._dirty:
+                    self.flush()
+                continue
+
+            fp, statement, parameters = item
+            try:
+                await self._explain(fp, statement, parameters)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("EXPLAIN failed for %s", fp, exc_info=True)
+            self.flush()
+
+    async def _explain(self, fp: str, statement: str, parameters):
+        async with self._engine.connect() as conn:
+            # statement is already in the driver's paramstyle, so bypass compilation
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = plan_root(result.scalar())
+
+            findings = []
+            for node in walk_plan(plan):
+                if node.get("Node Type") != "Seq Scan":
+                    continue
+                table = node.get("Relation Name")
+                rows = (await conn.execute(
+                    text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+                    {"table": table},
+                )).scalar()
+                if rows is None or rows < settings.DB_ADVISOR_MIN_ROWS:
+                    continue
+                findings.append({
+                    "table": table,
+                    "table_rows": rows,
+                    "filter": node.get("Filter"),
+                    "suggestion": suggest_index(table, node.get("Filter")),
+                })
+
+        entry = self.entries[fp]
+        entry["plan"] = plan
+        entry["findings"] = findings
+        entry["explained_at"] = int(time.time())
+        for finding in findings:
+            logger.warning(
+                "Seq scan on %s (~%s rows) in %s; suggested: %s",
+                finding["table"], finding["table_rows"], fp, finding["suggestion"] or "-",
+            )
+
+    # -------------------------
+    # REPORT
+    # -------------------------
+
+    def report_path(self) -> str:
+        return os.path.join(settings.DB_ADVISOR_DIR, f"{socket.gethostname()}-{os.getpid()}.json")
+
+    def flush(self):
+        if not self.entries:
+            return
+        path = self.report_path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.tmp"
+            with open(tmp, "w") as fh:
+                json.dump(list(self.entries.values()), fh, default=str)
+            os.replace(tmp, path)
+            self._dirty = False
+        except OSError:
+            logger.warning("Could not write advisor report to %s", path, exc_info=True)
+
+
+query_advisor = QueryAdvisor()
+
+
+def load_report(report_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Merge every process's report into one entry per fingerprint, worst first."""
+    report_dir = report_dir or settings.DB_ADVISOR_DIR
+    merged: Dict[str, Dict[str, Any]] = {}
+    if not os.path.isdir(report_dir):
+        return []
+
+    for name in sorted(os.listdir(report_dir)):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(report_dir, name)) as fh:
+                entries = json.load(fh)
+        except (OSError, ValueError):
+            logger.warning("Skipping unreadable advisor report %s", name)
+            continue
+
+        for entry in entries:
+            current = merged.get(entry["fingerprint"])
+            if current is None:
+                merged[entry["fingerprint"]] = dict(entry)
+                continue
+            current["calls"] += entry["calls"]
+            current["total_ms"] = round(current["total_ms"] + entry["total_ms"], 3)
+            current["max_ms"] = max(current["max_ms"], entry["max_ms"])
+            if (entry.get("explained_at") or 0) > (current.get("explained_at") or 0):
+                current.update(plan=entry["plan"], findings=entry["findings"], explained_at=entry["explained_at"])
+
+    return sorted(merged.values(), key=lambda e: e["total_ms"], reverse=True)
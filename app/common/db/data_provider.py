@@ -1,6 +1,34 @@
-from typing import Any, List, Optional
+import csv
+import hashlib
+import io
+import json
+import logging
+import uuid
+from datetime import date, datetime
+from typing import Any, AsyncIterator, List, Optional
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import func, select
+from sqlalchemy import and_, func, inspect, or_, select, text, tuple_
+
+from app.common.db import sessions
+from app.common.db.explain import Explain, plan_root
+from app.common.pagination import decode_cursor, encode_cursor
+from app.core.cache.cache_utils import get_cache, set_cache
+
+logger = logging.getLogger("app.db")
+
+# How `total` is computed for offset pages:
+#   exact    -> SELECT count(*) FROM (subquery) on every page
+#   cached   -> exact count, cached for `count_ttl` seconds per filter hash
+#   estimate -> planner row estimate (pg_class.reltuples / EXPLAIN)
+COUNT_STRATEGIES = ("exact", "cached", "estimate")
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
 
 class DataProvider:
     def __init__(
@@ -11,31 +39,57 @@ class DataProvider:
         page_size: int = 20,
         sort: Optional[str] = None,
         default_sort: Optional[str] = None,
+        model=None,
+        cursor: Optional[str] = None,
+        mode: str = "offset",
+        count_strategy: str = "exact",
+        count_ttl: int = 60,
     ):
+        if count_strategy not in COUNT_STRATEGIES:
+            raise ValueError(f"Unknown count strategy: {count_strategy}")
+
         self.query = query
         self.db = db
         self.page = max(page, 1)
         self.page_size = min(max(page_size, 1), 100)
         self.sort = sort
         self.default_sort = default_sort
+        self.model = model or query.column_descriptions[0]["entity"]
+        self.cursor = cursor or None
+        self.mode = mode
+        self.count_strategy = count_strategy
+        self.count_ttl = count_ttl
+
+    # -------------------------
+    # SORTING
+    # -------------------------
+
+    def _sort_spec(self) -> Optional[str]:
+        return self.sort or self.default_sort
+
+    def _sort_column(self):
+        spec = self._sort_spec()
+        if not spec:
+            return None, False
+        return getattr(self.model, spec.lstrip("-")), spec.startswith("-")
+
+    def _apply_sort(self, query):
+        column, desc = self._sort_column()
+        if column is not None:
+            query = query.order_by(column.desc() if desc else column.asc())
+        return query
+
+    # -------------------------
+    # OFFSET MODE
+    # -------------------------
 
     async def get_page(self):
-        # Apply sorting
-        if self.sort:
-            if self.sort.startswith("-"):
-                self.query = self.query.order_by(getattr(self.model, self.sort[1:]).desc())
-            else:
-                self.query = self.query.order_by(getattr(self.model, self.sort).asc())
-        elif self.default_sort:
-            field = self.default_sort.lstrip("-")
-            if self.default_sort.startswith("-"):
-                self.query = self.query.order_by(getattr(self.model, field).desc())
-            else:
-                self.query = self.query.order_by(getattr(self.model, field).asc())
-
-        # Count total
-        count_q = select(func.count()).select_from(self.query.subquery())
-        total = (await self.db.execute(count_q)).scalar()
+        if self.mode == "cursor":
+            return await self.get_cursor_page()
+
+        self.query = self._apply_sort(self.query)
+
+        total, total_kind = await self.count()
 
         # Fetch results
         offset = (self.page - 1) * self.page_size
@@ -46,5 +100,266 @@ class DataProvider:
             "page": self.page,
             "page_size": self.page_size,
             "total": total,
+            "total_kind": total_kind,
             "pages": (total // self.page_size) + (1 if total % self.page_size else 0),
         }
+
+    # -------------------------
+    # TOTALS
+    # -------------------------
+
+    async def count(self) -> tuple[int, str]:
+        """
+        Returns (total, kind) where kind is "exact", "cached" or "estimate".
+        Cached and estimated totals fall back to an exact count when unavailable.
+        """
+        if self.count_strategy == "estimate":
+            estimate = await self._estimate_count()
+            if estimate is not None:
+                return estimate, "estimate"
+
+        if self.count_strategy == "cached":
+            key = self._count_cache_key()
+            try:
+                cached = await get_cache(key)
+            except Exception:
+                logger.warning("Count cache unavailable, using exact count", exc_info=True)
+                cached = None
+
+            if cached is not None:
+                return int(cached), "cached"
+
+            total = await self._exact_count()
+            try:
+                await set_cache(key, str(total), expire=self.count_ttl)
+            except Exception:
+                logger.warning("Count cache unavailable, result not stored", exc_info=True)
+            return total, "exact"
+
+        return await self._exact_count(), "exact"
+
+    async def _exact_count(self) -> int:
+        count_q = select(func.count()).select_from(self.query.order_by(None).subquery())
+        return (await self.db.execute(count_q)).scalar() or 0
+
+    def _count_cache_key(self) -> str:
+        compiled = self.query.order_by(None).compile()
+        params = json.dumps(compiled.params, default=str, sort_keys=True)
+        digest = hashlib.sha1(f"{compiled}|{params}".encode()).hexdigest()
+        return f"dp:count:{self.model.__tablename__}:{digest}"
+
+    async def _estimate_count(self) -> Optional[int]:
+        bind = self.db.get_bind()
+        if bind.dialect.name != "postgresql":
+            return None
+
+        try:
+            # SAVEPOINT so a failed estimate doesn't abort the page's transaction
+            async with self.db.begin_nested():
+                conn = await self.db.connection()
+
+                # Unfiltered: table statistics are the cheapest answer
+                if self.query.whereclause is None:
+                    result = await conn.execute(
+                        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+                        {"table": self.model.__table__.fullname},
+                    )
+                    estimate = result.scalar()
+                    # reltuples is -1 for tables that were never analyzed
+                    return estimate if estimate is not None and estimate >= 0 else None
+
+                result = await conn.execute(Explain(self.query.order_by(None)))
+                return int(plan_root(result.scalar())["Plan Rows"])
+        except Exception:
+            logger.warning("Count estimate failed, using exact count", exc_info=True)
+            return None
+
+    # -------------------------
+    # CURSOR (KEYSET) MODE
+    # WHERE (sort_key, pk) > (:last_sort_key, :last_pk)
+    # A nullable sort key sorts NULLS LAST ascending / NULLS FIRST
+    # descending (both directions are exact mirrors), and the predicate
+    # walks into / through the NULL block explicitly: a row-value
+    # comparison against NULL is never true.
+    # -------------------------
+
+    def _keyset_columns(self) -> tuple[List[Any], bool]:
+        mapper = inspect(self.model)
+        pk = getattr(self.model, mapper.get_property_by_column(mapper.primary_key[0]).key)
+        column, desc = self._sort_column()
+        if column is None or column.key == pk.key:
+            return [pk], desc
+        return [column, pk], desc
+
+    def _keyset_order(self, columns, desc):
+        sort_col = columns[0]
+        if len(columns) == 1 or not _nullable(sort_col):
+            return [col.desc() if desc else col.asc() for col in columns]
+        pk = columns[1]
+        if desc:
+            return [sort_col.desc().nulls_first(), pk.desc()]
+        return [sort_col.asc().nulls_last(), pk.asc()]
+
+    def _keyset_predicate(self, columns, values, desc):
+        if len(columns) == 1 or not _nullable(columns[0]):
+            row_key, last_key = tuple_(*columns), tuple_(*values)
+            return row_key < last_key if desc else row_key > last_key
+
+        sort_col, pk = columns
+        last_value, last_pk = values
+        if desc:
+            # NULL block first, then the values downwards
+            if last_value is None:
+                return or_(and_(sort_col.is_(None), pk < last_pk), sort_col.is_not(None))
+            return tuple_(sort_col, pk) < tuple_(last_value, last_pk)
+
+        # values upwards, then the NULL block
+        if last_value is None:
+            return and_(sort_col.is_(None), pk > last_pk)
+        return or_(tuple_(sort_col, pk) > tuple_(last_value, last_pk), sort_col.is_(None))
+
+    async def get_cursor_page(self):
+        columns, desc = self._keyset_columns()
+        sort = self._sort_spec()
+
+        query = self.query
+        if self.cursor:
+            try:
+                cursor_sort, keys = decode_cursor(self.cursor)
+            except ValueError:
+                raise HTTPException(400, "Invalid cursor")
+
+            if cursor_sort != sort or len(keys) != len(columns):
+                raise HTTPException(400, "Cursor does not match the requested sort")
+
+            try:
+                values = [_coerce(col, key) for col, key in zip(columns, keys)]
+            except (ValueError, TypeError):
+                raise HTTPException(400, "Invalid cursor")
+            if values[-1] is None:
+                raise HTTPException(400, "Invalid cursor")
+            query = query.where(self._keyset_predicate(columns, values, desc))
+
+        query = query.order_by(*self._keyset_order(columns, desc))
+
+        # Fetch one extra row to know whether another page exists
+        rows = (await self.db.execute(query.limit(self.page_size + 1))).scalars().all()
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+
+        next_cursor = None
+        if has_more and rows:
+            last = rows[-1]
+            next_cursor = encode_cursor(sort, [getattr(last, col.key) for col in columns])
+
+        return {
+            "items": rows,
+            "page_size": self.page_size,
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+        }
+
+    # -------------------------
+    # STREAMING EXPORT
+    # Server-side cursor + yield_per: one batch in memory at a time, and
+    # the next batch is only fetched once the client has taken the last one.
+    # -------------------------
+
+    def _export_columns(self, columns: Optional[List[str]]) -> List[str]:
+        if columns:
+            return columns
+        return [attr.key for attr in inspect(self.model).column_attrs]
+
+    async def stream(
+        self,
+        fmt: str = "ndjson",
+        columns: Optional[List[str]] = None,
+        batch_size: int = 1000,
+        db: Optional[AsyncSession] = None,
+    ) -> AsyncIterator[bytes]:
+        if fmt not in EXPORT_MEDIA_TYPES:
+            raise ValueError(f"Unknown export format: {fmt}")
+
+        db = db or self.db
+        columns = self._export_columns(columns)
+        query = self._apply_sort(self.query).execution_options(yield_per=batch_size)
+
+        if fmt == "csv":
+            yield _csv_chunk([columns])
+
+        result = await db.stream_scalars(query)
+        try:
+            async for batch in result.partitions(batch_size):
+                rows = [[getattr(obj, c) for c in columns] for obj in batch]
+                for obj in batch:
+                    db.expunge(obj)
+
+                if fmt == "csv":
+                    yield _csv_chunk(rows)
+                else:
+                    yield "".join(
+                        json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in rows
+                    ).encode()
+        finally:
+            await result.close()
+
+    def export_response(
+        self,
+        fmt: str = "ndjson",
+        columns: Optional[List[str]] = None,
+        batch_size: int = 1000,
+        filename: Optional[str] = None,
+    ) -> StreamingResponse:
+        """
+        Streams the whole (filtered, sorted) result set.
+
+        The body is produced after the endpoint has returned, so it runs on
+        its own session rather than the request's `get_db` session.
+        """
+        if fmt not in EXPORT_MEDIA_TYPES:
+            raise HTTPException(400, f"Unsupported export format: {fmt}")
+
+        if not sessions.AsyncSessionLocal:
+            raise RuntimeError("DB not initialized — call init_db() first.")
+
+        async def body():
+            async with sessions.AsyncSessionLocal() as session:
+                async for chunk in self.stream(fmt, columns, batch_size, db=session):
+                    yield chunk
+
+        filename = filename or f"{self.model.__tablename__}.{fmt}"
+        return StreamingResponse(
+            body(),
+            media_type=EXPORT_MEDIA_TYPES[fmt],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+
+def _csv_chunk(rows) -> bytes:
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue().encode()
+
+
+def _nullable(attribute) -> bool:
+    column = getattr(attribute, "expression", attribute)
+    return getattr(column, "nullable", True)
+
+
+def _coerce(column, value):
+    """Turn a JSON-decoded cursor key back into the column's python type."""
+    if value is None:
+        return None
+
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+
+    if isinstance(value, python_type):
+        return value
+    if python_type is uuid.UUID:
+        return uuid.UUID(str(value))
+    if python_type in (datetime, date):
+        return python_type.fromisoformat(value)
+    return python_type(value)
@@ -0,0 +1,33 @@
+import json
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+class Explain(Executable, ClauseElement):
+    """
+    EXPLAIN (FORMAT JSON) wrapper around any selectable.
+
+    Usage:
+        conn = await session.connection()
+        plan = (await conn.execute(Explain(select(User)))).scalar()
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement, analyze: bool = False):
+        self.statement = statement
+        self.analyze = analyze
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    options = "ANALYZE, FORMAT JSON" if element.analyze else "FORMAT JSON"
+    return f"EXPLAIN ({options}) " + compiler.process(element.statement, **kw)
+
+
+def plan_root(plan) -> dict:
+    """Return the top plan node from a FORMAT JSON result."""
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
@@ -1,5 +1,7 @@
-from sqlalchemy import or_, and_
+from sqlalchemy import Float, literal, or_, and_
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.sql import ColumnElement
+from sqlalchemy.sql.functions import FunctionElement
 from datetime import datetime
 
 
@@ -64,8 +66,44 @@ def status_filter(query, model, status):
 # Example: q matches username OR email OR phone
 # -----------------------
 def multi_field_search(query, model, fields: list[str], term: str):
+    return trigram_search(query, model, fields, term)
+
+
+# -----------------------
+# TRIGRAM SEARCH
+# Same ILIKE '%term%' predicate, but on Postgres it is served by
+# pg_trgm GIN indexes (gin_trgm_ops) instead of a sequential scan.
+# rank=True orders by best trigram similarity across the fields.
+# Other dialects (SQLite in tests) get plain ILIKE and no ranking.
+# -----------------------
+def trigram_search(query, model, fields: list[str], term: str, rank: bool = False):
     if not term:
         return query
 
-    conditions = [getattr(model, f).ilike(f"%{term}%") for f in fields]
-    return query.where(or_(*conditions))
+    columns = [getattr(model, f) for f in fields]
+    query = query.where(or_(*[c.ilike(f"%{term}%") for c in columns]))
+
+    if rank:
+        query = query.order_by(search_rank(*columns, literal(term)).desc())
+    return query
+
+
+class search_rank(FunctionElement):
+    """search_rank(col1, col2, ..., term) -> relevance score (higher is better)"""
+
+    type = Float()
+    name = "search_rank"
+    inherit_cache = True
+
+
+@compiles(search_rank)
+def _search_rank_default(element, compiler, **kw):
+    return "0"
+
+
+@compiles(search_rank, "postgresql")
+def _search_rank_postgresql(element, compiler, **kw):
+    *columns, term = list(element.clauses)
+    term_sql = compiler.process(term, **kw)
+    scores = [f"similarity({compiler.process(c, **kw)}, {term_sql})" for c in columns]
+    return f"GREATEST({', '.join(scores)})"
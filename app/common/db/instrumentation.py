@@ -0,0 +1,227 @@
+"""
+SQL statement instrumentation.
+
+    instrument_engine(engine)   -> cursor events on the engine (init_db does this)
+    with track_queries() as s:  -> s.count / s.duration for everything run inside
+    with record_queries() as r: -> every statement on the engine, any thread (tests)
+
+QueryStatsMiddleware opens a track_queries() scope per request, so each
+request gets its statement count and DB time (Prometheus, optional
+Server-Timing header). Statements slower than DB_SLOW_QUERY_MS are logged
+with normalized SQL and the *shape* of their bind parameters, never values.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional
+
+from prometheus_client import Histogram
+from sqlalchemy import event
+
+from config.config import settings
+
+logger = logging.getLogger("app.db.slow")
+
+DB_REQUEST_QUERIES = Histogram(
+    "db_request_queries",
+    "SQL statements issued per request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+
+DB_REQUEST_DURATION = Histogram(
+    "db_request_duration_seconds",
+    "Time spent executing SQL per request",
+    ["method", "route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+DB_CONNECTION_HOLD = Histogram(
+    "db_connection_hold_seconds",
+    "Time a pooled connection stays checked out",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+_START_KEY = "query_start_time"
+_CHECKOUT_KEY = "checked_out_at"
+_SQL_LOG_LIMIT = 2000
+
+# callables (statement, parameters, elapsed_seconds) run for every slow statement
+slow_query_listeners: List[Callable[[str, Any, float], None]] = []
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0          # seconds
+        self.statements: List[str] = []
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.duration += elapsed
+        self.statements.append(statement)
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@contextmanager
+def track_queries():
+    """
+    Collect stats for statements executed in this context (and the
+    tasks/greenlets it spawns, which inherit the context).
+    """
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+class QueryRecorder:
+    """Statements seen on an engine while recording, from any task or thread."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, min_times: int = 3) -> List[tuple]:
+        """(normalized_sql, times) run at least `min_times` times: likely N+1."""
+        counts = Counter(normalize_sql(s) for s in self.statements)
+        return [(sql, n) for sql, n in counts.most_common() if n >= min_times]
+
+
+@contextmanager
+def record_queries(engine=None):
+    """
+    Unlike track_queries(), this listens on the engine itself, so it also sees
+    statements run on other threads (e.g. the app behind a TestClient).
+    Defaults to the engine created by init_db().
+    """
+    if engine is None:
+        from app.common.db import sessions
+        engine = sessions.engine
+    if engine is None:
+        raise RuntimeError("DB not initialized — call init_db() first.")
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+    recorder = QueryRecorder()
+    event.listen(sync_engine, "after_cursor_execute", recorder)
+    try:
+        yield recorder
+    finally:
+        event.remove(sync_engine, "after_cursor_execute", recorder)
+
+
+# ---------------------------------------------------------
+# Engine hooks
+# ---------------------------------------------------------
+def instrument_engine(engine):
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return engine
+
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+    event.listen(sync_engine.pool, "checkout", _on_checkout)
+    event.listen(sync_engine.pool, "checkin", _on_checkin)
+    return engine
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    connection_record.info[_CHECKOUT_KEY] = time.perf_counter()
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    started = connection_record.info.pop(_CHECKOUT_KEY, None)
+    if started is not None:
+        DB_CONNECTION_HOLD.observe(time.perf_counter() - started)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get(_START_KEY)
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    threshold = settings.DB_SLOW_QUERY_MS
+    if threshold and elapsed * 1000 >= threshold:
+        logger.warning(
+            "Slow query %.1fms: %s | params: %s",
+            elapsed * 1000,
+            normalize_sql(statement),
+            bind_shape(parameters, executemany),
+        )
+        for listener in slow_query_listeners:
+            try:
+                listener(statement, parameters, elapsed)
+            except Exception:
+                logger.exception("Slow query listener failed")
+
+
+def _handle_error(exception_context):
+    # the statement failed: drop its start time so the stack stays aligned
+    conn = exception_context.connection
+    starts = conn.info.get(_START_KEY) if conn is not None else None
+    if starts:
+        starts.pop()
+
+
+# ---------------------------------------------------------
+# Log helpers
+# ---------------------------------------------------------
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\((\s*(\$\d+|\?|%\(\w+\)s)\s*,)+\s*(\$\d+|\?|%\(\w+\)s)\s*\)")
+
+
+def normalize_sql(statement: str) -> str:
+    """One line, IN-lists of placeholders collapsed so variants group together."""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _IN_LIST.sub("(...)", sql)
+    if len(sql) > _SQL_LOG_LIMIT:
+        sql = sql[:_SQL_LOG_LIMIT] + "..."
+    return sql
+
+
+def _type_name(value: Any) -> str:
+    return "null" if value is None else type(value).__name__
+
+
+def bind_shape(parameters, executemany: bool = False) -> str:
+    """Parameter types only, e.g. "(UUID, int)" or "3 x {username: str}"."""
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        return f"{len(parameters)} x {bind_shape(parameters[0])}"
+
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {_type_name(v)}" for k, v in parameters.items()) + "}"
+
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(_type_name(v) for v in parameters) + ")"
+
+    return _type_name(parameters)
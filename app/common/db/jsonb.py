@@ -0,0 +1,86 @@
+"""
+JSON document columns: JSONB on Postgres (GIN-indexable, patchable in
+place), plain JSON elsewhere.
+
+    data: Mapped[dict] = mapped_column(JSONDocument)
+
+    select(Profile).where(contains(Profile.data, {"locale": "sw"}))
+    update(UserSettings).values(data=jsonb_set(UserSettings.data, {"theme.mode": "dark"}))
+
+contains() is `@>`, which a GIN index with jsonb_path_ops serves.
+jsonb_set() rewrites only the given paths server side, so concurrent
+patches of different keys do not overwrite each other.
+document_contains() and apply_patch() are the same rules in Python, for
+other dialects.
+"""
+import copy
+from typing import Any, Dict, List, Union
+
+from sqlalchemy import JSON, Text, func, literal
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+Path = Union[str, List[str], tuple]
+
+
+def json_path(path: Path) -> List[str]:
+    """"theme.mode" -> ["theme", "mode"]."""
+    return path.split(".") if isinstance(path, str) else [str(p) for p in path]
+
+
+def contains(column, document: dict):
+    """column @> document"""
+    return column.op("@>")(literal(document, JSONB))
+
+
+def document_contains(document: Any, subset: Any) -> bool:
+    """`document @> subset` in Python."""
+    if isinstance(subset, dict):
+        return isinstance(document, dict) and all(
+            key in document and document_contains(document[key], value) for key, value in subset.items()
+        )
+    if isinstance(subset, list):
+        if not isinstance(document, list):
+            # a scalar array matches a scalar document that is one of its items
+            return len(subset) == 1 and not isinstance(subset[0], (dict, list)) and subset[0] == document
+        return all(any(document_contains(item, wanted) for item in document) for wanted in subset)
+    return document == subset
+
+
+def jsonb_set(column, changes: Dict[Path, Any]):
+    """
+    Expression setting each path to its value. Missing keys are created,
+    missing parent objects too; a path under a value that is not an object
+    (string, number, null) is left alone.
+    """
+    paths = [json_path(path) for path in changes]
+    parents = sorted({tuple(path[:depth]) for path in paths for depth in range(1, len(path))}, key=len)
+
+    expr = func.coalesce(column, literal({}, JSONB))
+    # parents first, from the stored document (or {}): jsonb_set itself only
+    # creates the last key of a path
+    for parent in parents:
+        path = literal(list(parent), ARRAY(Text))
+        expr = func.jsonb_set(
+            expr, path, func.coalesce(column.op("#>", return_type=JSONB)(path), literal({}, JSONB)), True,
+            type_=JSONB,
+        )
+    for path, value in zip(paths, changes.values()):
+        expr = func.jsonb_set(expr, literal(path, ARRAY(Text)), literal(value, JSONB), True, type_=JSONB)
+    return expr
+
+
+def apply_patch(document: dict | None, changes: Dict[Path, Any]) -> dict:
+    """jsonb_set() in Python (other dialects), same rules for missing parents."""
+    result = copy.deepcopy(document) if document else {}
+    for path, value in changes.items():
+        *parents, key = json_path(path)
+        node = result
+        for parent in parents:
+            if not isinstance(node, dict):
+                break
+            node = node.setdefault(parent, {})
+        if isinstance(node, dict):
+            node[key] = value
+    return result
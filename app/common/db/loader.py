@@ -0,0 +1,189 @@
+import asyncio
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from app.core.cache.model_cache import model_cache
+
+# batch_fn(keys) -> {key: value}; missing keys resolve to None
+BatchFn = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+MAX_BATCH_SIZE = 500
+
+
+class DataLoader:
+    """
+    DataLoader-style batching.
+
+    Every load() issued in the same event-loop tick is collected and resolved
+    by one call to batch_fn, and each key is only ever fetched once per
+    loader (results are memoized). Batches run one after another, holding
+    `lock` if given: loaders sharing an AsyncSession share its lock, since
+    the session allows one operation at a time.
+
+    Usage:
+        users = await asyncio.gather(*(loader.load(uid) for uid in ids))
+    """
+
+    def __init__(
+        self,
+        batch_fn: BatchFn,
+        key_fn: Optional[Callable[[Any], Hashable]] = None,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        lock: Optional[asyncio.Lock] = None,
+    ):
+        self.batch_fn = batch_fn
+        self.key_fn = key_fn or (lambda key: key)
+        self.max_batch_size = max_batch_size
+        self.lock = lock
+        self._cache: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Hashable] = []
+        self._tasks: set = set()
+
+    async def load(self, key: Hashable) -> Any:
+        key = self.key_fn(key)
+        future = self._cache.get(key)
+
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._cache[key] = future
+            self._queue.append(key)
+
+            # first key of this tick schedules the dispatch
+            if len(self._queue) == 1:
+                loop.call_soon(self._dispatch)
+
+        # shield: one cancelled caller must not cancel the shared result
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: List[Hashable]) -> List[Any]:
+        return list(await asyncio.gather(*(self.load(k) for k in keys)))
+
+    def prime(self, key: Hashable, value: Any):
+        key = self.key_fn(key)
+        if key not in self._cache:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._cache[key] = future
+
+    def clear(self, key: Optional[Hashable] = None):
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(self.key_fn(key), None)
+
+    def _dispatch(self):
+        keys, self._queue = self._queue, []
+        task = asyncio.ensure_future(self._run_batches(keys))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batches(self, keys: List[Hashable]):
+        for i in range(0, len(keys), self.max_batch_size):
+            if self.lock is None:
+                await self._run_batch(keys[i:i + self.max_batch_size])
+            else:
+                async with self.lock:
+                    await self._run_batch(keys[i:i + self.max_batch_size])
+
+    async def _run_batch(self, keys: List[Hashable]):
+        try:
+            results = await self.batch_fn(keys)
+        except Exception as exc:
+            for key in keys:
+                future = self._cache.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(exc)
+            return
+
+        for key in keys:
+            future = self._cache.get(key)
+            if future is not None and not future.done():
+                future.set_result(results.get(key))
+
+
+# ---------------------------------------------------------
+# Request-scoped registry
+# Loaders live in session.info, and get_db opens one session per request,
+# so they share the request's lifetime and identity map. The memo ends
+# with the transaction: after a commit or rollback, loads see fresh rows.
+# The lock outlives it: it serializes every loader's queries on the session.
+# ---------------------------------------------------------
+def get_loader(session: AsyncSession, name: str, batch_fn: BatchFn, key_fn=None) -> DataLoader:
+    loaders = session.info.setdefault("loaders", {})
+    if name not in loaders:
+        lock = session.info.setdefault("loader_lock", asyncio.Lock())
+        loaders[name] = DataLoader(batch_fn, key_fn=key_fn, lock=lock)
+    return loaders[name]
+
+
+def clear_loaders(session: AsyncSession):
+    session.info.pop("loaders", None)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_after_transaction(session):
+    # AsyncSession.info is its sync_session's info
+    session.info.pop("loaders", None)
+
+
+def pk_loader(session: AsyncSession, model, *criteria, name: Optional[str] = None) -> DataLoader:
+    """
+    Loader resolving `model` rows by primary key with one
+    SELECT ... WHERE pk IN (...) per tick.
+
+    Without extra criteria, rows already in the session's identity map, then
+    rows in the second-level cache (model_cache) are returned without a
+    query, and fetched rows are cached. Loaders with criteria always query
+    and must be given a distinct `name`.
+    """
+    mapper = inspect(model)
+    pk = getattr(model, mapper.get_property_by_column(mapper.primary_key[0]).key)
+    python_type = pk.type.python_type
+
+    async def batch(keys):
+        found = {}
+        missing = []
+        for key in keys:
+            obj = None
+            if not criteria:
+                obj = session.sync_session.identity_map.get(identity_key(model, key))
+            if obj is not None:
+                found[key] = obj
+            else:
+                missing.append(key)
+
+        cached = not criteria and model_cache.is_cached(model)
+        if cached:
+            still_missing = []
+            for key in missing:
+                obj = await model_cache.lookup(session, model, key)
+                if obj is not None:
+                    found[key] = obj
+                else:
+                    still_missing.append(key)
+            missing = still_missing
+
+        if missing:
+            result = await session.execute(select(model).where(pk.in_(missing), *criteria))
+            for obj in result.scalars().all():
+                found[getattr(obj, pk.key)] = obj
+                if cached:
+                    await model_cache.store(model, obj)
+        return found
+
+    def key_fn(key):
+        # "uuid-str" and UUID(...) must hit the same entry
+        if key is None or isinstance(key, python_type):
+            return key
+        if python_type is uuid.UUID:
+            return uuid.UUID(str(key))
+        return python_type(key)
+
+    return get_loader(session, name or model.__tablename__, batch, key_fn=key_fn)
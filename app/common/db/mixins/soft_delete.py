@@ -1,6 +1,27 @@
-from sqlalchemy import Boolean, DateTime, func, Column
+from typing import Dict
+
+from sqlalchemy import Boolean, DateTime, event, false, func, Column
+from sqlalchemy.orm import Mapper, Session, configure_mappers, with_loader_criteria
+
+# ---------------------------------------------------------
+# Global soft-delete criteria
+# Every ORM SELECT (including relationship and eager loads) of a soft-delete
+# model gets `is_deleted = false` added, so repositories no longer have to
+# remember the predicate. The literal `false` (not a bind parameter) lets the
+# planner match the partial `WHERE is_deleted = false` indexes.
+#
+# Opt out per statement or call:
+#     select(User).execution_options(include_deleted=True)
+#     await db.execute(stmt, execution_options={"include_deleted": True})
+# ---------------------------------------------------------
+INCLUDE_DELETED = "include_deleted"
+
+_criteria: Dict[type, object] = {}
+
 
 class SoftDeleteMixin:
+    __soft_delete__ = True
+
     is_deleted = Column(Boolean, default=False, nullable=False)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
 
@@ -11,3 +32,38 @@ class SoftDeleteMixin:
     def restore(self):
         self.is_deleted = False
         self.deleted_at = None
+
+
+def with_deleted(statement):
+    """`statement` with soft-deleted rows included."""
+    return statement.execution_options(**{INCLUDE_DELETED: True})
+
+
+def has_global_criteria(cls) -> bool:
+    """True if selects of `cls` get `is_deleted = false` added automatically."""
+    configure_mappers()  # registration happens as mappers are configured
+    return cls in _criteria
+
+
+@event.listens_for(Mapper, "mapper_configured")
+def _register_soft_delete(mapper, cls):
+    # SoftDeleteMixin subclasses, or models with their own is_deleted column
+    # that set __soft_delete__ = True (e.g. IAM models)
+    if not getattr(cls, "__soft_delete__", False) or "is_deleted" not in mapper.columns:
+        return
+    _criteria[cls] = with_loader_criteria(cls, cls.is_deleted == false(), include_aliases=True)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _filter_soft_deleted(orm_execute_state):
+    if (
+        not _criteria
+        or not orm_execute_state.is_select
+        # lazy/column loads inherit the criteria from the statement that loaded the parent
+        or orm_execute_state.is_column_load
+        or orm_execute_state.is_relationship_load
+        or orm_execute_state.execution_options.get(INCLUDE_DELETED, False)
+    ):
+        return
+
+    orm_execute_state.statement = orm_execute_state.statement.options(*_criteria.values())
@@ -1,9 +1,54 @@
+import secrets
+import threading
+import time
 import uuid
 from sqlalchemy.orm import Mapped, mapped_column
 
+# ---------------------------------------------------------
+# UUIDv7 (RFC 9562): 48-bit unix ms timestamp | ver | 12-bit counter | var | 62 random bits
+# Keys sort by creation time, so inserts append to the right edge of the
+# primary key b-tree instead of splitting pages all over it (uuid4).
+# ---------------------------------------------------------
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """Time-ordered UUID; monotonic within a process, even within one millisecond."""
+    global _last_ms, _counter
+
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_ms = ms
+            # random start, top bit clear so the counter has room to grow
+            _counter = secrets.randbits(11)
+        else:
+            # same millisecond (or clock went back): keep ordering via the counter
+            _counter += 1
+            if _counter > 0xFFF:
+                _last_ms += 1
+                _counter = 0
+        ms, counter = _last_ms, _counter
+
+    value = (
+        (ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | secrets.randbits(62)
+    )
+    return uuid.UUID(int=value)
+
+
+def uuid7_hex() -> str:
+    """uuid7() for String(32) keys such as Profile.id."""
+    return uuid7().hex
+
 
 class UUIDPrimaryKeyMixin:
     id: Mapped[uuid.UUID] = mapped_column(
         primary_key=True,
-        default=uuid.uuid4
+        default=uuid7
     )
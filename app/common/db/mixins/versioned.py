@@ -0,0 +1,21 @@
+from sqlalchemy import Integer
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column
+
+
+class VersionedMixin:
+    """
+    Optimistic concurrency: every UPDATE/DELETE is issued as
+    `... WHERE pk = :pk AND version_id = :loaded_version` and bumps the
+    version. If another writer got there first no row matches, SQLAlchemy
+    raises StaleDataError and BaseService.commit() turns it into a 409
+    ConflictError. No row locks are held between read and write.
+
+    Models that define their own __mapper_args__ must add
+    "version_id_col": version_id themselves.
+    """
+
+    version_id: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
+
+    @declared_attr.directive
+    def __mapper_args__(cls):
+        return {"version_id_col": cls.version_id}
@@ -0,0 +1,248 @@
+"""
+Migration operations that keep large tables writable.
+
+    from app.common.db.online_migrations import create_index_concurrently, ...
+
+    def upgrade():
+        create_index_concurrently('ix_users_email', 'users', ['email'])
+        add_foreign_key_online('fk_x_user', 'x', ['user_id'], 'users', ['user_id'])
+        backfill('users', "is_deleted = false", "is_deleted IS NULL", pk='user_id')
+        set_not_null_online('users', 'is_deleted')
+
+Plain Alembic equivalents lock the table for the whole build or scan:
+
+    op.create_index         SHARE: blocks writes while the index builds
+    op.create_foreign_key   validates every row under the lock
+    op.alter_column(nullable=False)  full scan under ACCESS EXCLUSIVE
+    partitioning.partition_table     copies the table under ACCESS EXCLUSIVE
+                                     (partition_table_online attaches it)
+
+Steps that cannot run in a transaction use autocommit_block(), which
+commits whatever the revision did before them. Put them last, or in a
+revision of their own. On other dialects the helpers fall back to the
+plain operation. `nova migrate` lints pending revisions for the unsafe
+forms (cli/migration_lint.py).
+"""
+import time
+from typing import Dict, Iterable, List, Optional
+
+from alembic import op
+from sqlalchemy import text
+
+from app.common.db import partitioning
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+# ---------------------------------------------------------
+# Indexes
+# ---------------------------------------------------------
+def create_index_concurrently(name: str, table: str, columns: List, **kw):
+    """CREATE INDEX CONCURRENTLY, outside the migration transaction."""
+    if not _is_postgres():
+        op.create_index(name, table, columns, **kw)
+        return
+
+    with op.get_context().autocommit_block():
+        # a failed concurrent build leaves an INVALID index behind that
+        # IF NOT EXISTS would happily keep: drop it and build again
+        invalid = op.get_bind().execute(
+            text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid AND pg_table_is_visible(c.oid)"
+            ),
+            {"name": name},
+        ).first()
+        if invalid:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+        op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True, **kw)
+
+
+def drop_index_concurrently(name: str, table: str):
+    if not _is_postgres():
+        op.drop_index(name, table_name=table)
+        return
+
+    with op.get_context().autocommit_block():
+        op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+# ---------------------------------------------------------
+# Constraints: NOT VALID now, VALIDATE without blocking writes
+# ---------------------------------------------------------
+def add_constraint_online(table: str, name: str, definition: str):
+    """
+    ADD CONSTRAINT ... NOT VALID (brief lock, new rows checked), then
+    VALIDATE CONSTRAINT in its own transaction (SHARE UPDATE EXCLUSIVE:
+    reads and writes continue while existing rows are checked).
+    `definition` is e.g. "CHECK (age >= 0)" or "FOREIGN KEY (...) REFERENCES ...".
+    """
+    if not _is_postgres():
+        op.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+        return
+
+    op.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition} NOT VALID')
+    with op.get_context().autocommit_block():
+        op.execute(f'ALTER TABLE "{table}" VALIDATE CONSTRAINT "{name}"')
+
+
+def add_check_constraint_online(name: str, table: str, condition: str):
+    add_constraint_online(table, name, f"CHECK ({condition})")
+
+
+def add_foreign_key_online(
+    name: str,
+    table: str,
+    columns: List[str],
+    ref_table: str,
+    ref_columns: List[str],
+    ondelete: Optional[str] = None,
+    onupdate: Optional[str] = None,
+):
+    cols = ", ".join(f'"{c}"' for c in columns)
+    ref_cols = ", ".join(f'"{c}"' for c in ref_columns)
+    definition = f'FOREIGN KEY ({cols}) REFERENCES "{ref_table}" ({ref_cols})'
+    if ondelete:
+        definition += f" ON DELETE {ondelete}"
+    if onupdate:
+        definition += f" ON UPDATE {onupdate}"
+    add_constraint_online(table, name, definition)
+
+
+def set_not_null_online(table: str, column: str):
+    """
+    SET NOT NULL without the full scan under ACCESS EXCLUSIVE: Postgres 12+
+    skips the scan when a validated CHECK (column IS NOT NULL) exists.
+    """
+    if not _is_postgres():
+        op.alter_column(table, column, nullable=False)
+        return
+
+    check = f"{table}_{column}_not_null"[:63]
+    add_check_constraint_online(check, table, f'"{column}" IS NOT NULL')
+    with op.get_context().autocommit_block():
+        op.execute(f'ALTER TABLE "{table}" ALTER COLUMN "{column}" SET NOT NULL')
+        op.execute(f'ALTER TABLE "{table}" DROP CONSTRAINT "{check}"')
+
+
+# ---------------------------------------------------------
+# Backfills
+# ---------------------------------------------------------
+def backfill(
+    table: str,
+    assignments: str,
+    where: str,
+    pk: str = "id",
+    batch_size: int = 5000,
+    pause: float = 0.0,
+) -> int:
+    """
+    UPDATE table SET <assignments> WHERE <where>, `batch_size` rows per
+    committed transaction, so row locks are short and autovacuum keeps up.
+    `where` must stop matching once a row is done (e.g. "col IS NULL"),
+    otherwise this never finishes. Returns the number of rows updated.
+    """
+    statement = text(
+        f'UPDATE "{table}" SET {assignments} WHERE "{pk}" IN ('
+        f'SELECT "{pk}" FROM "{table}" WHERE {where} LIMIT :batch_size)'
+    )
+
+    total = 0
+    with op.get_context().autocommit_block():
+        while True:
+            updated = op.get_bind().execute(statement, {"batch_size": batch_size}).rowcount
+            total += updated
+            if updated < batch_size:
+                return total
+            if pause:
+                time.sleep(pause)
+
+
+# ---------------------------------------------------------
+# Partitioning in place
+# ---------------------------------------------------------
+def partition_table_online(
+    table: str,
+    pk: str,
+    column: str = "created_at",
+    foreign_keys: Iterable[str] = (),
+    indexes: Optional[Dict[str, List[str]]] = None,
+    premake: int = 3,
+):
+    """
+    Turn `table` into a table partitioned by month on `column` without
+    copying it: the existing table becomes the partition of everything
+    before boundary B (two months ahead, so rows written during the
+    migration still belong to it) and is dropped whole by retention later.
+
+    Online, before the swap: a validated CHECK (column < B) lets ATTACH skip
+    its scan, the (pk, column) unique index and the missing `indexes`
+    ({name: columns}) are built concurrently on the old table. The swap is
+    one short transaction of catalog changes, committed at once: rename,
+    new parent, ATTACH, monthly and default partitions, then `foreign_keys`
+    ("FOREIGN KEY (...) REFERENCES ..." clauses) and `indexes` on the
+    parent, which adopt the old table's matching ones and only check the
+    empty new partitions.
+    """
+    indexes = indexes or {}
+    boundary = partitioning.add_months(partitioning.month_start(), 2)
+    legacy = partitioning.legacy_partition_name(table, boundary)
+    high = int(boundary.timestamp())
+    check = f"{table}_partition_bound"[:63]
+    conn = op.get_bind()
+
+    def legacy_index(columns):
+        return f"{legacy}_{'_'.join(columns)}_idx"[:63]
+
+    add_check_constraint_online(check, table, f'"{column}" IS NOT NULL AND "{column}" < {high}')
+    create_index_concurrently(f"{legacy}_pkey", table, [pk, column], unique=True)
+    existing = set(conn.execute(
+        text("SELECT indexname FROM pg_indexes WHERE tablename = :table AND schemaname = current_schema()"),
+        {"table": table},
+    ).scalars())
+    for name, columns in indexes.items():
+        if name not in existing:
+            create_index_concurrently(legacy_index(columns), table, columns)
+
+    old_pkey = conn.execute(
+        text("SELECT conname FROM pg_constraint WHERE conrelid = CAST(:table AS regclass) AND contype = 'p'"),
+        {"table": table},
+    ).scalar()
+    sequence = conn.execute(
+        text("SELECT pg_get_serial_sequence(:table, :column)"), {"table": table, "column": pk}
+    ).scalar()
+
+    op.execute(f'ALTER TABLE "{table}" RENAME TO "{legacy}"')
+    for name, columns in indexes.items():
+        op.execute(f'ALTER INDEX IF EXISTS "{name}" RENAME TO "{legacy_index(columns)}"')
+    # the parent only adopts a PRIMARY KEY, not a bare unique index
+    drop_pkey = f'DROP CONSTRAINT "{old_pkey}", ' if old_pkey else ""
+    op.execute(
+        f'ALTER TABLE "{legacy}" {drop_pkey}'
+        f'ADD CONSTRAINT "{legacy}_pkey" PRIMARY KEY USING INDEX "{legacy}_pkey"'
+    )
+    op.execute(f'CREATE TABLE "{table}" (LIKE "{legacy}" INCLUDING DEFAULTS) PARTITION BY RANGE ("{column}")')
+    op.execute(f'ALTER TABLE "{table}" ADD PRIMARY KEY ("{pk}", "{column}")')
+    if sequence:
+        op.execute(f'ALTER SEQUENCE {sequence} OWNED BY "{table}"."{pk}"')
+    op.execute(f'ALTER TABLE "{table}" ATTACH PARTITION "{legacy}" FOR VALUES FROM (MINVALUE) TO ({high})')
+    op.execute(f'ALTER TABLE "{legacy}" DROP CONSTRAINT "{check}"')
+
+    month = boundary
+    while month <= partitioning.add_months(partitioning.month_start(), premake):
+        partitioning.create_partition(conn, table, month, column)
+        month = partitioning.add_months(month, 1)
+    partitioning.create_default_partition(conn, table)
+
+    for definition in foreign_keys:
+        op.execute(f'ALTER TABLE "{table}" ADD {definition}')
+    for name, columns in indexes.items():
+        cols = ", ".join(f'"{c}"' for c in columns)
+        op.execute(f'CREATE INDEX "{name}" ON "{table}" ({cols})')
+
+    # commit the swap now: its ACCESS EXCLUSIVE locks must not wait for
+    # the rest of the migration
+    with op.get_context().autocommit_block():
+        pass
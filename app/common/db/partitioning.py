@@ -0,0 +1,326 @@
+"""
+Monthly range partitions on the int epoch `created_at` column.
+
+    partition_table(conn, ...)    -> convert a table by copying it (offline;
+                                     online_migrations.partition_table_online
+                                     converts in place)
+    unpartition_table(conn, ...)  -> the reverse, for downgrades
+    maintain_partitions(conn)     -> pre-create upcoming months, drop expired ones
+
+Partitions are named "<table>_pYYYYMM" and cover [first second of the month,
+first second of the next month) in UTC. Retention detaches and drops whole
+months: O(1), no DELETE bloat, and every month's indexes stay small.
+A table converted in place keeps its old rows in one "<table>_beforeYYYYMM"
+partition (everything before that month), dropped whole once retention
+has passed all of it. "<table>_default" catches rows no month covers, so
+inserts keep working if maintenance falls behind; create_partition()
+moves them out when their month is made.
+
+Everything here takes a *sync* Connection (op.get_bind(), or
+AsyncConnection.run_sync) and is Postgres only.
+"""
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger("app.db.partitions")
+
+# table -> partition key; retention lives in settings.DB_PARTITION_RETENTION_MONTHS
+PARTITIONED_TABLES: Dict[str, str] = {
+    "refresh_tokens": "created_at",
+    "one_time_passwords": "created_at",
+    "password_history": "created_at",
+    "login_attempt": "created_at",
+    "access_log": "created_at",
+}
+
+_LOCK_TIMEOUT = "5s"
+
+
+# ---------------------------------------------------------
+# Month arithmetic
+# ---------------------------------------------------------
+def month_start(moment: Optional[datetime] = None) -> datetime:
+    moment = moment or datetime.now(timezone.utc)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    moment = moment.astimezone(timezone.utc)
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def month_bounds(month: datetime) -> tuple:
+    """(from, to) epoch seconds of the partition holding `month`."""
+    return int(month.timestamp()), int(add_months(month, 1).timestamp())
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def partition_month(table: str, name: str) -> Optional[datetime]:
+    return _name_month(table, "_p", name)
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def legacy_partition_name(table: str, boundary: datetime) -> str:
+    """The pre-partitioning table, holding every row before `boundary`."""
+    return f"{table}_before{boundary:%Y%m}"
+
+
+def legacy_partition_boundary(table: str, name: str) -> Optional[datetime]:
+    return _name_month(table, "_before", name)
+
+
+def _name_month(table: str, infix: str, name: str) -> Optional[datetime]:
+    match = re.fullmatch(re.escape(table + infix) + r"(\d{4})(\d{2})", name)
+    if not match:
+        return None
+    return datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+
+
+# ---------------------------------------------------------
+# Catalog
+# ---------------------------------------------------------
+def is_partitioned(conn, table: str) -> bool:
+    return conn.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = :table AND pg_table_is_visible(c.oid)"
+        ),
+        {"table": table},
+    ).first() is not None
+
+
+def list_partitions(conn, table: str) -> List[str]:
+    return list(conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = :table AND pg_table_is_visible(parent.oid) "
+            "ORDER BY child.relname"
+        ),
+        {"table": table},
+    ).scalars())
+
+
+# ---------------------------------------------------------
+# DDL
+# ---------------------------------------------------------
+def default_rows(
+    conn, table: str, column: Optional[str] = None, low: Optional[int] = None, high: Optional[int] = None
+) -> int:
+    """Rows in the DEFAULT partition (within [low, high) if given); 0 without one."""
+    default = default_partition_name(table)
+    if default not in list_partitions(conn, table):
+        return 0
+    column = column or PARTITIONED_TABLES.get(table, "created_at")
+    where = f'WHERE "{column}" >= {low} AND "{column}" < {high}' if low is not None else ""
+    return conn.execute(text(f'SELECT count(*) FROM "{default}" {where}')).scalar()
+
+
+def create_partition(conn, table: str, month: datetime, column: Optional[str] = None) -> bool:
+    """Create the month's partition; False if it already exists."""
+    name = partition_name(table, month)
+    if name in list_partitions(conn, table):
+        return False
+    column = column or PARTITIONED_TABLES.get(table, "created_at")
+    low, high = month_bounds(month)
+
+    if not default_rows(conn, table, column, low, high):
+        conn.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" FOR VALUES FROM ({low}) TO ({high})'
+        ))
+        return True
+
+    # the month's rows went to the default partition while it was missing;
+    # PARTITION OF would fail on them: build the month aside, move them, attach
+    default = default_partition_name(table)
+    conn.execute(text(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS)'))
+    conn.execute(text(
+        f'WITH moved AS (DELETE FROM "{default}" WHERE "{column}" >= {low} AND "{column}" < {high} RETURNING *) '
+        f'INSERT INTO "{name}" SELECT * FROM moved'
+    ))
+    conn.execute(text(f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" FOR VALUES FROM ({low}) TO ({high})'))
+    logger.warning("Moved rows of %s out of the default partition into %s", table, name)
+    return True
+
+
+def create_default_partition(conn, table: str):
+    conn.execute(text(
+        f'CREATE TABLE IF NOT EXISTS "{default_partition_name(table)}" PARTITION OF "{table}" DEFAULT'
+    ))
+
+
+def drop_partition(conn, table: str, name: str):
+    # plain DETACH (CONCURRENTLY cannot run in a transaction); the lock is
+    # brief but must not queue behind a long reader and stall every writer
+    conn.execute(text(f"SET LOCAL lock_timeout = '{_LOCK_TIMEOUT}'"))
+    conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+    conn.execute(text(f'DROP TABLE "{name}"'))
+
+
+def partition_table(conn, table: str, pk: str, column: str = "created_at",
+                    ddl: Iterable[str] = (), premake: int = 3):
+    """
+    Rebuild `table` as a table partitioned by month on `column`, copying its
+    rows. The primary key becomes (pk, column) (Postgres requires the
+    partition key in every unique constraint); foreign keys and indexes are
+    not carried over, pass them in `ddl` (run after the copy).
+    """
+    legacy = f"{table}_unpartitioned"
+    conn.execute(text(f'ALTER TABLE "{table}" RENAME TO "{legacy}"'))
+    conn.execute(text(
+        f'CREATE TABLE "{table}" (LIKE "{legacy}" INCLUDING DEFAULTS) PARTITION BY RANGE ("{column}")'
+    ))
+
+    oldest = conn.execute(text(f'SELECT min("{column}") FROM "{legacy}"')).scalar()
+    current = month_start()
+    month = month_start(datetime.fromtimestamp(oldest, timezone.utc)) if oldest is not None else current
+    while month <= add_months(current, premake):
+        create_partition(conn, table, month, column)
+        month = add_months(month, 1)
+    create_default_partition(conn, table)
+
+    _move_rows(conn, legacy, table, pk)
+    conn.execute(text(f'ALTER TABLE "{table}" ADD PRIMARY KEY ("{pk}", "{column}")'))
+    for statement in ddl:
+        conn.execute(text(statement))
+
+
+def unpartition_table(conn, table: str, pk: str, ddl: Iterable[str] = ()):
+    """Reverse of partition_table(): one plain table, primary key (pk,)."""
+    legacy = f"{table}_partitioned"
+    conn.execute(text(f'ALTER TABLE "{table}" RENAME TO "{legacy}"'))
+    conn.execute(text(f'CREATE TABLE "{table}" (LIKE "{legacy}" INCLUDING DEFAULTS)'))
+    _move_rows(conn, legacy, table, pk)
+    conn.execute(text(f'ALTER TABLE "{table}" ADD PRIMARY KEY ("{pk}")'))
+    for statement in ddl:
+        conn.execute(text(statement))
+
+
+def _move_rows(conn, source: str, target: str, pk: str):
+    # the serial sequence belongs to the old table's column: hand it over
+    # before the old table (and with it the sequence) is dropped
+    sequence = conn.execute(
+        text("SELECT pg_get_serial_sequence(:table, :column)"), {"table": source, "column": pk}
+    ).scalar()
+    if sequence:
+        conn.execute(text(f'ALTER SEQUENCE {sequence} OWNED BY "{target}"."{pk}"'))
+
+    conn.execute(text(f'INSERT INTO "{target}" SELECT * FROM "{source}"'))
+    conn.execute(text(f'DROP TABLE "{source}" CASCADE'))
+
+
+# ---------------------------------------------------------
+# Maintenance (scheduled job / `nova db partitions`)
+# ---------------------------------------------------------
+def maintain_partitions(
+    conn,
+    now: Optional[datetime] = None,
+    premake: Optional[int] = None,
+    retention: Optional[Dict[str, int]] = None,
+    dry_run: bool = False,
+) -> Dict[str, Dict]:
+    """
+    For every partitioned table in PARTITIONED_TABLES: make sure this month
+    and the next `premake` exist, drop months older than the table's
+    retention. Returns {table: {"created": [...], "dropped": [...],
+    "failed": [...], "months_ahead": n, "default_rows": n}}; months_ahead
+    counts the months after this one that exist once the run is done
+    (dry run: now).
+
+    `conn` is a commit-as-you-go connection (engine.connect(), not
+    engine.begin()): every create and drop commits on its own, so a DETACH
+    hitting its lock_timeout only rolls back that partition. Failures are
+    logged, listed under "failed" and the run carries on.
+    """
+    from config.config import settings
+
+    premake = settings.DB_PARTITION_PREMAKE_MONTHS if premake is None else premake
+    retention = settings.DB_PARTITION_RETENTION_MONTHS if retention is None else retention
+    current = month_start(now)
+
+    report: Dict[str, Dict] = {}
+    for table in PARTITIONED_TABLES:
+        try:
+            if not is_partitioned(conn, table):
+                logger.debug("%s is not partitioned, skipping", table)
+                continue
+            report[table] = _maintain_table(conn, table, current, premake, retention.get(table), dry_run)
+        except Exception:
+            logger.exception("Partition maintenance of %s failed", table)
+            if not dry_run:
+                conn.rollback()
+    return report
+
+
+def _maintain_table(conn, table: str, current: datetime, premake: int, keep: Optional[int], dry_run: bool) -> Dict:
+    created, dropped, failed = [], [], []
+    existing = set(list_partitions(conn, table))
+    for offset in range(premake + 1):
+        month = add_months(current, offset)
+        name = partition_name(table, month)
+        if name in existing:
+            continue
+        if dry_run or _in_own_transaction(conn, table, name, create_partition, conn, table, month):
+            created.append(name)
+        else:
+            failed.append(name)
+
+    if keep:
+        # the current month counts: keep=3 in May keeps March, April, May
+        cutoff = add_months(current, -(keep - 1))
+        for name in sorted(existing):
+            month = partition_month(table, name)
+            # a converted table's old rows all lie before its boundary
+            boundary = legacy_partition_boundary(table, name)
+            if (month is not None and month < cutoff) or (boundary is not None and boundary <= cutoff):
+                if dry_run or _in_own_transaction(conn, table, name, drop_partition, conn, table, name):
+                    dropped.append(name)
+                else:
+                    failed.append(name)
+
+    present = existing if dry_run else existing | set(created)
+    ahead = 0
+    while partition_name(table, add_months(current, ahead + 1)) in present:
+        ahead += 1
+    in_default = default_rows(conn, table)
+
+    if created or dropped:
+        logger.info("Partitions of %s: created %s, dropped %s", table, created, dropped)
+    if ahead < 1:
+        logger.warning("%s has no partition for next month: its rows will go to the default partition", table)
+    if in_default:
+        logger.warning(
+            "%s has %d rows in its default partition: maintenance fell behind", table, in_default
+        )
+    return {
+        "created": created, "dropped": dropped, "failed": failed,
+        "months_ahead": ahead, "default_rows": in_default,
+    }
+
+
+def _in_own_transaction(conn, table: str, name: str, step, *args) -> bool:
+    """Run one create/drop and commit it; on failure roll back, log and return False."""
+    try:
+        conn.commit()   # end the catalog reads' transaction first
+        step(*args)
+        conn.commit()
+        return True
+    except Exception:
+        conn.rollback()
+        logger.exception("Partition maintenance of %s: %s of %s failed", table, step.__name__, name)
+        return False
@@ -1,5 +1,7 @@
 import sys
+import uuid
 import asyncio
+import functools
 import logging
 from typing import AsyncGenerator, Optional, Dict, Any
 from sqlalchemy.engine.url import make_url
@@ -9,10 +11,13 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine
 )
 
+from app.common.db.instrumentation import instrument_engine
+from app.common.db.mixins import soft_delete  # noqa: F401  (registers the global soft-delete criteria)
 from config.config import settings
 
-from sqlalchemy.orm import declarative_base, declared_attr
+from sqlalchemy.orm import Session, declarative_base, declared_attr
 from sqlalchemy import Column, Integer, DateTime, event, MetaData
+from sqlalchemy.engine import Engine
 from datetime import datetime
 import os
 
@@ -98,6 +103,48 @@ def _normalize_db_url_for_async(url: str) -> str:
             return url
 
 
+# ---------------------------------------------------------
+# Engine options per statement caching mode
+# ---------------------------------------------------------
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4().hex}__"
+
+
+def engine_options(db_url: str, mode: str | None = None) -> Dict[str, Any]:
+    """
+    Keyword arguments for create_async_engine() in the given
+    DB_STATEMENT_MODE (direct | pgbouncer | disabled).
+    """
+    mode = mode or settings.DB_STATEMENT_MODE
+
+    options: Dict[str, Any] = {
+        "pool_pre_ping": True,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "query_cache_size": settings.DB_COMPILED_CACHE_SIZE,
+    }
+
+    if "asyncpg" not in db_url:
+        return options
+
+    cache_size = settings.DB_PREPARED_STATEMENT_CACHE_SIZE
+
+    if mode == "disabled":
+        connect_args = {"prepared_statement_cache_size": 0}
+    elif mode == "pgbouncer":
+        # opt-in: only PgBouncer >= 1.21 (max_prepared_statements > 0) keeps
+        # prepared statements across server connections
+        connect_args = {
+            "prepared_statement_cache_size": cache_size if cache_size is not None else 0,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+    else:
+        connect_args = {"prepared_statement_cache_size": cache_size if cache_size is not None else 100}
+
+    options["connect_args"] = connect_args
+    return options
+
+
 # ---------------------------------------------------------
 # Initialize DB engine (called on startup)
 # ---------------------------------------------------------
@@ -129,16 +176,15 @@ async def init_db(app=None, echo: bool | None = None):
     if "asyncpg" not in db_url:
         db_url = db_url.replace("postgresql://", "postgresql+asyncpg://")
 
-    logger.info(f"Initializing DB engine: {db_url}")
+    logger.info(f"Initializing DB engine: {db_url} (statement mode: {settings.DB_STATEMENT_MODE})")
 
     engine = create_async_engine(
         db_url,
         echo=(echo if echo is not None else settings.DB_ECHO),
         future=True,
-        pool_pre_ping=True,
-        pool_size=10,
-        max_overflow=20
+        **engine_options(db_url),
     )
+    instrument_engine(engine)
 
     # Add event listener to set search_path for each connection
     # @event.listens_for(_engine.sync_engine, "connect")
@@ -241,8 +287,80 @@ async def close_db():
 # **********************************************************************************************************************
 
 
+# ---------------------------------------------------------
+# Early connection release
+# A session checks a pooled connection out on its first execute and gives it
+# back on commit/rollback. Read-only handlers never commit, so they used to
+# hold the connection until get_db closed the session, i.e. until the
+# response had been serialized and sent.
+# ---------------------------------------------------------
+_WRITES_KEY = "db_writes"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _track_writes(conn, cursor, statement, parameters, context, executemany):
+    # every statement reaches the cursor here: ORM queries and flushes, Core
+    # and exec_driver_sql() on session.connection(). Anything not compiled
+    # from a SELECT is a write; raw SQL too, we can't tell what it does.
+    compiled = getattr(context, "compiled", None)
+    if not getattr(getattr(compiled, "statement", None), "is_select", False):
+        conn.info[_WRITES_KEY] = True
+
+
+@event.listens_for(Session, "after_begin")
+def _reset_writes(session, transaction, connection):
+    # conn.info lives as long as the DBAPI connection: start each transaction clean
+    connection.info.pop(_WRITES_KEY, None)
+
+
+def _has_written(connection) -> bool:
+    return bool(connection.info.get(_WRITES_KEY))
+
+
+async def release_connection(session: AsyncSession) -> bool:
+    """
+    Return the session's connection to the pool now if its transaction has
+    only read. Commit (not rollback) so loaded objects stay usable
+    (expire_on_commit=False). Sessions with writes or pending changes are left
+    alone, so close() still rolls those back.
+    """
+    if not session.in_transaction():
+        return False
+    if session.new or session.dirty or session.deleted:
+        return False
+    # in a transaction: the connection it already holds, no checkout
+    connection = await session.connection()
+    if _has_written(connection.sync_connection):
+        return False
+
+    await session.commit()
+    return True
+
+
+def release_db_after(endpoint):
+    """
+    Wrap a route handler so the sessions it received are released as soon as
+    it returns, before the response is serialized and sent. Used by
+    BaseController.register_routes.
+    """
+    if not asyncio.iscoroutinefunction(endpoint):
+        return endpoint
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        result = await endpoint(*args, **kwargs)
+        for value in kwargs.values():
+            if isinstance(value, AsyncSession):
+                await release_connection(value)
+        return result
+
+    return wrapper
+
+
 # ---------------------------------------------------------
 # DB Dependency for FastAPI
+# No connection is taken here: the session checks one out on its first
+# execute, so handlers that never touch the DB never wait on the pool.
 # ---------------------------------------------------------
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     if not AsyncSessionLocal:
@@ -1,14 +1,159 @@
-from typing import Callable, Awaitable
+import asyncio
+import inspect
+import logging
+import random
+from typing import Callable, Awaitable, List, Optional
+
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.common.db.transaction import transaction
+
+from app.common.exceptions import TransactionRetriesExhausted
+
+logger = logging.getLogger("app.db")
+
+# serialization_failure, deadlock_detected
+RETRYABLE_SQLSTATES = {"40001", "40P01"}
+
+_STATE_KEY = "unit_of_work"
+
+
+def sqlstate(exc: BaseException) -> Optional[str]:
+    """SQLSTATE of a DBAPIError for asyncpg (via the adapted error) and psycopg."""
+    orig = getattr(exc, "orig", None)
+    for source in (orig, getattr(orig, "__cause__", None), getattr(orig, "diag", None)):
+        code = getattr(source, "pgcode", None) or getattr(source, "sqlstate", None)
+        if code:
+            return code
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    return isinstance(exc, DBAPIError) and sqlstate(exc) in RETRYABLE_SQLSTATES
+
 
 class UnitOfWork:
-    def __init__(self, session: AsyncSession):
+    """
+    One transaction around `func`, with:
+
+      - retry on deadlock / serialization failure (jittered exponential
+        backoff); `func` is re-run from scratch, so it must not keep state
+        between attempts
+      - optional isolation level ("SERIALIZABLE", "REPEATABLE READ", ...)
+      - nesting: a unit started inside another one on the same session runs
+        in a SAVEPOINT and never retries on its own
+      - after-commit hooks, run only once the outermost transaction commits
+      - TransactionRetriesExhausted once the retries are used up
+
+    Usage:
+        uow = UnitOfWork(db, isolation_level="SERIALIZABLE")
+
+        async def logic():
+            db.add(user)
+            uow.after_commit(model_cache.invalidate, User, user.user_id)
+            return user
+
+        user = await uow.run(logic)
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        isolation_level: Optional[str] = None,
+        retries: int = 3,
+        backoff: float = 0.05,
+        max_backoff: float = 1.0,
+    ):
         self.session = session
+        self.isolation_level = isolation_level
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    # -------------------------
+    # HOOKS
+    # -------------------------
+
+    def after_commit(self, fn: Callable, *args, **kwargs):
+        after_commit(self.session, fn, *args, **kwargs)
+
+    # -------------------------
+    # RUN
+    # -------------------------
 
     async def run(self, func: Callable[..., Awaitable], *args, **kwargs):
-        async with transaction(self.session):
-            return await func(*args, **kwargs)
+        hook_stack = self.session.info.get(_STATE_KEY)
+        if hook_stack is not None:
+            return await self._run_nested(hook_stack, func, *args, **kwargs)
+
+        if self.isolation_level and self.session.in_transaction():
+            raise RuntimeError("isolation_level must be set before the session's transaction begins")
+
+        attempt = 0
+        while True:
+            attempt += 1
+            hooks: List[tuple] = []
+            self.session.info[_STATE_KEY] = [hooks]
+            try:
+                if self.isolation_level:
+                    await self.session.connection(execution_options={"isolation_level": self.isolation_level})
+
+                result = await func(*args, **kwargs)
+                await self.session.commit()
+            except Exception as exc:
+                await self.session.rollback()
+                if not is_retryable(exc):
+                    raise
+                if attempt > self.retries:
+                    logger.warning("Transaction gave up after %d attempts (%s)", attempt, sqlstate(exc))
+                    raise TransactionRetriesExhausted() from exc
+
+                delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+                delay = random.uniform(0, delay)  # full jitter: spread the retrying writers apart
+                logger.info("Retrying transaction (attempt %d, %s) in %.3fs", attempt, sqlstate(exc), delay)
+                await asyncio.sleep(delay)
+                continue
+            finally:
+                self.session.info.pop(_STATE_KEY, None)
+
+            await _run_hooks(hooks)
+            return result
+
+    async def _run_nested(self, hook_stack: List[list], func, *args, **kwargs):
+        hooks: List[tuple] = []
+        hook_stack.append(hooks)
+        try:
+            async with self.session.begin_nested():
+                result = await func(*args, **kwargs)
+        except Exception:
+            # savepoint rolled back: its hooks are dropped with it
+            hook_stack.pop()
+            raise
+
+        hook_stack.pop()
+        hook_stack[-1].extend(hooks)
+        return result
+
+
+def after_commit(session: AsyncSession, fn: Callable, *args, **kwargs):
+    """
+    Queue `fn(*args, **kwargs)` (sync or async) to run after the current
+    UnitOfWork on `session` commits. Dropped on rollback or retry.
+    """
+    hook_stack = session.info.get(_STATE_KEY)
+    if hook_stack is None:
+        raise RuntimeError("after_commit() called outside a UnitOfWork")
+    hook_stack[-1].append((fn, args, kwargs))
+
+
+async def _run_hooks(hooks: List[tuple]):
+    # the data is committed: a failing side effect must not fail the request
+    for fn, args, kwargs in hooks:
+        try:
+            result = fn(*args, **kwargs)
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            logger.exception("after_commit hook %r failed", fn)
 
 
 
@@ -0,0 +1,151 @@
+"""
+Boot-time warm-up, so the first requests after a deploy don't pay for
+connection setup, asyncpg type introspection, statement compilation or
+empty caches.
+
+    register_hot_query("users.by_username", lambda: select(User).where(User.username == ""))
+
+    @register_primer("settings")
+    async def prime_settings(session): ...
+
+warm_up() opens DB_POOL_SIZE connections at once (TCP/TLS and auth
+handshakes), runs every hot query on each of them and then every primer.
+Compiled SQL (per engine) and prepared statements (per asyncpg connection)
+are keyed by the SQL text, not by the parameters, so hot queries are built
+with placeholder values. /health answers 503 until warm-up has finished
+(or DB_WARMUP_TIMEOUT passed), which keeps a fresh worker out of rotation.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from config.config import settings
+
+logger = logging.getLogger("app.db.warmup")
+
+# name -> factory returning the statement, built at warm-up (after all mappers exist)
+_hot_queries: Dict[str, Callable[[], Any]] = {}
+# name -> async fn(session) filling an in-process cache
+_primers: Dict[str, Callable[[Any], Awaitable[Any]]] = {}
+
+
+def register_hot_query(name: str, factory: Callable[[], Any]):
+    _hot_queries[name] = factory
+
+
+def register_primer(name: str, fn: Callable = None):
+    """Register `fn(session)` to run once at warm-up; usable as a decorator."""
+    if fn is None:
+        return lambda f: register_primer(name, f)
+    _primers[name] = fn
+    return fn
+
+
+class Warmup:
+    def __init__(self):
+        self.ready = False
+        self.seconds: Optional[float] = None
+        self.errors: Dict[str, str] = {}   # step -> first error
+        self._task: Optional[asyncio.Task] = None
+
+    # -------------------------
+    # LIFECYCLE
+    # -------------------------
+
+    async def start(self, engine, session_factory):
+        """Warm up in the background; `ready` flips when done."""
+        if self._task is not None:
+            return
+        if engine is None or not settings.DB_WARMUP_ENABLED:
+            self.ready = True
+            return
+        self._task = asyncio.create_task(self._run(engine, session_factory))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, engine, session_factory):
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.warm_up(engine, session_factory), settings.DB_WARMUP_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.errors["timeout"] = f"gave up after {settings.DB_WARMUP_TIMEOUT}s"
+        except Exception as exc:
+            logger.exception("Warm-up failed")
+            self.errors["warm_up"] = f"{type(exc).__name__}: {exc}"
+        finally:
+            # warm-up only saves latency: serve traffic even when it failed
+            self.seconds = time.perf_counter() - started
+            self.ready = True
+
+        if self.errors:
+            logger.warning(
+                "Warm-up finished in %.2fs with errors: %s",
+                self.seconds, "; ".join(f"{k}: {v}" for k, v in self.errors.items()),
+            )
+        else:
+            logger.info("Warm-up finished in %.2fs", self.seconds)
+
+    # -------------------------
+    # WARM-UP
+    # -------------------------
+
+    async def warm_up(self, engine, session_factory):
+        statements = []
+        for name, factory in _hot_queries.items():
+            try:
+                statements.append((name, factory()))
+            except Exception as exc:
+                self.errors.setdefault(f"hot query {name}", str(exc))
+
+        # hold every connection until all are open, or the pool hands
+        # the same few back and the rest stay cold
+        opened = await asyncio.gather(
+            *(engine.connect().start() for _ in range(settings.DB_POOL_SIZE)),
+            return_exceptions=True,
+        )
+        connections = [c for c in opened if not isinstance(c, BaseException)]
+        for exc in opened:
+            if isinstance(exc, BaseException):
+                self.errors.setdefault("connect", str(exc))
+
+        try:
+            await asyncio.gather(*(self._warm_connection(c, session_factory, statements) for c in connections))
+        finally:
+            for conn in connections:
+                await conn.close()
+
+        logger.info(
+            "Warmed %d connections with %d hot queries", len(connections), len(statements)
+        )
+
+        for name, primer in _primers.items():
+            try:
+                async with session_factory() as session:
+                    await primer(session)
+            except Exception as exc:
+                logger.warning("Cache primer %s failed", name, exc_info=True)
+                self.errors[f"primer {name}"] = str(exc)
+
+    async def _warm_connection(self, conn, session_factory, statements):
+        # through a session like a request, so ORM compilation and the
+        # global loader criteria (soft delete) produce the same SQL
+        async with session_factory(bind=conn) as session:
+            for name, stmt in statements:
+                try:
+                    await session.execute(stmt)
+                except Exception as exc:
+                    # an error aborts the transaction; the next execute begins a new one
+                    await session.rollback()
+                    self.errors.setdefault(f"hot query {name}", str(exc))
+            await session.rollback()
+
+
+warmup = Warmup()
@@ -0,0 +1,185 @@
+"""
+Write-behind buffer for "touch" columns (last_used_at, last_login_at, ...).
+
+    write_behind.touch(RefreshToken, token.token_id, last_used_at=now)
+
+Updates are coalesced in memory per (model, primary key) -- the last value
+wins -- and flushed every WRITE_BEHIND_FLUSH_SECONDS (or as soon as
+WRITE_BEHIND_MAX_PENDING keys are waiting) as one statement per model:
+
+    UPDATE refresh_tokens AS t SET last_used_at = v.last_used_at
+    FROM (VALUES (...), (...)) AS v (token_id, last_used_at)
+    WHERE t.token_id = v.token_id
+
+The request never waits on these writes. A crash loses at most one flush
+interval; kernel shutdown flushes what is pending. Only use it for values
+that are fine to lose or arrive late.
+
+The raw UPDATE bypasses mapper events, so the flushed keys of cached
+models are invalidated in model_cache once it commits.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+
+from app.core.cache.model_cache import model_cache
+from config.config import settings
+
+logger = logging.getLogger("app.db.write_behind")
+
+# rows per UPDATE; keeps bind parameters far below Postgres' 32767 limit
+BATCH_SIZE = 1000
+
+
+class WriteBehindBuffer:
+    def __init__(self):
+        # model -> {pk value: {column: value}}
+        self._pending: Dict[type, Dict[Any, Dict[str, Any]]] = {}
+        self._size = 0
+        self._engine = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+
+    # -------------------------
+    # LIFECYCLE
+    # -------------------------
+
+    async def start(self, engine):
+        if self._task is not None or engine is None:
+            return
+        self._engine = engine
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._worker())
+        logger.info("Write-behind buffer started (flush every %ss)", settings.WRITE_BEHIND_FLUSH_SECONDS)
+
+    async def stop(self):
+        if self._task is not None:
+            # let the worker finish the flush it may be in, rather than
+            # cancelling it halfway through
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        if self._engine is not None:
+            await self.flush()
+        self._engine = None
+
+    # -------------------------
+    # COLLECTION (sync, hot path)
+    # -------------------------
+
+    def touch(self, model, key, **values):
+        """Queue `UPDATE model SET **values WHERE pk = key`; never blocks."""
+        rows = self._pending.setdefault(model, {})
+        row = rows.get(key)
+        if row is None:
+            rows[key] = dict(values)
+            self._size += 1
+            if self._size >= settings.WRITE_BEHIND_MAX_PENDING and self._wakeup is not None:
+                self._wakeup.set()
+        else:
+            row.update(values)
+
+    @property
+    def pending(self) -> int:
+        return self._size
+
+    # -------------------------
+    # FLUSH
+    # -------------------------
+
+    async def _worker(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.WRITE_BEHIND_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Write-behind flush failed")
+
+    async def flush(self):
+        if not self._size or self._engine is None:
+            return
+
+        async with self._lock:
+            pending, self._pending, self._size = self._pending, {}, 0
+            models = list(pending)
+            for i, model in enumerate(models):
+                try:
+                    await self._flush_model(model, pending[model])
+                except Exception:
+                    logger.exception("Write-behind flush of %s failed, re-queueing", model.__tablename__)
+                    self._requeue(model, pending[model])
+                except BaseException:
+                    # cancelled: put back this model and the ones not reached
+                    for rest in models[i:]:
+                        self._requeue(rest, pending[rest])
+                    raise
+
+    def _requeue(self, model, rows: Dict[Any, Dict[str, Any]]):
+        current = self._pending.setdefault(model, {})
+        for key, values in rows.items():
+            if len(current) >= settings.WRITE_BEHIND_MAX_PENDING:
+                logger.warning("Write-behind buffer full, dropping %s updates", model.__tablename__)
+                return
+            if key not in current:
+                current[key] = values
+                self._size += 1
+            else:
+                # touched again meanwhile: the newer values win
+                current[key] = {**values, **current[key]}
+
+    async def _flush_model(self, model, rows: Dict[Any, Dict[str, Any]]):
+        table = model.__table__
+        pk = model.__mapper__.primary_key[0]
+
+        # one statement per distinct set of columns
+        groups: Dict[tuple, list] = {}
+        for key, values in rows.items():
+            groups.setdefault(tuple(sorted(values)), []).append((key, values))
+
+        async with self._engine.begin() as conn:
+            for columns, items in groups.items():
+                for start in range(0, len(items), BATCH_SIZE):
+                    sql, params = _update_from_values(
+                        conn.dialect, table, pk, columns, items[start:start + BATCH_SIZE]
+                    )
+                    await conn.execute(text(sql), params)
+
+        await model_cache.invalidate(model, *rows)
+
+
+def _update_from_values(dialect, table, pk, columns: tuple, items: list):
+    # explicit casts: VALUES rows carry no column types of their own
+    names = (pk.name,) + columns
+    types = {name: table.c[name].type.compile(dialect=dialect) for name in names}
+
+    rows, params = [], {}
+    for i, (key, values) in enumerate(items):
+        placeholders = []
+        for name in names:
+            param = f"{name}_{i}"
+            params[param] = key if name == pk.name else values[name]
+            placeholders.append(f"CAST(:{param} AS {types[name]})")
+        rows.append("(" + ", ".join(placeholders) + ")")
+
+    assignments = ", ".join(f'"{name}" = v."{name}"' for name in columns)
+    column_list = ", ".join(f'"{name}"' for name in names)
+    sql = (
+        f'UPDATE "{table.name}" AS t SET {assignments} '
+        f"FROM (VALUES {', '.join(rows)}) AS v ({column_list}) "
+        f'WHERE t."{pk.name}" = v."{pk.name}"'
+    )
+    return sql, params
+
+
+write_behind = WriteBehindBuffer()
@@ -0,0 +1,62 @@
+import hashlib
+import re
+from typing import Iterable, Optional
+
+from fastapi import HTTPException
+
+from app.common.exceptions import ConflictError, PreconditionFailed
+
+_ETAG = r'(?:W/)?"[^"]*"'
+_IF_MATCH = re.compile(rf"\s*{_ETAG}\s*(?:,\s*{_ETAG}\s*)*")
+
+
+def version_etag(version) -> str:
+    """Strong ETag for one VersionedMixin row: "3"."""
+    return f'"{version}"'
+
+
+def collection_etag(items: Iterable, key: str, version: str = "version_id") -> str:
+    """Strong ETag over several versioned rows (changes if any row changes)."""
+    parts = sorted(f"{getattr(item, key)}:{getattr(item, version)}" for item in items)
+    return '"' + hashlib.sha1("|".join(parts).encode()).hexdigest()[:20] + '"'
+
+
+def parse_if_match(header: Optional[str]) -> Optional[set]:
+    """
+    None when absent or "*" (no precondition); otherwise the set of strong
+    ETags, empty when all were weak. 400 when the header is malformed.
+    """
+    if not header or header.strip() == "*":
+        return None
+    if not _IF_MATCH.fullmatch(header):
+        raise HTTPException(400, detail="Malformed If-Match header")
+    # If-Match uses strong comparison: weak validators never match
+    return {tag for tag in re.findall(_ETAG, header) if not tag.startswith("W/")}
+
+
+def check_if_match(header: Optional[str], current: str):
+    """Raise ConflictError unless the If-Match header matches the current ETag."""
+    expected = parse_if_match(header)
+    if expected is None:
+        return
+    if not expected:
+        raise PreconditionFailed(etag=current)
+    if current not in expected:
+        raise ConflictError(etag=current)
+
+
+def expected_version(header: Optional[str]) -> Optional[int]:
+    """
+    If-Match: "3" -> 3, for BaseService.update(..., expected_version=).
+    None only without a precondition; a header that cannot name exactly one
+    version (weak, several, not a number) is a 412, never "no check".
+    """
+    expected = parse_if_match(header)
+    if expected is None:
+        return None
+    if len(expected) != 1:
+        raise PreconditionFailed()
+    try:
+        return int(next(iter(expected)).strip('"'))
+    except ValueError:
+        raise PreconditionFailed()
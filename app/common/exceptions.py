@@ -0,0 +1,40 @@
+from typing import Dict, Optional
+
+from fastapi import HTTPException
+
+
+class ConflictError(HTTPException):
+    """
+    409: the row changed since the client read it (optimistic concurrency,
+    see VersionedMixin). The client should reload and retry its edit.
+    """
+
+    def __init__(
+        self,
+        detail: str = "The record was modified by someone else. Reload and try again.",
+        etag: Optional[str] = None,
+    ):
+        headers: Optional[Dict[str, str]] = {"ETag": etag} if etag else None
+        super().__init__(status_code=409, detail=detail, headers=headers)
+
+
+class PreconditionFailed(HTTPException):
+    """
+    412: the If-Match header can never match the current version, e.g. only
+    weak validators, several versions for one row, or a non-numeric version.
+    """
+
+    def __init__(self, detail: str = "If-Match does not name a single current version.", etag: Optional[str] = None):
+        headers: Optional[Dict[str, str]] = {"ETag": etag} if etag else None
+        super().__init__(status_code=412, detail=detail, headers=headers)
+
+
+class TransactionRetriesExhausted(Exception):
+    """
+    A UnitOfWork kept hitting deadlocks / serialization failures and gave
+    up. Not an HTTP error: controllers answer 503 with Retry-After.
+    """
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("The server is busy, please retry")
+        self.retry_after = retry_after
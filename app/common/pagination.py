@@ -0,0 +1,30 @@
+import base64
+import json
+from typing import Any, List, Optional
+
+
+# -----------------------
+# KEYSET CURSORS
+# An opaque, url-safe token holding the sort spec and the
+# last row's sort key(s), e.g. {"s": "-created_at", "k": [1700000000, "<uuid>"]}
+# -----------------------
+def encode_cursor(sort: Optional[str], keys: List[Any]) -> str:
+    payload = json.dumps({"s": sort, "k": keys}, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Optional[str], List[Any]]:
+    """
+    Returns (sort, keys). Raises ValueError on a malformed cursor.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        sort, keys = payload["s"], payload["k"]
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+    if not isinstance(keys, list):
+        raise ValueError("Invalid cursor")
+
+    return sort, keys
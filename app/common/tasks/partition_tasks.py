@@ -0,0 +1,39 @@
+import asyncio
+import logging
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.common.db.partitioning import maintain_partitions
+from app.common.db.sessions import _normalize_db_url_for_async
+from app.core.celery_app import celery_app
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def run_partition_maintenance(dry_run: bool = False) -> dict:
+    # own engine: each task run gets a fresh event loop
+    engine = create_async_engine(_normalize_db_url_for_async(settings.DATABASE_URL), poolclass=NullPool)
+    try:
+        # connect(), not begin(): maintain_partitions commits every step itself
+        async with engine.connect() as conn:
+            return await conn.run_sync(maintain_partitions, dry_run=dry_run)
+    finally:
+        await engine.dispose()
+
+
+@celery_app.task(bind=True, name="app.tasks.partition_maintenance", max_retries=3)
+def partition_maintenance_task(self):
+    """Daily: pre-create upcoming monthly partitions, drop expired ones."""
+    try:
+        report = asyncio.run(run_partition_maintenance())
+    except Exception as e:
+        logger.error(f"Partition maintenance failed: {e}")
+        raise self.retry(exc=e, countdown=600)
+
+    failed = {table: changes["failed"] for table, changes in report.items() if changes["failed"]}
+    if failed:
+        # the other tables are done; the retry only redoes what is left
+        raise self.retry(exc=RuntimeError(f"Partition maintenance incomplete: {failed}"), countdown=600)
+    return report
@@ -5,6 +5,7 @@ from typing import Callable
 from fastapi import APIRouter, Depends
 
 from app.core.router import create_module_router
+from app.common.db.sessions import release_db_after
 
 
 
@@ -30,6 +31,7 @@ class DataPayload(BaseModel, Generic[T]):
     data: Union[T, List[T], str]
     countOnPage: Optional[int] = None
     totalCount: Optional[int] = None
+    totalCountKind: Optional[str] = None  # exact | cached | estimate
     perPage: Optional[int] = None
     totalPages: Optional[int] = None
     currentPage: Optional[int] = None
@@ -82,7 +84,7 @@ class BaseController:
 
             if callable(attr) and hasattr(attr, "_route_info"):
                 for method, path, auth, options in attr._route_info:
-                    getattr(self.router, method)(path, **options)(attr)
+                    getattr(self.router, method)(path, **options)(release_db_after(attr))
 
     def payload_response(
             self,
@@ -118,6 +120,7 @@ class BaseController:
                     data=data,
                     countOnPage=len(data),
                     totalCount=pagination.get("total", len(data)) if pagination else len(data),
+                    totalCountKind=pagination.get("total_kind") if pagination else None,
                     perPage=pagination.get("per_page", 25) if pagination else 25,
                     totalPages=pagination.get("total_pages", 1) if pagination else 1,
                     currentPage=pagination.get("page", 1) if pagination else 1,
@@ -10,9 +10,11 @@ async def set_cache(key: str, value: Any, expire: int = 60):
     backend = FastAPICache.get_backend()
     return await backend.set(key, value, expire=expire)
 
-async def delete_cache(key: str):
+async def delete_cache(key: str) -> int:
     backend = FastAPICache.get_backend()
-    # some backends call delete / expire — RedisBackend exposes delete
-    if hasattr(backend, "delete"):
-        return await backend.delete(key)
-    return None
+    # fastapi-cache2 backends have no delete(); clear(key=...) is DEL on Redis
+    try:
+        return await backend.clear(key=key)
+    except KeyError:
+        # InMemoryBackend.clear raises for a key it does not hold
+        return 0
@@ -0,0 +1,333 @@
+"""
+Second-level (read-through) cache for primary-key lookups.
+
+    L1: per-process LRU (short TTL, bounds cross-worker staleness)
+    L2: the FastAPI cache backend (Redis, or in-memory when Redis is off)
+
+Opt in per model:
+
+    @cached_model(ttl=300)
+    class User(IamBaseModel): ...
+
+and read through it with `await model_cache.get(session, User, user_id)`.
+Entries are evicted from L1 when a flush updates/deletes the row, and from
+both levels once the transaction commits. TTLs can be overridden per table
+with settings.MODEL_CACHE_TTL = {"users": 120}.
+
+Columns listed in `exclude` (secrets: password hashes, auth keys, tokens)
+are never written to either level; they stay unloaded on instances served
+from the cache, so code that needs them loads them explicitly:
+
+    await session.refresh(user, attribute_names=["password_hash"])
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from prometheus_client import Counter
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.cache.cache_utils import delete_cache, get_cache, set_cache
+from config.config import settings
+
+log = logging.getLogger("app.cache")
+
+MODEL_CACHE_REQUESTS = Counter(
+    "model_cache_requests_total",
+    "Second-level cache lookups by model and result",
+    ["model", "result"],  # result: local_hit | remote_hit | miss
+)
+
+_PENDING_KEY = "model_cache_pending"
+
+# L2 evictions scheduled from after_commit that have not finished yet
+_invalidations: set = set()
+
+
+class LRUCache:
+    """Tiny TTL-aware LRU used as the in-process L1."""
+
+    def __init__(self, maxsize: int = 1024, ttl: int = 5):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+
+class ModelCache:
+    def __init__(self):
+        self._models: Dict[type, dict] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    # -------------------------
+    # REGISTRATION
+    # -------------------------
+
+    def register(self, model, ttl: int = 60, local_ttl: int = 5, local_size: int = 1024, exclude=()):
+        table = model.__tablename__
+        ttl = getattr(settings, "MODEL_CACHE_TTL", {}).get(table, ttl)
+        self._models[model] = {
+            "ttl": ttl,
+            "local": LRUCache(maxsize=local_size, ttl=min(local_ttl, ttl)),
+            "exclude": frozenset(exclude),
+        }
+        self._stats[table] = {"local_hit": 0, "remote_hit": 0, "miss": 0}
+
+        event.listen(model, "after_update", _on_change)
+        event.listen(model, "after_delete", _on_change)
+        return model
+
+    def is_cached(self, model) -> bool:
+        return model in self._models and getattr(settings, "MODEL_CACHE_ENABLED", True)
+
+    def key(self, model, pk) -> str:
+        return f"mc:{model.__tablename__}:{pk}"
+
+    # -------------------------
+    # READ THROUGH
+    # -------------------------
+
+    async def get(self, session: AsyncSession, model, pk, loader=None):
+        """
+        Returns the instance attached to `session`. On a miss, `loader()`
+        (default: session.get) is awaited and its result cached.
+        """
+        if not self.is_cached(model):
+            return await (loader() if loader else session.get(model, pk))
+
+        obj = await self.lookup(session, model, pk)
+        if obj is not None:
+            return obj
+
+        obj = await (loader() if loader else session.get(model, pk))
+        if obj is not None:
+            await self.store(model, obj)
+        return obj
+
+    async def lookup(self, session: AsyncSession, model, pk):
+        """Cache-only read: the attached instance, or None on a miss."""
+        if not self.is_cached(model):
+            return None
+
+        config = self._models[model]
+        key = self.key(model, pk)
+
+        # L1 holds the JSON string too, so callers can't mutate cached state
+        raw = config["local"].get(key)
+        result = "local_hit"
+
+        if raw is None:
+            try:
+                raw = await get_cache(key)
+            except Exception:
+                log.warning("[model-cache] L2 read failed for %s", key, exc_info=True)
+                raw = None
+
+            if raw is not None:
+                config["local"].set(key, raw)
+                result = "remote_hit"
+
+        if raw is None:
+            self._record(model, "miss")
+            return None
+
+        self._record(model, result)
+        return await _attach(session, model, json.loads(raw))
+
+    async def store(self, model, obj):
+        if not self.is_cached(model):
+            return
+        config = self._models[model]
+        key = self.key(model, _primary_key(obj))
+        raw = json.dumps(_serialize(obj, config["exclude"]), default=str)
+        config["local"].set(key, raw)
+        try:
+            await set_cache(key, raw, expire=config["ttl"])
+        except Exception:
+            log.warning("[model-cache] L2 write failed for %s", key, exc_info=True)
+
+    # -------------------------
+    # INVALIDATION
+    # -------------------------
+
+    def mark_dirty(self, session, model, *pks):
+        """
+        Queue keys for invalidation when `session` commits. Use for writes
+        that bypass mapper events (Core / bulk UPDATE and DELETE).
+        """
+        if not self.is_cached(model):
+            return
+        sync_session = getattr(session, "sync_session", session)
+        pending = sync_session.info.setdefault(_PENDING_KEY, set())
+        for pk in pks:
+            self.evict_local(model, pk)
+            pending.add((model, pk))
+
+    def evict_local(self, model, pk):
+        if model in self._models:
+            self._models[model]["local"].delete(self.key(model, pk))
+
+    async def drain(self):
+        """Wait for L2 evictions scheduled by commits (tests, shutdown)."""
+        while _invalidations:
+            await asyncio.gather(*list(_invalidations), return_exceptions=True)
+
+    async def invalidate(self, model, *pks):
+        if not self.is_cached(model):
+            return
+        for pk in pks:
+            key = self.key(model, pk)
+            self._models[model]["local"].delete(key)
+            try:
+                await delete_cache(key)
+            except Exception:
+                log.warning("[model-cache] L2 delete failed for %s", key, exc_info=True)
+
+    # -------------------------
+    # METRICS
+    # -------------------------
+
+    def _record(self, model, result: str):
+        self._stats[model.__tablename__][result] += 1
+        MODEL_CACHE_REQUESTS.labels(model=model.__tablename__, result=result).inc()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        report = {}
+        for table, counts in self._stats.items():
+            total = sum(counts.values())
+            hits = counts["local_hit"] + counts["remote_hit"]
+            report[table] = {**counts, "hit_rate": round(hits / total, 4) if total else None}
+        return report
+
+
+model_cache = ModelCache()
+
+
+def cached_model(ttl: int = 60, local_ttl: int = 5, local_size: int = 1024, exclude=()):
+    """Class decorator opting a model into the second-level cache."""
+
+    def decorator(model):
+        return model_cache.register(
+            model, ttl=ttl, local_ttl=local_ttl, local_size=local_size, exclude=exclude
+        )
+
+    return decorator
+
+
+# ---------------------------------------------------------
+# SQLAlchemy event hooks
+# ---------------------------------------------------------
+def _primary_key(obj):
+    identity = inspect(obj).identity
+    return identity[0] if identity else None
+
+
+def _on_change(mapper, connection, target):
+    model = mapper.class_
+    pk = _primary_key(target)
+    if pk is None:
+        return
+
+    model_cache.evict_local(model, pk)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add((model, pk))
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+
+    by_model: Dict[type, list] = {}
+    for model, pk in pending:
+        by_model.setdefault(model, []).append(pk)
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # sync context (scripts / Celery): only L1 can be evicted here
+        for model, pks in by_model.items():
+            for pk in pks:
+                model_cache.evict_local(model, pk)
+        return
+
+    # keep a reference until done: the loop only holds tasks weakly
+    for model, pks in by_model.items():
+        task = loop.create_task(model_cache.invalidate(model, *pks))
+        _invalidations.add(task)
+        task.add_done_callback(_invalidations.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+# ---------------------------------------------------------
+# (de)serialization: column values only, rebuilt as a clean
+# detached instance and merged without a SELECT
+# ---------------------------------------------------------
+def _serialize(obj, exclude=frozenset()) -> dict:
+    return {
+        attr.key: getattr(obj, attr.key)
+        for attr in inspect(obj).mapper.column_attrs
+        if attr.key not in exclude
+    }
+
+
+async def _attach(session: AsyncSession, model, data: dict):
+    mapper = inspect(model)
+    obj = mapper.class_manager.new_instance()
+    for attr in mapper.column_attrs:
+        if attr.key in data:
+            set_committed_value(obj, attr.key, _restore(attr.columns[0], data[attr.key]))
+    make_transient_to_detached(obj)
+    return await session.merge(obj, load=False)
+
+
+def _restore(column, value):
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if isinstance(value, python_type):
+        return value
+    if python_type is uuid.UUID:
+        return uuid.UUID(str(value))
+    if python_type in (datetime, date):
+        return python_type.fromisoformat(value)
+    return python_type(value)
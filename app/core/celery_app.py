@@ -1,10 +1,12 @@
 from celery import Celery
+from celery.schedules import crontab
 from config.config import settings
 
 celery_app = Celery(
     "fastapi_tasks",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND or None,
+    include=["app.common.tasks.partition_tasks"],
 )
 
 celery_app.conf.update(
@@ -19,4 +21,11 @@ celery_app.conf.update(
     broker_connection_retry_on_startup=True,
     task_annotations={"*": {"max_retries": 3, "time_limit": 300}},
     result_expires=3600,
+    beat_schedule={
+        # app/common/db/partitioning.py: next months' partitions, retention drops
+        "partition-maintenance": {
+            "task": "app.tasks.partition_maintenance",
+            "schedule": crontab(hour=3, minute=15),
+        },
+    },
 )
@@ -3,8 +3,14 @@ import logging
 
 from app.core.logging.logging_config import setup_logging
 from app.core.cache.cache import init_cache, close_cache
+from app.core.cache.model_cache import model_cache
 from app.ws.redis_pubsub import redis_pubsub
+from app.common.db import sessions
+from app.common.db.advisor import query_advisor
 from app.common.db.sessions import init_db, close_db
+from app.common.db.warmup import warmup
+from app.common.db.write_behind import write_behind
+from config.config import settings
 
 
 logger = logging.getLogger("app.kernel")
@@ -47,8 +53,17 @@ async def boot(app):
     logger.info("Bootstrapping Cypher Server subsystems...")
     
     await init_db(app)
-    
+
+    if settings.DB_ADVISOR_ENABLED:
+        await query_advisor.start(sessions.engine)
+
+    await write_behind.start(sessions.engine)
+
     await init_cache()
+
+    # opens the pool, prepares hot queries, primes caches; /health is 503 until done
+    await warmup.start(sessions.engine, sessions.AsyncSessionLocal)
+
     await redis_pubsub.connect()
 
     app.state.redis = redis_pubsub
@@ -59,7 +74,11 @@ async def boot(app):
     @app.on_event("shutdown")
     async def on_shutdown():
         logger.info("Shutting down subsystems...")
+        await warmup.stop()
+        await query_advisor.stop()
+        await write_behind.stop()  # flush pending touches while the engine is still open
         await close_db()
+        await model_cache.drain()  # L2 evictions of the last commits, before the cache closes
         await close_cache()
         await redis_pubsub.disconnect()
         logger.info("All subsystems shut down cleanly.")
@@ -8,3 +8,4 @@ from .error_handler import ErrorHandlerMiddleware
 from .maintenance_mode import MaintenanceModeMiddleware
 from .session_cookie import CookieSessionMiddleware
 from .rate_limiter import RateLimitMiddleware
+from .query_stats import QueryStatsMiddleware
@@ -0,0 +1,29 @@
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from app.common.db.instrumentation import DB_REQUEST_DURATION, DB_REQUEST_QUERIES, track_queries
+from config.config import settings
+
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    """
+    Per-request SQL statement count and DB time, labeled by route template
+    (/users/{identifier}, not the raw path). Adds `Server-Timing: db;dur=...`
+    when settings.DB_SERVER_TIMING is on.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        with track_queries() as stats:
+            response = await call_next(request)
+
+        route = request.scope.get("route")
+        template = getattr(route, "path", None) or "<unmatched>"
+
+        DB_REQUEST_QUERIES.labels(method=request.method, route=template).observe(stats.count)
+        DB_REQUEST_DURATION.labels(method=request.method, route=template).observe(stats.duration)
+
+        if settings.DB_SERVER_TIMING:
+            response.headers.append(
+                "Server-Timing", f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'
+            )
+        return response
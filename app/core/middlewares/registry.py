@@ -8,6 +8,7 @@ AVAILABLE = {
     "request_id": "app.middlewares.request_id.RequestIDMiddleware",
     "request_logger": "app.middlewares.request_logger.RequestLoggingMiddleware",
     "process_time": "app.middlewares.process_time.ProcessTimeMiddleware",
+    "query_stats": "app.core.middlewares.query_stats.QueryStatsMiddleware",
     "session_cookie": "app.middlewares.session_cookie.CookieSessionMiddleware",
     "auth": "app.core.security.auth_middleware.AuthMiddleware",  # your auth middleware path
     "rate_limit": "app.middlewares.rate_limiter.RateLimitMiddleware",
@@ -23,6 +24,7 @@ REQUIRED_ORDER = [
     "cors",            # MUST be first (handled separately)
     "request_id",      # correlation id early
     "process_time",
+    "query_stats",
     "request_logger",
     "session_cookie",
     "auth",            # auth should be before rate limiting or after? choose before rate limiting to allow user-based limits
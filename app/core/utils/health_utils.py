@@ -3,6 +3,7 @@ import aio_pika
 from sqlalchemy import text
 from config.config import settings  
 from app.common.db import sessions
+from app.common.db.warmup import warmup
 
 
 import logging
@@ -52,6 +53,8 @@ async def run_health_checks():
     status = {
         "database": "healthy" if postgres_ok else "unhealthy",
         "broker": "healthy" if rabbit_ok else "unhealthy",
+        # not ready before the boot warm-up is done (app/common/db/warmup.py)
+        "warmup": "healthy" if warmup.ready else "warming",
     }
     
     logger.info("Health check result: %s", status)
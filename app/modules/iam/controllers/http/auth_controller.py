@@ -1,3 +1,4 @@
+import time
 import uuid
 from fastapi import Depends, Request, Response
 from fastapi.responses import JSONResponse
@@ -7,6 +8,7 @@ from app.core.base_controller import BaseController, route
 from app.core.router import create_module_router
 
 from app.common.db.sessions import get_db
+from app.common.db.write_behind import write_behind
 from app.core.security.brute_force import BruteForceService
 
 from app.modules.iam.models.user import User
@@ -27,7 +29,8 @@ from app.modules.iam.hooks.security import (
 from app.modules.iam.repositories.user_repository import UserRepository
 from app.modules.iam.schemas.user import UserCreate
 from app.modules.iam.schemas.user_response import UserResponse
-from app.modules.iam.services.user_service import UserService, repo
+from app.modules.iam.services.user_service import RegistrationConflict, UserService, repo
+from app.modules.iam.services.token_store import TokenRateLimited
 
 
 class AuthController(BaseController):
@@ -83,6 +86,7 @@ class AuthController(BaseController):
             )
 
         await BruteForceService.reset(username, client_ip)
+        write_behind.touch(User, user.user_id, last_login_at=int(time.time()))
 
         # Generate Access Token
         access_token = generate_jwt_access_token(user)
@@ -113,8 +117,8 @@ class AuthController(BaseController):
         try:
             user = await self.user_service.register_user(db, body)
 
-            # load profile explicitly
-            profile = await repo.get_profile(db, user)
+            # profile was just added in this session -> identity map hit, no query
+            profile = await repo.load_profile(db, user)
 
             response = UserResponse(
                 user_id=user.user_id,
@@ -122,6 +126,8 @@ class AuthController(BaseController):
                 status=user.status,
                 profile=profile,
             )
+        except RegistrationConflict as exc:
+            return self.error_response(exc.errors, status_code=422)
         except ValueError as exc:
             return self.error_response(str(exc), status_code=422)
 
@@ -239,7 +245,10 @@ class AuthController(BaseController):
         body: PasswordResetRequestInput,
         db: AsyncSession = Depends(get_db)
     ):
-        sent = await self.user_service.send_reset_email(body.email)
+        try:
+            sent = await self.user_service.send_reset_email(db, body.email)
+        except TokenRateLimited as exc:
+            return self.error_response({"email": [str(exc)]}, status_code=429)
 
         if not sent:
             return self.error_response({"email": ["Could not send email"]})
@@ -261,12 +270,13 @@ class AuthController(BaseController):
         body: ResetPasswordInput,
         db: AsyncSession = Depends(get_db)
     ):
-        user = await self.user_service.verify_reset_token(token)
+        user = await self.user_service.verify_reset_token(db, token)
 
         if not user:
             return JSONResponse({"detail": "Invalid token"}, status_code=400)
 
         user.password_hash = hash_password(body.password)
+        await repo.purge_refresh_tokens(db, user.user_id)
         await db.commit()
 
         return self.alertify_response({
@@ -301,10 +311,11 @@ class AuthController(BaseController):
                 ip_address=ip_address,
             )
             db.add(token_model)
+            await db.commit()
         else:
             token_model = existing
-
-        await db.commit()
+            # reused on every login/refresh: no UPDATE + commit in the request
+            write_behind.touch(RefreshToken, token_model.token_id, last_used_at=int(time.time()))
 
         response.set_cookie(
             key="refresh_token",
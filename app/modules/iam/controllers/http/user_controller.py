@@ -1,7 +1,8 @@
 import uuid
-from typing import List
+from typing import List, Literal
 
 from fastapi import Depends, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,6 +11,7 @@ from app.common.base_controller import BaseController, route
 from app.core.router import create_module_router
 
 from app.modules.iam.schemas.user import (
+    ProfileOut,
     UserOut,
 )
 from app.modules.iam.repositories.user_repository import UserRepository
@@ -44,12 +46,36 @@ class UserController(BaseController):
         # current_user=Depends(require_permission("iamUsers")),
     ):
         page = await q.search(db)
+        # one query for the whole page's profiles, not one per user
+        profiles = await self.user_repo.load_profiles(db, page["items"])
+        page["items"] = [
+            {
+                "user_id": user.user_id,
+                "username": user.username,
+                "status": user.status,
+                "profile_id": user.profile_id,
+                "profile": ProfileOut.model_validate(profile, from_attributes=True).model_dump() if profile else None,
+            }
+            for user, profile in zip(page["items"], profiles)
+        ]
         return JSONResponse(
-            # content={"data": page, "oneRecord": False},
-            content={"data": "Users ", "oneRecord": False},
+            content={"data": jsonable_encoder(page), "oneRecord": False},
             status_code=status.HTTP_200_OK,
         )
 
+    # ---------------------------------------------------------
+    # EXPORT USERS (streamed, unpaginated)
+    # ---------------------------------------------------------
+    @route("get", "/export", summary="Export users as NDJSON or CSV")
+    async def export(
+        self,
+        q: UserSearch = Depends(),
+        format: Literal["ndjson", "csv"] = "ndjson",
+        db: AsyncSession = Depends(get_db),
+        current_user=Depends(require_permission("iamUsers")),
+    ):
+        return q.export(db, format)
+
     # ---------------------------------------------------------
     # VIEW USER
     # ---------------------------------------------------------
@@ -4,6 +4,8 @@ from app.common.utils.status_mixin import StatusMixin
 
 class IamBaseModel(BaseModel, StatusMixin):
     __abstract__ = True
+    # models mapping an is_deleted column get the global soft-delete criteria
+    __soft_delete__ = True
 
     # extra IAM features here
     def soft_delete(self):
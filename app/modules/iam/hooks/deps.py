@@ -30,7 +30,7 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], sessio
     # Query by auth_key
     from sqlalchemy import select
     from .models import User
-    r = await session.execute(select(User).where(User.auth_key == jti, User.is_deleted == 0))
+    r = await session.execute(select(User).where(User.auth_key == jti))
     user = r.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
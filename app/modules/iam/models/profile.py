@@ -1,11 +1,32 @@
-from sqlalchemy import String, Integer, JSON
+from sqlalchemy import Boolean, String, Integer, Index, false, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.common.db.jsonb import JSONDocument
+from app.common.db.mixins.uuid_mixin import uuid7_hex
 from app.modules.iam.hooks.base_model import IamBaseModel
 
 class Profile(IamBaseModel):
     __tablename__ = "profiles"
+    __table_args__ = (
+        Index(
+            "ix_profiles_email_address_trgm", "email_address",
+            postgresql_using="gin", postgresql_ops={"email_address": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_profiles_first_name_trgm", "first_name",
+            postgresql_using="gin", postgresql_ops={"first_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_profiles_last_name_trgm", "last_name",
+            postgresql_using="gin", postgresql_ops={"last_name": "gin_trgm_ops"},
+        ),
+        # containment (@>) queries on data
+        Index(
+            "ix_profiles_data_gin", "data",
+            postgresql_using="gin", postgresql_ops={"data": "jsonb_path_ops"},
+        ),
+    )
 
-    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    id: Mapped[str] = mapped_column(String(32), primary_key=True, default=uuid7_hex)
 
     first_name: Mapped[str] = mapped_column(String(100), nullable=False)
     middle_name: Mapped[str | None] = mapped_column(String(100))
@@ -14,8 +35,8 @@ class Profile(IamBaseModel):
     email_address: Mapped[str] = mapped_column(String, unique=True, nullable=False)
     phone_number: Mapped[str] = mapped_column(String(20), unique=True, nullable=False)
 
-    data: Mapped[dict | None] = mapped_column(JSON)
-    is_deleted: Mapped[int] = mapped_column(Integer, default=0)
+    data: Mapped[dict | None] = mapped_column(JSONDocument)
+    is_deleted: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false(), nullable=False)
     status: Mapped[int] = mapped_column(Integer, default=10)
 
     # 1:1 relationship back → ONLY STRING
@@ -24,3 +45,10 @@ class Profile(IamBaseModel):
         back_populates="profile",
         uselist=False
     )
+
+
+# case-insensitive login lookups (UserRepository._email_lookup), live rows only
+Index(
+    "ix_profiles_email_address_lower_active", func.lower(Profile.email_address),
+    postgresql_where=Profile.is_deleted == false(),
+)
@@ -16,9 +16,13 @@ class RefreshToken(IamBaseModel):
         nullable=True
     )
 
-    token: Mapped[str] = mapped_column(Text, unique=True, nullable=False)
+    # partitioned monthly on created_at: unique constraints would have to
+    # include it, so the token is indexed, not constrained
+    token: Mapped[str] = mapped_column(Text, index=True, nullable=False)
     ip_address: Mapped[str] = mapped_column(String(32), server_default="127.0.0.1")
     user_agent: Mapped[str] = mapped_column(String, nullable=False)
+    # epoch seconds, written behind (app/common/db/write_behind.py)
+    last_used_at: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
     user = relationship("User", back_populates="refresh_tokens")
 
@@ -37,8 +41,6 @@ class RefreshToken(IamBaseModel):
 # ip
 #
 # location_country
-#
-# last_used_at
 
 
 
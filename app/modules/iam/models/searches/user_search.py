@@ -1,9 +1,10 @@
-from sqlalchemy import select, or_
-from typing import Optional
+from sqlalchemy import literal, select, union
+from typing import ClassVar, Literal, Optional
 from pydantic import BaseModel
 
 from app.common.db.data_provider import DataProvider
-from app.common.db.filtering import or_filter_ilike
+from app.common.db.filtering import or_filter_ilike, search_rank, trigram_search
+from app.modules.iam.models.profile import Profile
 from app.modules.iam.models.user import User
 
 
@@ -16,8 +17,17 @@ class UserSearch(BaseModel):
     page: int = 1
     page_size: int = 20
     sort: Optional[str] = None
+    # Keyset pagination: send an empty `cursor` for the first page,
+    # then the `next_cursor` returned by the previous page.
+    cursor: Optional[str] = None
+    # Total shown by the grid: an exact COUNT(*) on every page view scans the
+    # whole users table; the cached one lags by up to DataProvider.count_ttl
+    count_strategy: Literal["exact", "cached", "estimate"] = "cached"
 
-    async def search(self, db):
+    # Columns written by export(); never stream secrets (hashes, tokens)
+    EXPORT_COLUMNS: ClassVar[list[str]] = ["user_id", "username", "profile_id", "status", "created_at", "updated_at"]
+
+    def build_query(self):
         query = select(User)
 
         if self.username:
@@ -27,24 +37,44 @@ class UserSearch(BaseModel):
             query = or_filter_ilike(query, User, "auth_key", self.auth_key)
 
         if self.q:
-            query = query.where(
-                or_(
-                    User.username.ilike(f"%{self.q}%"),
-                    User.auth_key.ilike(f"%{self.q}%"),
-                )
+            # UNION of two index probes (users / profiles trigram indexes)
+            # instead of one OR across tables, which would force a seq scan
+            matches = union(
+                trigram_search(select(User.user_id), User, ["username"], self.q),
+                trigram_search(
+                    select(User.user_id).join(Profile),
+                    Profile,
+                    ["email_address", "first_name", "last_name"],
+                    self.q,
+                ),
             )
+            query = query.where(User.user_id.in_(matches))
+
+            # Best matches first, unless the client asked for a sort or is paging by cursor
+            if self.sort is None and self.cursor is None:
+                query = query.order_by(search_rank(User.username, literal(self.q)).desc())
 
         if self.status is not None:
             query = query.where(User.status == self.status)
 
-        dp = DataProvider(
-            query=query,
+        return query
+
+    def data_provider(self, db) -> DataProvider:
+        return DataProvider(
+            query=self.build_query(),
             db=db,
             page=self.page,
             page_size=self.page_size,
             sort=self.sort,
-            default_sort="-created_at"
+            default_sort="-created_at",
+            model=User,
+            cursor=self.cursor,
+            mode="cursor" if self.cursor is not None else "offset",
+            count_strategy=self.count_strategy,
         )
 
-        dp.model = User
-        return await dp.get_page()
+    async def search(self, db):
+        return await self.data_provider(db).get_page()
+
+    def export(self, db, fmt: str = "ndjson"):
+        return self.data_provider(db).export_response(fmt, columns=self.EXPORT_COLUMNS)
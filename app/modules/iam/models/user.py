@@ -1,11 +1,18 @@
 import uuid
-from sqlalchemy import String, Integer, ForeignKey
+from sqlalchemy import Boolean, String, Integer, ForeignKey, Index, false, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.common.db.mixins.uuid_mixin import uuid7
+from app.core.cache.model_cache import cached_model
 from app.modules.iam.hooks.base_model import IamBaseModel
 from app.modules.iam.models.user_settings import UserSettings
 from app.modules.iam.models.password_history import PasswordHistory
 from app.modules.iam.models.refresh_tokens import RefreshToken
 
+# secrets stay out of the shared cache (Redis); cached instances load them on demand
+@cached_model(
+    ttl=300,
+    exclude=("password_hash", "auth_key", "password_reset_token", "verification_token"),
+)
 class User(IamBaseModel):
     __tablename__ = "users"
 
@@ -14,9 +21,15 @@ class User(IamBaseModel):
         "exclude_properties": ["id"],
         "primary_key": ["user_id"],
     }
+    __table_args__ = (
+        Index(
+            "ix_users_username_trgm", "username",
+            postgresql_using="gin", postgresql_ops={"username": "gin_trgm_ops"},
+        ),
+    )
 
     user_id: Mapped[uuid.UUID] = mapped_column(
-        primary_key=True, default=uuid.uuid4, unique=True
+        primary_key=True, default=uuid7, unique=True
     )
 
     username: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
@@ -34,6 +47,9 @@ class User(IamBaseModel):
     password_reset_token: Mapped[str | None] = mapped_column(String(255))
     verification_token: Mapped[str | None] = mapped_column(String(255))
     status: Mapped[int] = mapped_column(Integer, server_default="10", nullable=False)
+    is_deleted: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false(), nullable=False)
+    # epoch seconds, written behind (app/common/db/write_behind.py)
+    last_login_at: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
     profile: Mapped["Profile"] = relationship(
         "Profile",
@@ -97,4 +113,11 @@ class User(IamBaseModel):
     #     password_reset_token: Mapped[str | None] = mapped_column(String(255))
     #     verification_token: Mapped[str | None] = mapped_column(String(255))
     #
-    #     status: Mapped[int] = mapped_column(Integer, server_default="10", nullable=False)
\ No newline at end of file
+    #     status: Mapped[int] = mapped_column(Integer, server_default="10", nullable=False)
+
+
+# case-insensitive login lookups (UserRepository._username_lookup), live rows only
+Index(
+    "ix_users_username_lower_active", func.lower(User.username),
+    postgresql_where=User.is_deleted == false(),
+)
@@ -1,10 +1,18 @@
 import uuid
-from sqlalchemy import Integer, ForeignKey, JSON
+from sqlalchemy import Integer, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.common.db.jsonb import JSONDocument
 from app.modules.iam.hooks.base_model import IamBaseModel
 
 class UserSettings(IamBaseModel):
     __tablename__ = "user_settings"
+    __table_args__ = (
+        # containment (@>) queries on data
+        Index(
+            "ix_user_settings_data_gin", "data",
+            postgresql_using="gin", postgresql_ops={"data": "jsonb_path_ops"},
+        ),
+    )
 
     id = None
 
@@ -16,7 +24,7 @@ class UserSettings(IamBaseModel):
         nullable=False
     )
 
-    data: Mapped[dict] = mapped_column(JSON, nullable=False)
+    data: Mapped[dict] = mapped_column(JSONDocument, nullable=False)
     status: Mapped[int] = mapped_column(Integer, server_default="10", nullable=False)
 
     user = relationship("User", back_populates="settings")
@@ -1,9 +1,13 @@
 import uuid
-from sqlalchemy import or_
 from typing import Optional
-from sqlalchemy import select, delete
+from sqlalchemy import func, literal, select, delete, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.common.db.jsonb import contains
+from app.common.db.loader import pk_loader
+from app.common.db.warmup import register_hot_query
+from app.core.cache.model_cache import model_cache
+
 from app.modules.iam.models.user import User
 from app.modules.iam.hooks.user_status import UserStatus
 from app.modules.iam.models.password_history import PasswordHistory
@@ -15,21 +19,68 @@ from config.config import settings
 class UserRepository:
 
     async def get_by_id(self, db: AsyncSession, user_id: uuid.UUID) -> Optional[User]:
+        async def fetch():
+            q = await db.execute(
+                select(User).where(
+                    User.user_id == user_id,
+                    User.status == UserStatus.ACTIVE,
+                )
+            )
+            return q.scalar_one_or_none()
+
+        user = await model_cache.get(db, User, user_id, loader=fetch)
+        if user is not None and user.status != UserStatus.ACTIVE:
+            return None
+        return user
+
+    async def load_by_id(self, db: AsyncSession, user_id: uuid.UUID) -> Optional[User]:
+        """
+        Batched get_by_id(): served from the identity map or model_cache,
+        lookups in the same tick share one IN query for the rest
+        """
+        user = await pk_loader(db, User).load(user_id)
+        if user is not None and user.status != UserStatus.ACTIVE:
+            return None
+        return user
+
+    async def get_by_username(self, db: AsyncSession, username: str) -> Optional[User]:
         q = await db.execute(
             select(User).where(
-                User.user_id == user_id,
+                User.username == username,
                 User.status == UserStatus.ACTIVE,
             )
         )
         return q.scalar_one_or_none()
 
-    async def get_by_username(self, db: AsyncSession, username: str) -> Optional[User]:
-        q = await db.execute(
-            select(User).where(
-                User.username == username,
+    # Login lookups: one indexed probe per identifier kind instead of a JOIN
+    # with OR(username, email), which can use neither unique index.
+    # Both sides match case-insensitively on lower() functional indexes.
+    def _username_lookup(self, identifier: str):
+        return (
+            select(User)
+            .where(
+                func.lower(User.username) == identifier.lower(),
+                User.status == UserStatus.ACTIVE,
+            )
+            # exact-case match wins if case variants exist
+            .order_by((User.username == identifier).desc())
+            .limit(1)
+        )
+
+    def _email_lookup(self, identifier: str):
+        return (
+            select(User)
+            .join(Profile, User.profile_id == Profile.id)
+            .where(
+                func.lower(Profile.email_address) == identifier.lower(),
                 User.status == UserStatus.ACTIVE,
             )
+            .order_by((Profile.email_address == identifier).desc())
+            .limit(1)
         )
+
+    async def get_by_email(self, db: AsyncSession, email: str) -> Optional[User]:
+        q = await db.execute(self._email_lookup(email))
         return q.scalar_one_or_none()
 
     async def get_by_username_or_email(
@@ -37,17 +88,13 @@ class UserRepository:
             db: AsyncSession,
             identifier: str,
     ) -> Optional[User]:
-        q = await db.execute(
-            select(User)
-            .join(Profile)
-            .where(
-                User.status == UserStatus.ACTIVE,
-                or_(
-                    User.username == identifier,
-                    Profile.email_address == identifier,
-                ),
-            )
-        )
+        if "@" in identifier:
+            q = await db.execute(self._email_lookup(identifier))
+            user = q.scalar_one_or_none()
+            if user is not None:
+                return user
+
+        q = await db.execute(self._username_lookup(identifier))
         return q.scalar_one_or_none()
 
     async def get_by_jti(self, db: AsyncSession, jti: str) -> Optional[User]:
@@ -65,6 +112,19 @@ class UserRepository:
         q = await db.execute(select(Profile).where(Profile.id == user.profile_id))
         return q.scalar_one_or_none()
 
+    async def load_profile(self, db: AsyncSession, user: User) -> Optional[Profile]:
+        """Batched get_profile(); served from the identity map when already loaded"""
+        return await pk_loader(db, Profile).load(user.profile_id)
+
+    async def load_profiles(self, db: AsyncSession, users: list[User]) -> list[Optional[Profile]]:
+        """Profiles of `users`, in order, with one query for the whole list"""
+        return await pk_loader(db, Profile).load_many([user.profile_id for user in users])
+
+    async def find_profiles_by_data(self, db: AsyncSession, document: dict) -> list[Profile]:
+        """Profiles whose data contains `document` (GIN ix_profiles_data_gin)"""
+        q = await db.execute(select(Profile).where(contains(Profile.data, document)))
+        return list(q.scalars().all())
+
     # ──────────── Refresh Tokens ─────────────
 
     async def get_refresh_token(self, db: AsyncSession, user: User):
@@ -117,3 +177,34 @@ class UserRepository:
             select(Profile.id).where(Profile.phone_number == phone)
         )
         return q.scalar_one_or_none() is not None
+
+    async def find_registration_conflicts(
+            self,
+            db: AsyncSession,
+            username: str,
+            email: str,
+            phone: str,
+    ) -> set[str]:
+        """
+        username_exists + email_exists + phone_exists in one round trip.
+        Returns the names of the fields that are already taken.
+        """
+        q = union_all(
+            select(literal("username").label("field")).where(User.username == username),
+            select(literal("email_address").label("field")).where(Profile.email_address == email),
+            select(literal("phone_number").label("field")).where(Profile.phone_number == phone),
+        )
+        return set((await db.execute(q)).scalars().all())
+
+
+# ──────────── Boot warm-up ─────────────
+# Login / token-refresh / auth statements, compiled and prepared on every
+# pooled connection before /health reports ready (app/common/db/warmup.py).
+register_hot_query("users.login.username", lambda: UserRepository()._username_lookup(""))
+register_hot_query("users.login.email", lambda: UserRepository()._email_lookup(""))
+register_hot_query(
+    "users.by_id",
+    lambda: select(User).where(User.user_id == uuid.UUID(int=0), User.status == UserStatus.ACTIVE),
+)
+register_hot_query("users.by_auth_key", lambda: select(User).where(User.auth_key == ""))
+register_hot_query("refresh_tokens.by_token", lambda: select(RefreshToken).where(RefreshToken.token == ""))
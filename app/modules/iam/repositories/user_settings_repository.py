@@ -0,0 +1,100 @@
+import copy
+import uuid
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.common.db.jsonb import apply_patch, contains, jsonb_set
+from app.core.cache.model_cache import LRUCache
+from app.modules.iam.models.user_settings import UserSettings
+from config.config import settings
+
+# ---------------------------------------------------------
+# Per-process cache of settings documents, keyed by user id.
+# Writes through this repository evict the entry immediately and again once
+# the transaction commits; other workers see the change within the TTL.
+# ---------------------------------------------------------
+_cache = LRUCache(maxsize=settings.USER_SETTINGS_CACHE_SIZE, ttl=settings.USER_SETTINGS_CACHE_TTL)
+
+_PENDING_KEY = "user_settings_evict"
+
+
+def invalidate_user_settings(user_id):
+    _cache.delete(str(user_id))
+
+
+def _evict_after_commit(db: AsyncSession, user_id):
+    invalidate_user_settings(user_id)
+    db.sync_session.info.setdefault(_PENDING_KEY, set()).add(str(user_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    for key in session.info.pop(_PENDING_KEY, ()):
+        _cache.delete(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    # the rolled back write may have been cached by a reader in between
+    for key in session.info.pop(_PENDING_KEY, ()):
+        _cache.delete(key)
+
+
+# noinspection PyMethodMayBeStatic
+class UserSettingsRepository:
+
+    async def get_data(self, db: AsyncSession, user_id: uuid.UUID) -> Dict[str, Any]:
+        """The user's settings document ({} when none); a copy, safe to mutate."""
+        key = str(user_id)
+        document = _cache.get(key)
+        if document is None:
+            q = await db.execute(select(UserSettings.data).where(UserSettings.user_id == user_id))
+            document = q.scalar_one_or_none() or {}
+            _cache.set(key, document)
+        return copy.deepcopy(document)
+
+    async def find_user_ids_with(self, db: AsyncSession, document: dict) -> list:
+        """Users whose settings contain `document`, e.g. {"notifications": {"email": True}}."""
+        q = await db.execute(
+            select(UserSettings.user_id).where(contains(UserSettings.data, document))
+        )
+        return list(q.scalars().all())
+
+    async def patch(self, db: AsyncSession, user_id: uuid.UUID, changes: dict) -> Optional[dict]:
+        """
+        Set {"path.to.key": value} in place with jsonb_set, creating the
+        settings row when the user has none. Returns the new document.
+        """
+        _evict_after_commit(db, user_id)
+
+        if db.get_bind().dialect.name != "postgresql":
+            q = await db.execute(select(UserSettings).where(UserSettings.user_id == user_id))
+            row = q.scalar_one_or_none()
+            if row is None:
+                row = UserSettings(user_id=user_id, data={})
+                db.add(row)
+            row.data = apply_patch(row.data, changes)
+            return row.data
+
+        # one statement: two first writes for the same user cannot both insert
+        stmt = postgresql.insert(UserSettings).values(user_id=user_id, data=apply_patch({}, changes))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserSettings.user_id],
+            set_={"data": jsonb_set(UserSettings.data, changes), "updated_at": stmt.excluded.updated_at},
+        ).returning(UserSettings.data)
+        q = await db.execute(stmt)
+        return q.scalar_one()
+
+    async def replace(self, db: AsyncSession, user_id: uuid.UUID, data: dict):
+        _evict_after_commit(db, user_id)
+        dialect = db.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(UserSettings).values(user_id=user_id, data=data)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[UserSettings.user_id],
+            set_={"data": stmt.excluded.data, "updated_at": stmt.excluded.updated_at},
+        ))
@@ -0,0 +1,222 @@
+"""
+Short-lived password reset links kept in Redis with native TTLs instead
+of Postgres columns.
+
+    token = await token_store.issue(db, "password_reset", user)
+    user_id = await token_store.consume(db, "password_reset", token)
+
+- only a keyed hash of the secret is stored
+- consume is atomic and single use (Lua script)
+- issuing a new link revokes the user's previous one
+- issuance is rate limited per user and purpose (TokenRateLimited)
+- Redis is the app's connection (app/core/cache/cache.py). Without it the
+  old User.password_reset_token column is used, still rate limited (one
+  link per window / max_issued) and burned after max_attempts wrong
+  guesses. The caller commits.
+"""
+import hashlib
+import hmac
+import logging
+import secrets
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache
+from app.modules.iam.models.user import User
+from config.config import settings
+
+logger = logging.getLogger("app.iam.tokens")
+
+PREFIX = "eph"
+
+
+@dataclass(frozen=True)
+class TokenPurpose:
+    ttl: int                        # seconds the secret stays valid
+    max_issued: int                 # issuances allowed per user ...
+    window: int                     # ... within this many seconds
+    column: str                     # User column used when Redis is down
+    max_attempts: int = 5           # wrong guesses at a stored link before it is burned
+
+
+PURPOSES = {
+    "password_reset": TokenPurpose(
+        ttl=settings.PASSWORD_RESET_TOKEN_TTL, max_issued=3, window=3600, column="password_reset_token",
+    ),
+}
+
+
+class TokenRateLimited(ValueError):
+    """Too many tokens issued for this user; retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Too many requests, please try again later")
+        self.retry_after = retry_after
+
+
+# ---------------------------------------------------------
+# Lua: each runs atomically on the Redis server
+# ---------------------------------------------------------
+
+# KEYS: token key, user key | ARGV: user id, digest, ttl, token key prefix
+_ISSUE = """
+local previous = redis.call('GET', KEYS[2])
+if previous then redis.call('DEL', ARGV[4] .. previous) end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+# KEYS: token key | ARGV: user key prefix, digest
+_CONSUME = """
+local user_id = redis.call('GET', KEYS[1])
+if not user_id then return false end
+redis.call('DEL', KEYS[1])
+local user_key = ARGV[1] .. user_id
+if redis.call('GET', user_key) == ARGV[2] then redis.call('DEL', user_key) end
+return user_id
+"""
+
+
+def _parse_stored(value: Optional[str]):
+    """(digest, expires, wrong guesses) from a users column, None if empty or malformed."""
+    parts = (value or "").split(".")
+    if len(parts) != 3 or not parts[1].isdigit() or not parts[2].isdigit():
+        return None
+    return parts[0], int(parts[1]), int(parts[2])
+
+
+def _digest(secret: str) -> str:
+    # keyed: a leaked Redis dump or users row does not reveal usable secrets
+    return hmac.new(settings.JWT_SECRET_KEY.encode(), secret.encode(), hashlib.sha256).hexdigest()
+
+
+class EphemeralTokenStore:
+    def __init__(self, client: Redis = None):
+        self._explicit = client
+
+    @property
+    def redis(self) -> Redis:
+        client = self._explicit or cache._redis_client
+        if client is None:
+            raise RedisError("no Redis connection (cache not initialized or in-memory)")
+        return client
+
+    # -------------------------
+    # LINK TOKENS
+    # -------------------------
+
+    async def issue(self, db: AsyncSession, purpose: str, user: User) -> str:
+        spec = PURPOSES[purpose]
+        try:
+            await self._check_rate(purpose, spec, user.user_id)
+            token = secrets.token_urlsafe(32)
+            digest = _digest(token)
+            await self.redis.register_script(_ISSUE)(
+                keys=[self._token_key(purpose, digest), self._user_key(purpose, user.user_id)],
+                args=[str(user.user_id), digest, spec.ttl, self._token_key(purpose, "")],
+            )
+            return token
+        except RedisError:
+            logger.warning("Redis unavailable, storing %s token in the database", purpose)
+
+        return self._issue_db(spec, user)
+
+    async def consume(self, db: AsyncSession, purpose: str, token: str) -> Optional[uuid.UUID]:
+        """The user id the token was issued for, once; None if unknown or expired."""
+        spec = PURPOSES[purpose]
+        if "." in token:
+            return await self._consume_db(db, spec, token)
+
+        digest = _digest(token)
+        try:
+            user_id = await self.redis.register_script(_CONSUME)(
+                keys=[self._token_key(purpose, digest)],
+                args=[self._user_key(purpose, ""), digest],
+            )
+        except RedisError:
+            logger.warning("Redis unavailable, cannot check %s token", purpose)
+            return None
+        return uuid.UUID(user_id) if user_id else None
+
+    # -------------------------
+    # DATABASE FALLBACK
+    # -------------------------
+    # token:  "<user id>.<secret>.<expires>" (the dot never occurs in
+    #         token_urlsafe output, so consume() knows where to look)
+    # column: "<digest>.<expires>.<wrong guesses>"
+
+    def _issue_db(self, spec: TokenPurpose, user: User) -> str:
+        now = int(time.time())
+        current = _parse_stored(getattr(user, spec.column))
+        if current is not None:
+            # Redis keeps the rate counter; here the previous link's age does
+            issued_at = current[1] - spec.ttl
+            retry_after = issued_at + spec.window // spec.max_issued - now
+            if retry_after > 0:
+                raise TokenRateLimited(retry_after=retry_after)
+
+        expires = now + spec.ttl
+        secret = secrets.token_urlsafe(32)
+        setattr(user, spec.column, f"{_digest(secret)}.{expires}.0")
+        return f"{user.user_id}.{secret}.{expires}"
+
+    async def _consume_db(self, db: AsyncSession, spec: TokenPurpose, token: str) -> Optional[uuid.UUID]:
+        user_id, _, rest = token.partition(".")
+        secret, _, expires = rest.rpartition(".")
+        try:
+            user_id = uuid.UUID(user_id)
+        except ValueError:
+            return None
+        if not expires.isdigit() or int(expires) < time.time():
+            return None
+
+        column = getattr(User, spec.column)
+        stored = _parse_stored((await db.execute(
+            select(column).where(User.user_id == user_id).with_for_update()
+        )).scalar_one_or_none())
+        if stored is None:
+            return None
+
+        digest, stored_expires, attempts = stored
+        if stored_expires == int(expires) and hmac.compare_digest(digest, _digest(secret)):
+            value, result = None, user_id
+        else:
+            attempts += 1
+            value = None if attempts >= spec.max_attempts else f"{digest}.{stored_expires}.{attempts}"
+            result = None
+
+        await db.execute(update(User).where(User.user_id == user_id).values({spec.column: value}))
+        return result
+
+    # -------------------------
+    # HELPERS
+    # -------------------------
+
+    async def _check_rate(self, purpose: str, spec: TokenPurpose, user_id):
+        key = f"{PREFIX}:rate:{purpose}:{user_id}"
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(key, 0, ex=spec.window, nx=True)
+            pipe.incr(key)
+            pipe.ttl(key)
+            _, issued, ttl = await pipe.execute()
+        if issued > spec.max_issued:
+            raise TokenRateLimited(retry_after=max(ttl, 1))
+
+    @staticmethod
+    def _token_key(purpose: str, digest: str) -> str:
+        return f"{PREFIX}:{purpose}:token:{digest}"
+
+    @staticmethod
+    def _user_key(purpose: str, user_id) -> str:
+        return f"{PREFIX}:{purpose}:user:{user_id}"
+
+
+token_store = EphemeralTokenStore()
@@ -7,6 +7,7 @@ from fastapi import Depends, HTTPException, Request
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.common.db.mixins.uuid_mixin import uuid7, uuid7_hex
 from app.modules.iam.hooks.security import hash_password, verify_password
 from app.modules.iam.hooks.jwt_utils import decode_jwt
 from app.common.db.sessions import get_db
@@ -17,6 +18,9 @@ from app.modules.iam.models.user import User
 from app.modules.iam.hooks.user_status import UserStatus
 from app.modules.iam.models.password_history import PasswordHistory
 from app.modules.iam.schemas.user import UserCreate
+from app.modules.iam.services.token_store import token_store
+from app.core.mailer import mail
+from config.config import settings
 
 if TYPE_CHECKING:
     from app.modules.iam.schemas.auth import ChangePasswordInput
@@ -25,6 +29,42 @@ if TYPE_CHECKING:
 repo = UserRepository()
 # bearer_scheme = HTTPBearer()
 
+# unique column -> message shown against that field on registration
+REGISTRATION_UNIQUE_FIELDS = {
+    "username": "Username already taken",
+    "email_address": "Email already registered",
+    "phone_number": "Phone number already registered",
+}
+
+
+class RegistrationConflict(ValueError):
+    """Registration rejected because unique fields are taken; `errors` is {field: [message]}"""
+
+    def __init__(self, errors: dict):
+        self.errors = errors
+        super().__init__("; ".join(msg for messages in errors.values() for msg in messages))
+
+
+# ---------------------------------------------------------
+# Helper: IntegrityError -> offending unique fields
+# ---------------------------------------------------------
+def integrity_error_fields(exc: IntegrityError, fields) -> list:
+    """
+    Best effort: prefer the driver's constraint name (asyncpg / psycopg),
+    e.g. "profiles_email_address_key", else the message text
+    (SQLite: "UNIQUE constraint failed: users.username").
+    """
+    orig = getattr(exc, "orig", None)
+    driver_exc = getattr(orig, "__cause__", None) or orig
+    diag = getattr(orig, "diag", None)
+
+    source = (
+        getattr(driver_exc, "constraint_name", None)
+        or getattr(diag, "constraint_name", None)
+        or str(orig)
+    )
+    return [field for field in fields if field in source]
+
 
 # ---------------------------------------------------------
 # Helper: set password
@@ -48,27 +88,34 @@ class UserService:
     async def find_by_jti(self, db: AsyncSession, jti: str):
         return await repo.get_by_jti(db, jti)
 
-    async def register_user(self, db: AsyncSession, data: UserCreate) -> User:
+    async def register_user(self, db: AsyncSession, data: UserCreate, precheck: bool = True) -> User:
         """
         Register a user with a required profile
+
+        precheck=True  -> one combined uniqueness query, reporting every taken field
+        precheck=False -> no reads; the unique constraints decide and the first
+                          violation is reported
         """
         # --------------------------------
         # 1. Business validations
         # --------------------------------
-        if await repo.username_exists(db, data.username):
-            raise ValueError("Username already taken")
-
-        if await repo.email_exists(db, data.profile.email_address):
-            raise ValueError("Email already registered")
-
-        if await repo.phone_exists(db, data.profile.phone_number):
-            raise ValueError("Phone number already registered")
+        if precheck:
+            taken = await repo.find_registration_conflicts(
+                db,
+                data.username,
+                data.profile.email_address,
+                data.profile.phone_number,
+            )
+            if taken:
+                raise RegistrationConflict({
+                    field: [message] for field, message in REGISTRATION_UNIQUE_FIELDS.items() if field in taken
+                })
 
         try:
             # --------------------------------
             # Create Profile
             # --------------------------------
-            profile_id = uuid.uuid4().hex
+            profile_id = uuid7_hex()
 
             profile = Profile(
                 id=profile_id,
@@ -95,10 +142,13 @@ class UserService:
 
             return user
 
-        except IntegrityError:
+        except IntegrityError as exc:
             await db.rollback()
-            # DB-level safety net
-            raise ValueError("User already exists")
+            # DB-level safety net (and the only check when precheck=False)
+            fields = integrity_error_fields(exc, REGISTRATION_UNIQUE_FIELDS)
+            if not fields:
+                raise ValueError("User already exists")
+            raise RegistrationConflict({field: [REGISTRATION_UNIQUE_FIELDS[field]] for field in fields})
 
         except Exception:
             await db.rollback()
@@ -155,6 +205,9 @@ class UserService:
     ):
         errors = {}
 
+        # the hash is not part of the cached user (model_cache exclude)
+        await db.refresh(user, attribute_names=["password_hash"])
+
         # 1. Old password mismatch
         if not verify_password(schema.old_password, user.password_hash):
             errors["old_password"] = ["Incorrect password"]
@@ -188,7 +241,7 @@ class UserService:
     ) -> User:
 
         user = User(
-            user_id=uuid.uuid4(),
+            user_id=uuid7(),
             username=username,
             profile_id=profile_id,
             auth_key=uuid.uuid4().hex,
@@ -219,7 +272,12 @@ class UserService:
         if not user_id:
             raise HTTPException(status_code=401, detail="Invalid token payload")
 
-        user = await repo.get_by_id(db, user_id)
+        try:
+            user = await repo.load_by_id(db, user_id)
+        except ValueError:
+            # "sub" is not a valid UUID
+            user = None
+
         if not user:
             raise HTTPException(status_code=401, detail="User no longer exists")
 
@@ -254,3 +312,41 @@ class UserService:
         await db.refresh(user)
 
         return True
+
+    # -----------------------------------------------------
+    # Password reset (secrets live in token_store, not in users)
+    # -----------------------------------------------------
+    async def send_reset_email(self, db: AsyncSession, email: str) -> bool:
+        """Raises TokenRateLimited when too many links were requested."""
+        user = await repo.get_by_email(db, email)
+        if user is None:
+            # same answer whether or not the address is registered
+            return True
+
+        token = await token_store.issue(db, "password_reset", user)
+        await db.commit()  # only writes when the token fell back to the users row
+
+        # the address on file, not the one typed into the form
+        profile = await repo.load_profile(db, user)
+
+        minutes = settings.PASSWORD_RESET_TOKEN_TTL // 60
+        return await mail.send_mail(
+            to=profile.email_address,
+            subject="Reset your password",
+            body=(
+                f"Hello {user.username},\n\n"
+                f"Use the link below to choose a new password. It expires in {minutes} minutes "
+                f"and can only be used once.\n\n"
+                f"{settings.FRONTEND_HOST}/iam/auth/reset-password/{token}\n"
+            ),
+            is_html=False,
+        )
+
+    async def verify_reset_token(self, db: AsyncSession, token: str) -> Optional[User]:
+        """Consumes the token: a second call with the same token returns None."""
+        user_id = await token_store.consume(db, "password_reset", token)
+        if user_id is None:
+            # keep the wrong-guess count of a database-stored link
+            await db.commit()
+            return None
+        return await repo.get_by_id(db, user_id)
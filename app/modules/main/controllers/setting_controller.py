@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, Body, status
+from fastapi import APIRouter, Depends, Body, Header, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.common.db.sessions import get_db
+from app.common.etag import check_if_match
+from app.common.exceptions import TransactionRetriesExhausted
 from app.core.base_controller import BaseController
 from app.modules.main.services.setting_service import SettingService
 from pydantic import ValidationError
-from config import config
 
 from app.modules.main.hooks.settings_loader import SettingLoader
 
@@ -48,13 +49,17 @@ class SettingController(BaseController):
             await service.ensure_settings(definition)
             data = await service.get_formatted_settings(definition.CATEGORY)
 
-            return self.payload_response(data=data)
+            response = self.payload_response(data=data)
+            # sent back as If-Match on save, so concurrent edits don't overwrite each other
+            response.headers["ETag"] = await service.category_etag(definition.CATEGORY)
+            return response
 
 
         @r.post("/{category}", summary="Update settings for a category")
         async def update_settings(
                 category: str,
                 payload: dict = Body(..., example={"key": "value"}),
+                if_match: str | None = Header(None),
                 db: AsyncSession = Depends(get_db)
         ):
 
@@ -70,6 +75,11 @@ class SettingController(BaseController):
                 )
 
             service = SettingService(db)
+
+            # 409 if someone saved this category since the client loaded it;
+            # rows changing after this check are caught by version_id on commit
+            check_if_match(if_match, await service.category_etag(definition.CATEGORY))
+
             if hasattr(definition, "VALIDATOR_SCHEMA"):
                 try:
                     current_values = await service.get_formatted_settings(definition.CATEGORY)
@@ -80,11 +90,15 @@ class SettingController(BaseController):
                     return self.error_response(
                         errors=errors
                     )
-            updated_count = 0
-            for key, value in payload.items():
-                if await service.update_setting_value(key, value):
-                    config.set_manual(key, value)
-                    updated_count += 1
+            # one commit: a conflict on any key saves none of them
+            try:
+                await service.update_settings(payload)
+            except TransactionRetriesExhausted as exc:
+                response = self.error_response(
+                    errors=str(exc), status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+                )
+                response.headers["Retry-After"] = str(exc.retry_after)
+                return response
 
             return self.alertify_response(
                 message=f"{category} settings updated successfully.",
@@ -1,10 +1,15 @@
-from sqlalchemy import String, Integer, Text
+from sqlalchemy import Boolean, Index, String, Integer, Text, false, text
 from sqlalchemy.orm import Mapped, mapped_column
 # from app.modules.main.hooks.base_model import
 from app.common.base.base_model import BaseModel
+from app.common.db.mixins.versioned import VersionedMixin
 
-class SystemSetting(BaseModel):
+class SystemSetting(VersionedMixin, BaseModel):
     __tablename__ = "system_settings1"
+    __soft_delete__ = True
+    __table_args__ = (
+        Index("ix_system_settings1_category_active", "category", postgresql_where=text("is_deleted = false")),
+    )
 
 
     id = None
@@ -23,6 +28,7 @@ class SystemSetting(BaseModel):
     input_preload: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     status: Mapped[int] = mapped_column(Integer, default=10, nullable=False)
+    is_deleted: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false(), nullable=False)
 
     def __repr__(self):
         return f"<SystemSetting(key='{self.key}')>"
\ No newline at end of file
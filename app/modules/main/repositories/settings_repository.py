@@ -1,5 +1,6 @@
 from sqlalchemy import select
 from app.common.base.base_repository import BaseRepository
+from app.common.db.mixins.soft_delete import with_deleted
 from app.modules.main.models.system_setting import SystemSetting
 
 class SettingsRepository(BaseRepository):
@@ -10,19 +11,22 @@ class SettingsRepository(BaseRepository):
         """
         Find a setting by its unique string key (e.g., 'smtp_port').
         """
-        stmt = select(self.model).where(
-            self.model.key == key,
-            self.model.is_deleted == False
-        )
+        stmt = select(self.model).where(self.model.key == key)
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_by_keys(self, keys: list[str]) -> list[SystemSetting]:
+        stmt = select(self.model).where(self.model.key.in_(keys))
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
     async def get_existing_keys(self, keys: list[str]) -> list[str]:
         """
         Optimized check to see which keys already exist in the DB.
         """
-        stmt = select(self.model.key).where(
+        # soft-deleted keys still occupy the primary key
+        stmt = with_deleted(select(self.model.key).where(
             self.model.key.in_(keys)
-        )
+        ))
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
\ No newline at end of file
@@ -1,9 +1,18 @@
 from typing import List
 
+from sqlalchemy import select
+from sqlalchemy.orm.exc import StaleDataError
+
 from app.common.base.base_service import BaseService
+from app.common.db.unit_of_work import UnitOfWork
+from app.common.db.warmup import register_hot_query, register_primer
+from app.common.etag import collection_etag
+from app.common.exceptions import ConflictError
+from app.modules.main.models.system_setting import SystemSetting
 from app.modules.main.repositories.settings_repository import SettingsRepository
 from app.modules.main.schemas.settings.base import BaseSettingGroup
 from app.modules.main.schemas.system_setting_schema import SystemSettingResponse
+from config.config import config
 
 class SettingService(BaseService):
     repo = SettingsRepository
@@ -76,6 +85,33 @@ class SettingService(BaseService):
 
         return simple_settings
 
+    async def category_etag(self, category: str) -> str:
+        """ETag over every setting in the category; changes when any of them is saved."""
+        settings_list = await self.repository.list_active(filters={"category": category})
+        return collection_etag(settings_list, key="key")
+
+    async def update_settings(self, values: dict) -> list[str]:
+        """
+        Saves several settings in one transaction: all of them or, when a row
+        changed underneath (version_id), none (409). Deadlocks with other
+        saves are retried (UnitOfWork); the in-memory config only picks the
+        values up once they are committed. Returns the keys saved.
+        """
+        uow = UnitOfWork(self.session)
+
+        async def save():
+            settings_list = await self.repository.get_by_keys(list(values))
+            for setting in settings_list:
+                await self.repository.update(setting, {"current_value": str(values[setting.key])})
+                uow.after_commit(config.set_manual, setting.key, values[setting.key])
+            return [setting.key for setting in settings_list]
+
+        try:
+            return await uow.run(save)
+        except StaleDataError:
+            # VersionedMixin: another writer committed first
+            raise ConflictError()
+
     async def update_setting_value(self, key: str, value: str):
         """
         Updates a single setting value.
@@ -86,4 +122,15 @@ class SettingService(BaseService):
             await self.repository.update(setting, {"current_value": str(value)})
             await self.commit()
             return setting
-        return None
\ No newline at end of file
+        return None
+
+
+# ---------------------------------------------------------
+# Boot warm-up (app/common/db/warmup.py)
+# ---------------------------------------------------------
+register_hot_query("settings.by_category", lambda: select(SystemSetting).filter_by(category=""))
+
+
+@register_primer("settings")
+async def prime_settings(session):
+    await config.load_settings(session)
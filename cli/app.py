@@ -1,5 +1,5 @@
 import typer
-from cli.commands import migrate
+from cli.commands import db, migrate
 
 def create_cli() -> typer.Typer:
     app = typer.Typer(
@@ -9,5 +9,6 @@ def create_cli() -> typer.Typer:
     )
 
     app.add_typer(migrate.app, name="migrate")
+    app.add_typer(db.app, name="db")
 
     return app
@@ -0,0 +1,74 @@
+import json
+import os
+import shutil
+
+import typer
+from cli.context import get_context
+
+app = typer.Typer(help="Database diagnostics")
+
+
+@app.command("advise")
+def advise(
+    report_dir: str = typer.Option(None, "--dir", help="Advisor report directory (default: DB_ADVISOR_DIR)"),
+    limit: int = typer.Option(20, help="Show the N most expensive statements"),
+    only_findings: bool = typer.Option(False, "--findings", help="Only statements with flagged seq scans"),
+    as_json: bool = typer.Option(False, "--json", help="Print the merged report as JSON"),
+    clear: bool = typer.Option(False, help="Delete collected reports after printing"),
+):
+    """Slow statements, their plans' seq scans and suggested indexes."""
+    from app.common.db.advisor import load_report
+
+    ctx = get_context()
+    report_dir = report_dir or ctx.settings.DB_ADVISOR_DIR
+    entries = load_report(report_dir)
+    if only_findings:
+        entries = [e for e in entries if e["findings"]]
+    entries = entries[:limit]
+
+    if as_json:
+        typer.echo(json.dumps(entries, indent=2, default=str))
+    elif not entries:
+        typer.echo(f"No slow statements recorded in {report_dir}")
+    else:
+        for entry in entries:
+            avg = entry["total_ms"] / entry["calls"] if entry["calls"] else 0
+            typer.echo(
+                f"[{entry['fingerprint']}] calls={entry['calls']} "
+                f"total={entry['total_ms']:.1f}ms avg={avg:.1f}ms max={entry['max_ms']:.1f}ms"
+            )
+            typer.echo(f"  {entry['sql'][:300]}")
+            if entry["plan"] is None:
+                typer.echo("  plan: not explained")
+            for finding in entry["findings"]:
+                typer.echo(f"  ! Seq Scan on {finding['table']} (~{finding['table_rows']} rows)")
+                if finding["filter"]:
+                    typer.echo(f"    filter: {finding['filter']}")
+                if finding["suggestion"]:
+                    typer.echo(f"    suggest: {finding['suggestion']}")
+            typer.echo("")
+
+    if clear and os.path.isdir(report_dir):
+        shutil.rmtree(report_dir)
+        typer.echo(f"Cleared {report_dir}")
+
+
+@app.command("partitions")
+def partitions(
+    dry_run: bool = typer.Option(False, "--dry-run", help="Only show what would be created / dropped"),
+):
+    """Pre-create upcoming monthly partitions and drop expired ones."""
+    import asyncio
+    from app.common.tasks.partition_tasks import run_partition_maintenance
+
+    report = asyncio.run(run_partition_maintenance(dry_run=dry_run))
+    if not report:
+        typer.echo("No partitioned tables found")
+    for table, changes in report.items():
+        typer.echo(f"{table}:")
+        typer.echo(f"  created: {', '.join(changes['created']) or '-'}")
+        typer.echo(f"  dropped: {', '.join(changes['dropped']) or '-'}")
+        if changes["failed"]:
+            typer.echo(f"  failed: {', '.join(changes['failed'])}")
+        typer.echo(f"  months ahead: {changes['months_ahead']}")
+        typer.echo(f"  rows in default partition: {changes['default_rows']}")
@@ -1,32 +1,144 @@
 import typer
+from pathlib import Path
+
 from cli.context import get_context
 from cli.guards import forbid_in_production
 
 app = typer.Typer(help="Database migrations")
 
+
+def _echo_result(result, done: int, total: int):
+    status = "ok" if result.ok else "FAILED"
+    retried = f" after {result.attempts} attempts" if result.attempts > 1 else ""
+    typer.echo(
+        f"[{done}/{total}] {result.schema or 'default'}: {status} in {result.seconds:.2f}s{retried}"
+        + (f" (at {result.revision})" if result.revision else "")
+    )
+    if result.error:
+        typer.echo(f"    {result.error}")
+
+
+def _lint_pending(target: str, schemas: list, allow_locks: bool):
+    """Lock linter over the revisions about to run on any of `schemas` (or the default one)."""
+    from cli.migration_lint import lint, pending_revision_paths
+
+    try:
+        paths = pending_revision_paths(target, schemas or [None])
+    except Exception as exc:
+        typer.echo(f"Lock linter skipped: could not read the current revision ({exc})")
+        return
+
+    findings = lint(paths, get_context().settings.MIGRATION_LARGE_TABLES)
+    if not findings:
+        return
+
+    typer.echo(f"Lock linter: {len(findings)} operation(s) would lock large tables:")
+    for finding in findings:
+        typer.echo(f"  {finding}")
+    if not allow_locks:
+        typer.echo("Use the helpers in app/common/db/online_migrations.py, mark deliberate "
+                   "cases with '# nova: lock-ok', or rerun with --allow-locks.")
+        raise typer.Exit(1)
+
+
+@app.command("lint")
+def migrate_lint(
+    all_revisions: bool = typer.Option(False, "--all", help="Lint every revision, not only pending ones"),
+    tenant: str = typer.Option(None, help="Tenant schema whose pending revisions are linted"),
+):
+    """Flag revisions that take ACCESS EXCLUSIVE / write-blocking locks on large tables."""
+    from cli.migration_lint import lint, pending_revision_paths, revision_paths
+
+    paths = revision_paths() if all_revisions else pending_revision_paths("heads", [tenant])
+    findings = lint(paths, get_context().settings.MIGRATION_LARGE_TABLES)
+    for finding in findings:
+        typer.echo(str(finding))
+    typer.echo(f"{len(paths)} revision(s) checked, {len(findings)} finding(s)")
+    raise typer.Exit(1 if findings else 0)
+
+
 @app.command("up")
 def migrate_up(
-    module: str = typer.Option(None, help="Module name"),
-    tenant: str = typer.Option(None, help="Tenant ID"),
+    module: str = typer.Option(None, help="Module name (its branch label)"),
+    tenant: str = typer.Option(None, help="Tenant schema, comma-separated list, or 'all'"),
+    workers: int = typer.Option(4, help="Tenant schemas migrated in parallel"),
+    lock_timeout: str = typer.Option(None, help="Postgres lock_timeout per schema (default: MIGRATE_LOCK_TIMEOUT)"),
+    retries: int = typer.Option(2, help="Retries per schema when the lock timeout expires"),
+    resume: bool = typer.Option(False, help="Skip tenants finished by an earlier run to the same head"),
+    allow_locks: bool = typer.Option(False, "--allow-locks", help="Run even if the lock linter has findings"),
     force: bool = typer.Option(False, help="Force in production"),
 ):
+    from cli.migrations import ResumeState, discover_tenants, head_revision, migrate_schema, migrate_tenants
+
     ctx = get_context()
     forbid_in_production(ctx.env, force)
 
+    target = f"{module}@head" if module else "heads"
+    lock_timeout = lock_timeout or ctx.settings.MIGRATE_LOCK_TIMEOUT
+
     typer.echo("Running migrations")
     typer.echo(f"Module: {module or 'ALL'}")
     typer.echo(f"Tenant: {tenant or 'DEFAULT'}")
 
-    # here we will call Alembic programmatically later
+    if tenant == "all":
+        schemas = discover_tenants(ctx.settings.TENANT_SCHEMA_PREFIX)
+    elif tenant:
+        schemas = sorted({t.strip() for t in tenant.split(",") if t.strip()})
+    else:
+        schemas = []
+
+    _lint_pending(target, schemas, allow_locks)
+
+    if not tenant:
+        result = migrate_schema(None, target, lock_timeout, retries)
+        _echo_result(result, 1, 1)
+        raise typer.Exit(0 if result.ok else 1)
+
+    head = head_revision(target)
+    state = ResumeState(Path(ctx.settings.MIGRATE_STATE_DIR) / f"{target.replace('@', '_')}.json", head)
+    if not resume:
+        state.clear()
+
+    typer.echo(f"Target {target} ({head}): {len(schemas)} schemas, {workers} workers, lock_timeout={lock_timeout}")
+
+    report = migrate_tenants(schemas, target, workers, lock_timeout, retries, state, on_result=_echo_result)
+
+    # -------------------------
+    # REPORT
+    # -------------------------
+    ok = [r for r in report.results if r.ok]
+    typer.echo("")
+    typer.echo(
+        f"Done in {report.seconds:.1f}s: {len(ok)} migrated, {len(report.failed)} failed, "
+        f"{len(report.skipped)} skipped (already done)"
+    )
+    if ok:
+        total = sum(r.seconds for r in ok)
+        typer.echo(f"Per schema: avg {total / len(ok):.2f}s, max {max(r.seconds for r in ok):.2f}s")
+        for r in sorted(ok, key=lambda r: r.seconds, reverse=True)[:5]:
+            typer.echo(f"  slowest: {r.schema} {r.seconds:.2f}s")
+    if report.failed:
+        typer.echo("Failed schemas (rerun with --resume to retry only these):")
+        for r in sorted(report.failed, key=lambda r: r.schema):
+            typer.echo(f"  {r.schema}: {r.error}")
+        raise typer.Exit(1)
 
 
 @app.command("down")
 def migrate_down(
     steps: int = typer.Option(1),
     module: str = typer.Option(None),
+    tenant: str = typer.Option(None, help="Tenant schema"),
     force: bool = typer.Option(False),
 ):
+    from cli.migrations import migrate_schema
+
     ctx = get_context()
     forbid_in_production(ctx.env, force)
 
     typer.echo(f"Rolling back {steps} steps")
+
+    target = f"{module}@-{steps}" if module else f"-{steps}"
+    result = migrate_schema(tenant, target, ctx.settings.MIGRATE_LOCK_TIMEOUT, downgrade=True)
+    _echo_result(result, 1, 1)
+    raise typer.Exit(0 if result.ok else 1)
@@ -1,9 +1,6 @@
-import typer
-from cli.commands.migrate import migrate_app
+from cli.app import create_cli
 
-app = typer.Typer(help="NovaKit CLI")
-
-app.add_typer(migrate_app, name="migrate")
+app = create_cli()
 
 def main():
     app()
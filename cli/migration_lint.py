@@ -0,0 +1,200 @@
+"""
+Static lock linter for Alembic revisions, run by `nova migrate up` on the
+revisions it is about to apply (and by `nova migrate lint`).
+
+It reads each revision's upgrade() with `ast` and flags operations that hold
+ACCESS EXCLUSIVE (or block writes) for a scan, a rewrite or an index build
+on tables listed in settings.MIGRATION_LARGE_TABLES:
+
+    op.create_index(...)                  without postgresql_concurrently=True
+    op.drop_index(...)                    without postgresql_concurrently=True
+    op.alter_column(type_=... / nullable=False)
+    op.add_column(NOT NULL, no server_default)
+    op.create_foreign_key / create_check_constraint / create_unique_constraint
+    op.execute("...")                     matching the SQL rules below
+    partition_table(...)                  copies the whole table
+
+Tables given as variables cannot be resolved and are flagged as well.
+Tables created in the same revision (op.create_table with a literal name)
+are empty, so nothing on them is flagged.
+A finding on a line is silenced with a trailing `# nova: lock-ok`.
+The online alternatives live in app/common/db/online_migrations.py.
+"""
+import ast
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+IGNORE_MARKER = "nova: lock-ok"
+
+# op.<name> -> (where the table argument is: positional index, keyword)
+_OP_TABLE_ARG = {
+    "create_index": (1, "table_name"),
+    "drop_index": (None, "table_name"),
+    "alter_column": (0, "table_name"),
+    "add_column": (0, "table_name"),
+    "create_foreign_key": (1, "source_table"),
+    "create_check_constraint": (1, "table_name"),
+    "create_unique_constraint": (1, "table_name"),
+}
+
+_IDENT = r'"?(?:\w+"?\.)?"?(\w+)"?'
+_SQL_RULES = [
+    (re.compile(rf"\bCREATE\s+(?:UNIQUE\s+)?INDEX\s+(?!CONCURRENTLY)(?:IF\s+NOT\s+EXISTS\s+)?\S+\s+ON\s+(?:ONLY\s+)?{_IDENT}", re.I),
+     "CREATE INDEX without CONCURRENTLY blocks writes for the whole build"),
+    (re.compile(rf"\bALTER\s+TABLE\s+(?:ONLY\s+)?(?:IF\s+EXISTS\s+)?{_IDENT}[^;]*\bTYPE\b", re.I),
+     "ALTER COLUMN TYPE rewrites the table under ACCESS EXCLUSIVE"),
+    (re.compile(rf"\bALTER\s+TABLE\s+(?:ONLY\s+)?(?:IF\s+EXISTS\s+)?{_IDENT}[^;]*\bSET\s+NOT\s+NULL\b", re.I),
+     "SET NOT NULL scans the table under ACCESS EXCLUSIVE (use set_not_null_online)"),
+    (re.compile(rf"\bALTER\s+TABLE\s+(?:ONLY\s+)?(?:IF\s+EXISTS\s+)?{_IDENT}[^;]*\bADD\s+(?:CONSTRAINT\s+\S+\s+)?(?:FOREIGN\s+KEY|CHECK|UNIQUE|PRIMARY\s+KEY)\b(?![^;]*\bNOT\s+VALID\b)", re.I),
+     "ADD CONSTRAINT without NOT VALID checks every row under the lock"),
+    (re.compile(rf"\b(?:VACUUM\s+FULL|CLUSTER|LOCK\s+TABLE)\s+{_IDENT}", re.I),
+     "takes ACCESS EXCLUSIVE for the whole operation"),
+    (re.compile(rf"\bREINDEX\s+(?:TABLE|INDEX)\s+(?!CONCURRENTLY){_IDENT}", re.I),
+     "REINDEX without CONCURRENTLY blocks writes"),
+]
+
+
+@dataclass
+class Finding:
+    path: Path
+    line: int
+    table: Optional[str]
+    message: str
+
+    def __str__(self):
+        where = self.table or "<table not a literal>"
+        return f"{self.path.name}:{self.line}: {where}: {self.message}"
+
+
+def revision_paths() -> List[Path]:
+    """app/alembic/versions plus every app/modules/*/migrations/versions."""
+    dirs = [BASE_DIR / "app" / "alembic" / "versions"]
+    dirs += sorted((BASE_DIR / "app" / "modules").glob("*/migrations/versions"))
+    return sorted(p for d in dirs if d.is_dir() for p in d.glob("*.py"))
+
+
+def _literal(node) -> Optional[str]:
+    return node.value if isinstance(node, ast.Constant) and isinstance(node.value, str) else None
+
+
+def _kwarg(call: ast.Call, name: str):
+    return next((kw.value for kw in call.keywords if kw.arg == name), None)
+
+
+def _is_true(node) -> bool:
+    return isinstance(node, ast.Constant) and node.value is True
+
+
+def _table_of(call: ast.Call, position: Optional[int], keyword: str):
+    node = _kwarg(call, keyword)
+    if node is None and position is not None and len(call.args) > position:
+        node = call.args[position]
+    return _literal(node) if node is not None else None
+
+
+def _op_finding(name: str, call: ast.Call) -> Optional[str]:
+    if name == "create_index" and not _is_true(_kwarg(call, "postgresql_concurrently")):
+        return "op.create_index blocks writes for the whole build (use create_index_concurrently)"
+    if name == "drop_index" and not _is_true(_kwarg(call, "postgresql_concurrently")):
+        return "op.drop_index takes ACCESS EXCLUSIVE (use drop_index_concurrently)"
+    if name == "alter_column":
+        if _kwarg(call, "type_") is not None:
+            return "op.alter_column(type_=...) rewrites the table under ACCESS EXCLUSIVE"
+        nullable = _kwarg(call, "nullable")
+        if isinstance(nullable, ast.Constant) and nullable.value is False:
+            return "op.alter_column(nullable=False) scans under ACCESS EXCLUSIVE (use set_not_null_online)"
+    if name == "add_column" and len(call.args) > 1 and isinstance(call.args[1], ast.Call):
+        column = call.args[1]
+        nullable = _kwarg(column, "nullable")
+        if isinstance(nullable, ast.Constant) and nullable.value is False and _kwarg(column, "server_default") is None:
+            return "NOT NULL column without server_default fails or needs a rewrite on a filled table"
+    if name in ("create_foreign_key", "create_check_constraint", "create_unique_constraint"):
+        return f"op.{name} validates every row under the lock (use the *_online helpers)"
+    return None
+
+
+def _suppressed(lines: List[str], lineno: int) -> bool:
+    return 0 < lineno <= len(lines) and IGNORE_MARKER in lines[lineno - 1]
+
+
+def lint_file(path: Path, large_tables: Iterable[str]) -> List[Finding]:
+    source = path.read_text()
+    lines = source.splitlines()
+    large = set(large_tables)
+    tree = ast.parse(source, filename=str(path))
+
+    upgrade = next(
+        (n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name == "upgrade"), None
+    )
+    if upgrade is None:
+        return []
+
+    created = {
+        _literal(node.args[0])
+        for node in ast.walk(upgrade)
+        if isinstance(node, ast.Call) and node.args
+        and isinstance(node.func, ast.Attribute) and node.func.attr == "create_table"
+        and isinstance(node.func.value, ast.Name) and node.func.value.id == "op"
+    }
+    findings: List[Finding] = []
+
+    def report(node, table, message):
+        if table in created:
+            return
+        if (table is None or table in large) and not _suppressed(lines, node.lineno):
+            findings.append(Finding(path, node.lineno, table, message))
+
+    for node in ast.walk(upgrade):
+        if not isinstance(node, ast.Call):
+            continue
+        func = node.func
+
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id == "op":
+            if func.attr in _OP_TABLE_ARG:
+                message = _op_finding(func.attr, node)
+                if message:
+                    report(node, _table_of(node, *_OP_TABLE_ARG[func.attr]), message)
+            elif func.attr == "execute" and node.args:
+                sql = _literal(node.args[0])
+                if sql is None and isinstance(node.args[0], ast.JoinedStr):
+                    # f-string: lint the constant parts, the table is unknown
+                    sql = "".join(_literal(v) or "x" for v in node.args[0].values)
+                for pattern, message in _SQL_RULES:
+                    match = pattern.search(sql or "")
+                    if match:
+                        table = match.group(1) if _literal(node.args[0]) is not None else None
+                        report(node, table, message)
+
+        elif isinstance(func, ast.Name) and func.id == "partition_table":
+            table = _literal(node.args[1]) if len(node.args) > 1 else None
+            report(node, table, "partition_table copies the whole table under ACCESS EXCLUSIVE")
+
+    return sorted(findings, key=lambda f: f.line)
+
+
+def lint(paths: Iterable[Path], large_tables: Iterable[str]) -> List[Finding]:
+    large_tables = list(large_tables)
+    return [f for path in paths for f in lint_file(path, large_tables)]
+
+
+def pending_revision_paths(target: str = "heads", schemas: Iterable[Optional[str]] = (None,)) -> List[Path]:
+    """
+    Files of the revisions between `target` and the current version of any
+    of `schemas` (None: the default schema), each once: tenants that lag
+    behind the others still get everything they are about to run linted.
+    """
+    from alembic.script import ScriptDirectory
+    from cli.migrations import alembic_config, current_revisions
+
+    script = ScriptDirectory.from_config(alembic_config())
+    paths = {}
+    for current in sorted(set(current_revisions(schemas).values()), key=lambda rev: rev or ""):
+        heads = current.split("+") if current else ["base"]
+        lower = heads[0] if len(heads) == 1 else tuple(heads)
+        for rev in script.iterate_revisions(target, lower):
+            if rev.path:
+                paths.setdefault(Path(rev.path), None)
+    return list(paths)
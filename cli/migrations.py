@@ -0,0 +1,213 @@
+"""
+Programmatic Alembic runs for `nova migrate`, one schema at a time or many
+tenant schemas in parallel.
+
+Each schema is migrated in its own worker *process*: Alembic's `context`
+is a module-level proxy, so threads would trample each other. Workers set
+`tenant_schema` / `lock_timeout` on the Alembic Config, env.py applies them
+(search_path, version table, SET lock_timeout).
+
+Finished schemas are recorded in a state file per target revision, so an
+interrupted or partly failed run continues where it stopped with --resume.
+"""
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+ALEMBIC_INI = BASE_DIR / "alembic.ini"
+
+# lock_not_available (lock_timeout expired)
+LOCK_TIMEOUT_SQLSTATE = "55P03"
+
+
+@dataclass
+class MigrationResult:
+    schema: Optional[str]
+    ok: bool
+    seconds: float
+    attempts: int = 1
+    revision: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class MigrationReport:
+    target: str
+    results: List[MigrationResult] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def failed(self) -> List[MigrationResult]:
+        return [r for r in self.results if not r.ok]
+
+
+# ---------------------------------------------------------
+# Alembic
+# ---------------------------------------------------------
+def alembic_config(schema: Optional[str] = None, lock_timeout: Optional[str] = None):
+    from alembic.config import Config
+
+    cfg = Config(str(ALEMBIC_INI))
+    cfg.set_main_option("script_location", str(BASE_DIR / "app" / "alembic"))
+    cfg.attributes["tenant_schema"] = schema
+    cfg.attributes["lock_timeout"] = lock_timeout
+    return cfg
+
+
+def head_revision(target: str = "heads") -> str:
+    """Revision(s) the target resolves to; keys the resume state."""
+    from alembic.script import ScriptDirectory
+
+    script = ScriptDirectory.from_config(alembic_config())
+    return "+".join(sorted(r.revision for r in script.get_revisions(target) if r is not None))
+
+
+def discover_tenants(prefix: str) -> List[str]:
+    from sqlalchemy import create_engine, text
+    from config.config import settings
+
+    engine = create_engine(settings.SYNC_DATABASE_URL)
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT schema_name FROM information_schema.schemata "
+                    "WHERE schema_name LIKE :pattern ORDER BY schema_name"
+                ),
+                {"pattern": prefix.replace("_", r"\_") + "%"},
+            )
+            return list(rows.scalars())
+    finally:
+        engine.dispose()
+
+
+def _current_revision(cfg) -> Optional[str]:
+    schema = cfg.attributes.get("tenant_schema")
+    return current_revisions([schema])[schema]
+
+
+def current_revisions(schemas: Iterable[Optional[str]]) -> Dict[Optional[str], Optional[str]]:
+    """{schema: current revision ("a+b" with several heads, None if unversioned)}, one connection."""
+    from alembic.runtime.migration import MigrationContext
+    from sqlalchemy import create_engine, text
+    from config.config import settings
+
+    revisions = {}
+    engine = create_engine(settings.SYNC_DATABASE_URL)
+    try:
+        with engine.connect() as conn:
+            for schema in schemas:
+                if schema:
+                    conn.execute(text(f'SET search_path TO "{schema}", public'))
+                else:
+                    conn.execute(text("SET search_path TO DEFAULT"))
+                heads = MigrationContext.configure(conn, opts={"version_table_schema": schema}).get_current_heads()
+                revisions[schema] = "+".join(sorted(heads)) or None
+    finally:
+        engine.dispose()
+    return revisions
+
+
+def migrate_schema(
+    schema: Optional[str],
+    target: str = "heads",
+    lock_timeout: Optional[str] = "5s",
+    retries: int = 2,
+    downgrade: bool = False,
+) -> MigrationResult:
+    """Upgrade (or downgrade) one schema; retries when lock_timeout expires."""
+    from alembic import command
+    from app.common.db.unit_of_work import sqlstate
+
+    cfg = alembic_config(schema, lock_timeout)
+    started = time.perf_counter()
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            (command.downgrade if downgrade else command.upgrade)(cfg, target)
+            return MigrationResult(
+                schema, True, time.perf_counter() - started, attempt, revision=_current_revision(cfg)
+            )
+        except Exception as exc:
+            if sqlstate(exc) == LOCK_TIMEOUT_SQLSTATE and attempt <= retries:
+                # someone holds a conflicting lock: back off and try again
+                time.sleep(random.uniform(0.5, 2.0) * attempt)
+                continue
+            return MigrationResult(
+                schema, False, time.perf_counter() - started, attempt, error=f"{type(exc).__name__}: {exc}"
+            )
+
+
+# ---------------------------------------------------------
+# Resume state
+# ---------------------------------------------------------
+class ResumeState:
+    """Schemas already migrated to `head`, persisted after every success."""
+
+    def __init__(self, path: Path, head: str):
+        self.path = path
+        self.head = head
+        self.done: set = set()
+        if path.exists():
+            data = json.loads(path.read_text())
+            if data.get("head") == head:
+                self.done = set(data.get("done", []))
+
+    def mark(self, schema: str):
+        self.done.add(schema)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"head": self.head, "done": sorted(self.done)}))
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        self.done = set()
+        if self.path.exists():
+            self.path.unlink()
+
+
+# ---------------------------------------------------------
+# Parallel run
+# ---------------------------------------------------------
+def migrate_tenants(
+    schemas: Iterable[str],
+    target: str = "heads",
+    workers: int = 4,
+    lock_timeout: Optional[str] = "5s",
+    retries: int = 2,
+    state: Optional[ResumeState] = None,
+    on_result: Callable[[MigrationResult, int, int], None] = None,
+) -> MigrationReport:
+    report = MigrationReport(target=target)
+    schemas = list(schemas)
+    if state is not None:
+        report.skipped = [s for s in schemas if s in state.done]
+        schemas = [s for s in schemas if s not in state.done]
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {
+            pool.submit(migrate_schema, schema, target, lock_timeout, retries): schema
+            for schema in schemas
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            try:
+                result = future.result()
+            except Exception as exc:  # worker died
+                result = MigrationResult(futures[future], False, 0.0, error=f"{type(exc).__name__}: {exc}")
+            report.results.append(result)
+            if result.ok and state is not None:
+                state.mark(result.schema)
+            if on_result:
+                on_result(result, done, len(schemas))
+
+    report.seconds = time.perf_counter() - started
+    return report
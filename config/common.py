@@ -100,6 +100,9 @@ class CommonConfig(BaseSettings):
 
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # Ephemeral secrets (app/modules/iam/services/token_store.py), seconds
+    PASSWORD_RESET_TOKEN_TTL: int = 3600
+
     BRUTE_FORCE_ATTEMPTS: int = 5
     BRUTE_FORCE_WINDOW: int = 300
     BRUTE_FORCE_LOCKOUT: int = 600
@@ -130,6 +133,59 @@ class CommonConfig(BaseSettings):
     
     DB_ECHO: bool = False
 
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+
+    # Statement caching
+    #   direct    -> straight to Postgres, asyncpg prepared statement cache on
+    #   pgbouncer -> PgBouncer transaction pooling: unique statement names so
+    #                prepared statements never collide across server connections.
+    #                The cache is off (size 0) unless DB_PREPARED_STATEMENT_CACHE_SIZE
+    #                is set: only PgBouncer >= 1.21 with max_prepared_statements > 0
+    #                (pgbouncer.ini) tracks prepared statements across server
+    #                connections; older versions fail with "prepared statement
+    #                ... does not exist".
+    #   disabled  -> no prepared statement cache (every query parses/plans)
+    DB_STATEMENT_MODE: Literal["direct", "pgbouncer", "disabled"] = "direct"
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int | None = None    # None: 100 direct, 0 pgbouncer
+    DB_COMPILED_CACHE_SIZE: int = 500   # SQLAlchemy compiled SQL cache per engine
+
+    # Query instrumentation (app/common/db/instrumentation.py)
+    DB_SLOW_QUERY_MS: int = 200         # log statements slower than this; 0 disables
+    DB_SERVER_TIMING: bool = False      # add "Server-Timing: db;dur=..." to responses
+
+    # Index advisor: EXPLAIN slow statements in the background (`nova db advise`)
+    DB_ADVISOR_ENABLED: bool = False
+    DB_ADVISOR_MIN_ROWS: int = 10000    # only flag seq scans on tables at least this big
+    DB_ADVISOR_DIR: str = "logs/query_advisor"
+
+    # Monthly partitions (app/common/db/partitioning.py, `nova db partitions`)
+    DB_PARTITION_PREMAKE_MONTHS: int = 3    # months created ahead of time
+    DB_PARTITION_RETENTION_MONTHS: dict[str, int] = {   # table -> months kept; absent = forever
+        "refresh_tokens": 3,
+        "one_time_passwords": 2,
+        "login_attempt": 3,
+        "access_log": 12,
+        "password_history": 24,
+    }
+
+    # `nova migrate up` (cli/migrations.py)
+    MIGRATE_LOCK_TIMEOUT: str = "5s"            # per schema; expired locks are retried
+    TENANT_SCHEMA_PREFIX: str = "tenant_"       # schemas picked up by --tenant all
+    MIGRATE_STATE_DIR: str = "logs/migrate_state"
+    MIGRATION_LARGE_TABLES: list[str] = [    # lock linter (cli/migration_lint.py) guards these
+        "users", "profiles", "refresh_tokens", "one_time_passwords",
+        "password_history", "login_attempt", "access_log", "user_settings",
+    ]
+
+    # Write-behind buffer for touch columns (app/common/db/write_behind.py)
+    WRITE_BEHIND_FLUSH_SECONDS: float = 2.0     # also the worst-case loss window on a crash
+    WRITE_BEHIND_MAX_PENDING: int = 5000        # flush early once this many keys are waiting
+
+    # Boot warm-up: pool, hot statements, caches (app/common/db/warmup.py)
+    DB_WARMUP_ENABLED: bool = True
+    DB_WARMUP_TIMEOUT: float = 30.0     # /health turns healthy after this even if warm-up hangs
+
     @computed_field
     @property
     def DATABASE_URL(self) -> str:
@@ -173,6 +229,14 @@ class CommonConfig(BaseSettings):
     REDIS_URL: str = "redis://localhost:6379/0"
     FASTAPI_CACHE_PREFIX: str = "fastapi-cache"
 
+    # Second-level cache for primary-key lookups (see app/core/cache/model_cache.py)
+    MODEL_CACHE_ENABLED: bool = True
+    MODEL_CACHE_TTL: dict[str, int] = {}   # per-table TTL overrides, e.g. {"users": 120}
+
+    # Per-process cache of user settings documents (UserSettingsRepository)
+    USER_SETTINGS_CACHE_TTL: int = 30
+    USER_SETTINGS_CACHE_SIZE: int = 10000
+
     # ============================================================
     #  MONGO LOG DATABASE
     # ============================================================
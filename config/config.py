@@ -1,8 +1,16 @@
+import logging
+from typing import TYPE_CHECKING, Any
+
 from pydantic_settings import SettingsConfigDict
 from .common import CommonConfig
 from .web import WebConfig
 from .console import ConsoleConfig
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger("app.config")
+
 
 class Settings(CommonConfig, WebConfig, ConsoleConfig):
     """
@@ -23,46 +31,44 @@ class Settings(CommonConfig, WebConfig, ConsoleConfig):
 # final global settings instance
 settings = Settings()
 
-#
-# class SystemConfig:
-#     _instance = None
-#     _settings_cache: dict[str, Any] = {}
-#
-#     def __new__(cls):
-#         if cls._instance is None:
-#             cls._instance = super(SystemConfig, cls).__new__(cls)
-#         return cls._instance
-#
-#     async def load_settings(self, db: AsyncSession):
-#         # Import inside method to avoid Circular Import errors
-#         from app.modules.main.repositories.settings_repository import SettingsRepository
-#
-#         repo = SettingsRepository(db)
-#
-#
-#         all_settings = await repo.list_active()
-#
-#
-#         self._settings_cache = {}
-#         for s in all_settings:
-#
-#             val = s.current_value if s.current_value is not None else s.default_value
-#             self._settings_cache[s.key] = val
-#
-#
-#         print(f"Loaded {len(self._settings_cache)} dynamic settings into memory.")
-#
-#     def get(self, key: str, default: Any = None) -> Any:
-#         if key in self._settings_cache:
-#             return self._settings_cache[key]
-#         env_value = getattr(settings, key.upper(), None)
-#         if env_value is not None:
-#             return env_value
-#         return default
-#
-#     def set_manual(self, key: str, value: Any):
-#         self._settings_cache[key] = value
-#
-#
-#
-# config = SystemConfig()
+
+# ---------------------------------------------------------
+# Runtime settings (system_settings table) over the env config
+# ---------------------------------------------------------
+class SystemConfig:
+    _instance = None
+    _settings_cache: dict[str, Any] = {}
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(SystemConfig, cls).__new__(cls)
+        return cls._instance
+
+    async def load_settings(self, db: "AsyncSession"):
+        # Import inside method to avoid Circular Import errors
+        from app.modules.main.repositories.settings_repository import SettingsRepository
+
+        repo = SettingsRepository(db)
+        all_settings = await repo.list_active()
+
+        cache = {}
+        for s in all_settings:
+            cache[s.key] = s.current_value if s.current_value is not None else s.default_value
+
+        # swap in one step, readers never see a half-filled cache
+        self._settings_cache = cache
+        logger.info("Loaded %d dynamic settings into memory.", len(cache))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._settings_cache:
+            return self._settings_cache[key]
+        env_value = getattr(settings, key.upper(), None)
+        if env_value is not None:
+            return env_value
+        return default
+
+    def set_manual(self, key: str, value: Any):
+        self._settings_cache[key] = value
+
+
+config = SystemConfig()
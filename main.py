@@ -12,6 +12,7 @@ from contextlib import asynccontextmanager
 from app.core.kernel import boot
 from app.common.db.sessions import close_db
 from app.core.security.auth_middleware import AuthMiddleware
+from app.core.middlewares.query_stats import QueryStatsMiddleware
 from config.config import settings
 from app.core.router_registry import register_routes
 from prometheus_fastapi_instrumentator import Instrumentator
@@ -95,6 +96,7 @@ if cors_origins:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "Server-Timing"],
     )
     logger.info("CORS middleware installed.")
 
@@ -107,6 +109,10 @@ app.add_middleware(
 )
 logger.info("Auth middleware installed.")
 
+# outermost: also counts statements issued by auth
+app.add_middleware(QueryStatsMiddleware)
+logger.info("Query stats middleware installed.")
+
 
 # 4) Register remaining middlewares via registry (this enforces order)
 # try:
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""
+Queries/second for UserRepository lookups under each DB_STATEMENT_MODE.
+
+    python scripts/benchmarks/statement_cache.py --seconds 10 --concurrency 20
+
+Point DB_HOST/DB_PORT at PgBouncer to measure the pgbouncer mode through a
+transaction pooler; "direct" is expected to fail there once statements
+are reused across server connections.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.common.db.sessions import _normalize_db_url_for_async, engine_options  # noqa: E402
+from app.modules.iam.models.user import User  # noqa: E402
+from app.modules.iam.repositories.user_repository import UserRepository  # noqa: E402
+from config.config import settings  # noqa: E402
+
+MODES = ["direct", "pgbouncer", "disabled"]
+
+
+async def bench_mode(mode: str, seconds: float, concurrency: int) -> dict:
+    db_url = _normalize_db_url_for_async(settings.DATABASE_URL)
+    engine = create_async_engine(db_url, **engine_options(db_url, mode))
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    repo = UserRepository()
+
+    async with sessionmaker() as db:
+        sample = (await db.execute(select(User).limit(1))).scalar_one_or_none()
+    if sample is None:
+        await engine.dispose()
+        raise SystemExit("No users found; seed the database first.")
+
+    methods = {
+        "get_by_username": lambda db: repo.get_by_username(db, sample.username),
+        "get_by_username_or_email": lambda db: repo.get_by_username_or_email(db, sample.username),
+        "get_profile": lambda db: repo.get_profile(db, sample),
+        "username_exists": lambda db: repo.username_exists(db, sample.username),
+    }
+
+    results = {}
+    for name, call in methods.items():
+        count = 0
+        deadline = time.perf_counter() + seconds
+
+        async def worker():
+            nonlocal count
+            # one transaction per query, like a short request behind PgBouncer
+            while time.perf_counter() < deadline:
+                async with sessionmaker() as db:
+                    await call(db)
+                    await db.commit()
+                count += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        results[name] = count / (time.perf_counter() - started)
+
+    await engine.dispose()
+    return results
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration per method and mode")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--mode", choices=MODES, action="append", help="repeatable; default: all")
+    args = parser.parse_args()
+
+    table = {}
+    for mode in args.mode or MODES:
+        try:
+            table[mode] = await bench_mode(mode, args.seconds, args.concurrency)
+        except Exception as exc:  # e.g. "direct" through PgBouncer
+            table[mode] = {"error": f"{type(exc).__name__}: {exc}"}
+
+    modes = list(table)
+    methods = sorted({m for r in table.values() for m in r if m != "error"})
+    print(f"{'method':<28}" + "".join(f"{m:>14}" for m in modes))  # noqa: T201
+    for method in methods:
+        row = "".join(
+            f"{table[m][method]:>14.0f}" if method in table[m] else f"{'error':>14}" for m in modes
+        )
+        print(f"{method:<28}{row}")  # noqa: T201
+    for mode, result in table.items():
+        if "error" in result:
+            print(f"{mode}: {result['error']}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Insert throughput, primary key index size and WAL volume: uuid4 vs uuid7 keys.
+
+    python scripts/benchmarks/uuid_inserts.py --rows 500000 --batch 1000
+
+Each key type gets its own scratch table (dropped afterwards) shaped like
+`users`: uuid primary key plus a unique varchar. The gap widens once the
+index no longer fits in shared_buffers, so use enough rows.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+from app.common.db.mixins.uuid_mixin import uuid7  # noqa: E402
+from app.common.db.sessions import _normalize_db_url_for_async  # noqa: E402
+from config.config import settings  # noqa: E402
+
+GENERATORS = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+
+
+async def bench(engine, name: str, rows: int, batch: int) -> dict:
+    table = f"bench_{name}_keys"
+    generate = GENERATORS[name]
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        await conn.execute(text(
+            f"CREATE TABLE {table} (id uuid PRIMARY KEY, username varchar(64) UNIQUE NOT NULL)"
+        ))
+
+    insert = text(f"INSERT INTO {table} (id, username) VALUES (:id, :username)")
+    async with engine.connect() as conn:
+        wal_start = (await conn.execute(text("SELECT pg_current_wal_lsn()"))).scalar()
+
+    started = time.perf_counter()
+    for offset in range(0, rows, batch):
+        params = [
+            {"id": generate(), "username": f"user{i}"}
+            for i in range(offset, min(offset + batch, rows))
+        ]
+        async with engine.begin() as conn:
+            await conn.execute(insert, params)
+    elapsed = time.perf_counter() - started
+
+    async with engine.connect() as conn:
+        wal_bytes = (await conn.execute(
+            text("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), CAST(:start AS pg_lsn))"),
+            {"start": wal_start},
+        )).scalar()
+        index_bytes = (await conn.execute(
+            text("SELECT pg_relation_size(CAST(:index AS regclass))"), {"index": f"{table}_pkey"}
+        )).scalar()
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE {table}"))
+
+    return {
+        "rows_per_sec": rows / elapsed,
+        "seconds": elapsed,
+        "pkey_mb": index_bytes / 1024 / 1024,
+        "wal_mb": float(wal_bytes) / 1024 / 1024,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    engine = create_async_engine(_normalize_db_url_for_async(settings.DATABASE_URL))
+    try:
+        results = {name: await bench(engine, name, args.rows, args.batch) for name in GENERATORS}
+    finally:
+        await engine.dispose()
+
+    print(f"{'key':<8}{'rows/s':>12}{'seconds':>10}{'pkey MB':>10}{'WAL MB':>10}")  # noqa: T201
+    for name, r in results.items():
+        print(  # noqa: T201
+            f"{name:<8}{r['rows_per_sec']:>12.0f}{r['seconds']:>10.2f}{r['pkey_mb']:>10.1f}{r['wal_mb']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
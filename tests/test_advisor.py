@@ -0,0 +1,26 @@
+from app.common.db.advisor import fingerprint, suggest_index
+
+
+def test_suggest_index_orders_equality_before_range():
+    condition = "((created_at >= 1700000000) AND (status = 10))"
+    assert suggest_index("users", condition) == (
+        "CREATE INDEX CONCURRENTLY ix_users_status_created_at ON users (status, created_at);"
+    )
+
+
+def test_suggest_index_keeps_lower_expression():
+    condition = "(lower((email_address)::text) = 'a@b.c'::text)"
+    assert suggest_index("profiles", condition) == (
+        "CREATE INDEX CONCURRENTLY ix_profiles_lower_email_address ON profiles (lower(email_address));"
+    )
+
+
+def test_suggest_index_uses_trigram_for_ilike():
+    condition = "((username)::text ~~* '%ann%'::text)"
+    assert "USING gin (username gin_trgm_ops)" in suggest_index("users", condition)
+
+
+def test_fingerprint_ignores_in_list_length_and_whitespace():
+    a = "SELECT * FROM users WHERE user_id IN ($1, $2)"
+    b = "SELECT *\n  FROM users WHERE user_id IN ($1, $2, $3)"
+    assert fingerprint(a) == fingerprint(b)
@@ -0,0 +1,33 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.modules.main.models.system_setting import SystemSetting
+from app.modules.main.repositories.settings_repository import SettingsRepository
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_bumps_version_and_updated_at():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda sync: SystemSetting.metadata.create_all(sync, tables=[SystemSetting.__table__]))
+
+        async with AsyncSession(engine) as db:
+            db.add_all([
+                SystemSetting(key=key, label=key, disposition=1, input_type="text",
+                              default_value="", current_value="old", updated_at=1)
+                for key in ("smtp_host", "smtp_port")
+            ])
+            await db.commit()
+
+            assert await SettingsRepository(db).bulk_update(["smtp_host", "smtp_port"], {"current_value": "x"}) == 2
+            await db.commit()
+
+            db.expunge_all()
+            rows = (await db.execute(select(SystemSetting))).scalars().all()
+            assert {(r.current_value, r.version_id) for r in rows} == {("x", 2)}
+            assert all(r.updated_at > 1 for r in rows)
+    finally:
+        await engine.dispose()
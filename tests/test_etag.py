@@ -0,0 +1,37 @@
+import pytest
+from fastapi import HTTPException
+
+from app.common.etag import check_if_match, expected_version, parse_if_match
+from app.common.exceptions import ConflictError, PreconditionFailed
+
+
+def test_no_precondition():
+    assert parse_if_match(None) is None
+    assert parse_if_match(" * ") is None
+    assert expected_version(None) is None
+
+
+def test_strong_tags_are_parsed_and_weak_ones_dropped():
+    assert parse_if_match('"3", W/"4" ,"a,b"') == {'"3"', '"a,b"'}
+    assert expected_version('"3"') == 3
+
+
+@pytest.mark.parametrize("header", ['W/"3"', '"3", "4"', '"abc"'])
+def test_version_that_cannot_match_is_412(header):
+    with pytest.raises(PreconditionFailed):
+        expected_version(header)
+
+
+@pytest.mark.parametrize("header", ["3", '"3', '"3" "4"', '"3",'])
+def test_malformed_header_is_400(header):
+    with pytest.raises(HTTPException) as error:
+        expected_version(header)
+    assert error.value.status_code == 400
+
+
+def test_check_if_match():
+    check_if_match('"x", "y"', '"y"')
+    with pytest.raises(ConflictError):
+        check_if_match('"x"', '"y"')
+    with pytest.raises(PreconditionFailed):
+        check_if_match('W/"y"', '"y"')
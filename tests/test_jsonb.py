@@ -0,0 +1,162 @@
+import asyncio
+import os
+import uuid
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.sql import literal
+
+from app.common.db.jsonb import apply_patch, document_contains, json_path, jsonb_set
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+SCHEMA = "jsonb_test"
+
+postgres_only = pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL not set (Postgres only)")
+
+PATCH_CASES = [
+    ({"theme": {"mode": "light"}}, {"theme.mode": "dark", "theme.accent": "blue", "locale": "sw"}),
+    ({}, {"notifications.email": True, "notifications.sms": False}),
+    ({"a": {"b": 1}}, {"a.c.d": 2}),
+    ({"a": "text"}, {"a.b": 1}),
+    ({"a": None}, {"a.b": 1}),
+    ({}, {"a": 5, "a.b": 1}),
+    ({}, {"a.b": 1, "a": {}}),
+]
+
+
+def test_json_path():
+    assert json_path("theme.mode") == ["theme", "mode"]
+    assert json_path(["a", 1]) == ["a", "1"]
+
+
+def test_apply_patch_matches_jsonb_set():
+    document = {"theme": {"mode": "light"}, "locale": "en"}
+
+    patched = apply_patch(document, {"theme.mode": "dark", "theme.accent": "blue", "locale": "sw"})
+
+    assert patched == {"theme": {"mode": "dark", "accent": "blue"}, "locale": "sw"}
+    assert document["theme"]["mode"] == "light"  # input untouched
+
+
+def test_apply_patch_builds_missing_parents():
+    assert apply_patch({}, {"notifications.email": True}) == {"notifications": {"email": True}}
+    assert apply_patch(None, {"locale": "sw"}) == {"locale": "sw"}
+    # a path under a value that is not an object is left alone, as in jsonb_set
+    assert apply_patch({"a": "text"}, {"a.b": 1}) == {"a": "text"}
+
+
+def test_document_contains_follows_jsonb_containment():
+    document = {"notifications": {"email": True, "sms": False}, "tags": ["a", "b"], "locale": "sw"}
+
+    assert document_contains(document, {})
+    assert document_contains(document, {"notifications": {"email": True}})
+    assert document_contains(document, {"tags": ["b"]})
+    assert not document_contains(document, {"notifications": {"email": False}})
+    assert not document_contains(document, {"tags": ["c"]})
+    assert not document_contains(document, {"missing": None})
+    assert document_contains(["a", ["b"]], [["b"]])
+    assert document_contains("a", ["a"])
+
+
+# ---------------------------------------------------------
+# Postgres
+# ---------------------------------------------------------
+@pytest_asyncio.fixture
+async def jsonb_engine():
+    from app.modules.iam.models.profile import Profile
+    from app.modules.iam.models.user import User
+    from app.modules.iam.models.user_settings import UserSettings
+
+    engine = create_async_engine(DATABASE_URL, connect_args={"server_settings": {"search_path": SCHEMA}})
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(
+            lambda sync: Profile.metadata.create_all(
+                sync, tables=[Profile.__table__, User.__table__, UserSettings.__table__]
+            )
+        )
+    try:
+        yield engine
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+async def _user(engine, data=None):
+    from app.modules.iam.models.profile import Profile
+    from app.modules.iam.models.user import User
+
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        profile = Profile(id=uuid.uuid4().hex, first_name="A", last_name="B", data=data or {},
+                          email_address=f"{uuid.uuid4().hex[:8]}@example.com",
+                          phone_number=f"07{uuid.uuid4().int % 10**8:08d}")
+        user = User(username=uuid.uuid4().hex[:12], profile_id=profile.id, password_hash="x", status=10)
+        db.add_all([profile, user])
+        await db.commit()
+        return user
+
+
+@postgres_only
+@pytest.mark.asyncio
+@pytest.mark.parametrize("document, changes", PATCH_CASES)
+async def test_jsonb_set_matches_apply_patch(jsonb_engine, document, changes):
+    async with jsonb_engine.connect() as conn:
+        patched = (await conn.execute(select(jsonb_set(literal(document, JSONB), changes)))).scalar()
+
+    assert patched == apply_patch(document, changes)
+
+
+@postgres_only
+@pytest.mark.asyncio
+async def test_concurrent_first_patches_both_land(jsonb_engine):
+    from app.modules.iam.repositories.user_settings_repository import UserSettingsRepository
+
+    user = await _user(jsonb_engine)
+    repo = UserSettingsRepository()
+
+    async def patch(changes):
+        async with AsyncSession(jsonb_engine) as db:
+            await repo.patch(db, user.user_id, changes)
+            await db.commit()
+
+    await asyncio.gather(patch({"notifications.email": True}), patch({"theme.mode": "dark"}))
+
+    async with AsyncSession(jsonb_engine) as db:
+        assert await repo.get_data(db, user.user_id) == {
+            "notifications": {"email": True}, "theme": {"mode": "dark"},
+        }
+        assert await repo.find_user_ids_with(db, {"theme": {"mode": "dark"}}) == [user.user_id]
+
+        await repo.replace(db, user.user_id, {"locale": "sw"})
+        await db.commit()
+        assert await repo.get_data(db, user.user_id) == {"locale": "sw"}
+
+
+@postgres_only
+@pytest.mark.asyncio
+async def test_base_repository_json_helpers(jsonb_engine):
+    from app.common.base.base_repository import BaseRepository
+    from app.modules.iam.models.profile import Profile
+    from app.modules.iam.repositories.user_repository import UserRepository
+
+    class ProfileRepository(BaseRepository):
+        model = Profile
+
+    swahili = await _user(jsonb_engine, {"locale": "sw"})
+    await _user(jsonb_engine, {"locale": "en"})
+
+    async with AsyncSession(jsonb_engine) as db:
+        repo = ProfileRepository(db)
+        found = await repo.find_containing("data", {"locale": "sw"})
+        assert [p.id for p in found] == [swahili.profile_id]
+        assert [p.id for p in await UserRepository().find_profiles_by_data(db, {"locale": "sw"})] == [swahili.profile_id]
+
+        document = await repo.patch_json(swahili.profile_id, "data", {"address.city": "Nairobi"})
+        assert document == {"locale": "sw", "address": {"city": "Nairobi"}}
+        assert await repo.patch_json("missing", "data", {"locale": "en"}) is None
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from app.common.db.loader import DataLoader
+
+
+@pytest.mark.asyncio
+async def test_loads_in_same_tick_are_batched_and_deduplicated():
+    calls = []
+
+    async def batch(keys):
+        calls.append(list(keys))
+        return {k: k * 10 for k in keys if k != 3}
+
+    loader = DataLoader(batch)
+    results = await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(3))
+
+    assert results == [10, 20, 10, None]
+    assert calls == [[1, 2, 3]]
+
+    # memoized: no second batch
+    assert await loader.load(2) == 20
+    assert calls == [[1, 2, 3]]
+
+
+@pytest.mark.asyncio
+async def test_batch_errors_propagate_and_are_not_cached():
+    attempts = 0
+
+    async def batch(keys):
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise RuntimeError("db down")
+        return {k: k for k in keys}
+
+    loader = DataLoader(batch)
+    with pytest.raises(RuntimeError):
+        await loader.load(1)
+
+    assert await loader.load(1) == 1
+
+
+def test_loader_memo_ends_with_the_transaction():
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import Session
+
+    from app.common.db.loader import get_loader
+
+    async def batch(keys):
+        return {k: k for k in keys}
+
+    with Session(create_engine("sqlite://")) as session:
+        loader = get_loader(session, "items", batch)
+        assert get_loader(session, "items", batch) is loader
+
+        session.execute(text("SELECT 1"))
+        session.commit()
+        assert get_loader(session, "items", batch) is not loader
+
+        loader = get_loader(session, "items", batch)
+        session.execute(text("SELECT 1"))
+        session.rollback()
+        assert get_loader(session, "items", batch) is not loader
+
+
+@pytest.mark.asyncio
+async def test_chunks_run_one_after_another():
+    in_flight, peak, calls = 0, 0, []
+
+    async def batch(keys):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        calls.append(list(keys))
+        in_flight -= 1
+        return {k: k for k in keys}
+
+    loader = DataLoader(batch, max_batch_size=2)
+    assert await loader.load_many([1, 2, 3, 4, 5]) == [1, 2, 3, 4, 5]
+    assert calls == [[1, 2], [3, 4], [5]]
+    assert peak == 1
+
+
+@pytest.mark.asyncio
+async def test_loaders_of_one_session_do_not_query_concurrently():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from app.common.db.loader import get_loader
+
+    in_flight, peak = 0, 0
+
+    async def batch(keys):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)   # a query: yields to the other loader
+        in_flight -= 1
+        return {k: k for k in keys}
+
+    with Session(create_engine("sqlite://")) as session:
+        users, profiles = get_loader(session, "users", batch), get_loader(session, "profiles", batch)
+        # both dispatch in the same tick; the session allows one operation at a time
+        assert await asyncio.gather(users.load(1), profiles.load(2)) == [1, 2]
+
+    assert peak == 1
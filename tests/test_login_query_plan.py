@@ -0,0 +1,47 @@
+import os
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.common.db.explain import Explain, plan_root
+from app.modules.iam.models.profile import Profile
+from app.modules.iam.models.user import User
+from app.modules.iam.repositories.user_repository import UserRepository
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL not set (Postgres only)")
+
+
+def _scans(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _scans(child)
+
+
+@pytest.mark.asyncio
+async def test_login_lookups_do_not_seq_scan():
+    engine = create_async_engine(DATABASE_URL)
+    repo = UserRepository()
+    try:
+        async with engine.connect() as conn:
+            trans = await conn.begin()
+            await conn.execute(text("CREATE SCHEMA login_plan_test"))
+            await conn.execute(text("SET LOCAL search_path TO login_plan_test, public"))
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            await conn.run_sync(
+                lambda sync: Profile.metadata.create_all(sync, tables=[Profile.__table__, User.__table__])
+            )
+            # tiny tables would make a seq scan "cheapest"; ask the planner for the index path
+            await conn.execute(text("SET LOCAL enable_seqscan = off"))
+
+            session = AsyncSession(bind=conn)
+            for stmt in (repo._username_lookup("Alice"), repo._email_lookup("Alice@Example.com")):
+                plan = plan_root((await session.execute(Explain(stmt))).scalar())
+                seq = [n["Relation Name"] for n in _scans(plan) if n["Node Type"] == "Seq Scan"]
+                assert not seq, f"sequential scan on {seq}"
+
+            await trans.rollback()
+    finally:
+        await engine.dispose()
@@ -0,0 +1,70 @@
+from cli.migration_lint import lint_file
+
+REVISION = '''
+from alembic import op
+import sqlalchemy as sa
+from app.common.db.online_migrations import create_index_concurrently
+
+
+def upgrade():
+    op.create_index('ix_users_email', 'users', ['email'])
+    op.create_index('ix_tags_name', 'tags', ['name'])
+    create_index_concurrently('ix_users_phone', 'users', ['phone'])
+    op.create_index('ix_users_x', 'users', ['x'], postgresql_concurrently=True)
+    op.execute("ALTER TABLE profiles ALTER COLUMN is_deleted TYPE boolean USING is_deleted <> 0")
+    op.execute("ALTER TABLE users ADD CONSTRAINT fk FOREIGN KEY (a) REFERENCES b (id) NOT VALID")
+    op.add_column('users', sa.Column('flag', sa.Boolean(), nullable=False))
+    op.drop_index('ix_users_old', table_name='users')  # nova: lock-ok
+
+
+def downgrade():
+    op.drop_index('ix_users_email', table_name='users')
+'''
+
+
+def test_flags_locking_operations_on_large_tables(tmp_path):
+    path = tmp_path / "abc_revision.py"
+    path.write_text(REVISION)
+
+    findings = lint_file(path, ["users", "profiles"])
+
+    assert [(f.line, f.table) for f in findings] == [(8, "users"), (12, "profiles"), (14, "users")]
+    assert "create_index_concurrently" in findings[0].message
+
+
+def test_pending_revisions_cover_every_selected_schema(monkeypatch):
+    import cli.migrations
+    from cli.migration_lint import pending_revision_paths
+    from cli.migrations import head_revision
+
+    current = {"tenant_a": head_revision(), "tenant_b": "d2b7e4c19a60"}
+    monkeypatch.setattr(cli.migrations, "current_revisions", lambda schemas: {s: current[s] for s in schemas})
+
+    assert pending_revision_paths("heads", ["tenant_a"]) == []
+    # tenant_a is up to date, tenant_b is not: its pending revisions are linted
+    names = {path.name for path in pending_revision_paths("heads", ["tenant_a", "tenant_b"])}
+    assert "e7a3f1c86b24_monthly_partitions.py" in names
+    assert "d2b7e4c19a60_soft_delete_partial_indexes.py" not in names
+
+
+def test_tables_created_in_the_same_revision_are_not_flagged(tmp_path):
+    path = tmp_path / "def_revision.py"
+    path.write_text(
+        "from alembic import op\n"
+        "import sqlalchemy as sa\n"
+        "\n"
+        "\n"
+        "def upgrade():\n"
+        "    op.create_table('users', sa.Column('id', sa.Integer()))\n"
+        "    op.create_index('ix_users_id', 'users', ['id'])\n"
+        "    op.create_index('ix_profiles_id', 'profiles', ['id'])\n"
+    )
+
+    assert [(f.line, f.table) for f in lint_file(path, ["users", "profiles"])] == [(8, "profiles")]
+
+
+def test_shipped_revisions_lint_clean():
+    from cli.migration_lint import lint, revision_paths
+    from config.config import settings
+
+    assert [str(f) for f in lint(revision_paths(), settings.MIGRATION_LARGE_TABLES)] == []
@@ -0,0 +1,53 @@
+import asyncio
+
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from sqlalchemy import Integer, String, create_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+from app.core.cache.cache_utils import delete_cache, get_cache, set_cache
+from app.core.cache.model_cache import _serialize, cached_model, model_cache
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+@cached_model(ttl=60, exclude=("secret",))
+class Account(_Base):
+    __tablename__ = "accounts"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(50))
+    secret: Mapped[str] = mapped_column(String(50))
+
+
+def test_commit_evicts_the_shared_entry():
+    FastAPICache.init(InMemoryBackend(), prefix="test")
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+
+    async def run():
+        with Session(engine) as session:
+            session.add(Account(id=1, name="old", secret="s3cret"))
+            session.commit()
+
+            key = model_cache.key(Account, 1)
+            await set_cache(key, '{"id": 1, "name": "old"}', expire=60)
+
+            session.get(Account, 1).name = "new"
+            session.commit()
+            await model_cache.drain()
+
+            assert await get_cache(key) is None
+
+    asyncio.run(run())
+
+
+def test_delete_of_a_missing_key_is_not_an_error():
+    FastAPICache.init(InMemoryBackend(), prefix="test")
+    assert asyncio.run(delete_cache("mc:accounts:404")) == 0
+
+
+def test_excluded_columns_never_reach_the_payload():
+    payload = _serialize(Account(id=1, name="a", secret="s3cret"), frozenset({"secret"}))
+    assert payload == {"id": 1, "name": "a"}
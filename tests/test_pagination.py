@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+from sqlalchemy import Integer, create_engine, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+from app.common.db.data_provider import DataProvider
+from app.common.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("-created_at", [1700000000, "0b6f4a4e-7c1e-4c55-9f0e-2a1d2c3b4a5f"])
+    assert "=" not in cursor
+
+    sort, keys = decode_cursor(cursor)
+    assert sort == "-created_at"
+    assert keys == [1700000000, "0b6f4a4e-7c1e-4c55-9f0e-2a1d2c3b4a5f"]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", encode_cursor(None, []).upper()])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+# -----------------------
+# Keyset pages over a nullable sort key (sqlite)
+# -----------------------
+class _Base(DeclarativeBase):
+    pass
+
+
+class Scored(_Base):
+    __tablename__ = "scored"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    score: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+
+class _SyncAsSession:
+    """Just enough of AsyncSession for DataProvider, over a sync sqlite Session."""
+
+    def __init__(self, session):
+        self.session = session
+
+    async def execute(self, stmt):
+        return self.session.execute(stmt)
+
+
+def _walk(db, sort):
+    seen, cursor = [], None
+    while True:
+        page = asyncio.run(
+            DataProvider(select(Scored), db, page_size=2, sort=sort, cursor=cursor, mode="cursor").get_cursor_page()
+        )
+        seen += [row.id for row in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return seen
+
+
+@pytest.mark.parametrize("sort", ["score", "-score"])
+def test_cursor_pages_keep_rows_with_null_sort_keys(sort):
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    scores = {1: 30, 2: None, 3: 10, 4: None, 5: 20, 6: 10, 7: None}
+
+    with Session(engine) as session:
+        session.add_all(Scored(id=i, score=s) for i, s in scores.items())
+        session.commit()
+
+        ids = _walk(_SyncAsSession(session), sort)
+
+    ascending = [3, 6, 5, 1, 2, 4, 7]  # values upwards, then NULLs by id
+    assert ids == (ascending if sort == "score" else ascending[::-1])
@@ -0,0 +1,220 @@
+import os
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+from app.common.db import partitioning
+from app.common.db.partitioning import (
+    add_months,
+    legacy_partition_boundary,
+    legacy_partition_name,
+    maintain_partitions,
+    month_bounds,
+    month_start,
+    partition_month,
+    partition_name,
+)
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+SCHEMA = "partitioning_test"
+
+
+def test_month_arithmetic_wraps_years():
+    jan = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert add_months(jan, -1) == datetime(2025, 12, 1, tzinfo=timezone.utc)
+    assert add_months(jan, 13) == datetime(2027, 2, 1, tzinfo=timezone.utc)
+    assert month_start(datetime(2026, 3, 31, 23, 59, tzinfo=timezone.utc)) == datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def test_bounds_are_contiguous_epoch_seconds():
+    march = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    low, high = month_bounds(march)
+    assert low == int(march.timestamp())
+    assert high == month_bounds(add_months(march, 1))[0]
+
+
+def test_partition_names_round_trip():
+    month = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    name = partition_name("refresh_tokens", month)
+    assert name == "refresh_tokens_p202610"
+    assert partition_month("refresh_tokens", name) == month
+    assert partition_month("refresh_tokens", "refresh_tokens_default") is None
+
+    legacy = legacy_partition_name("refresh_tokens", month)
+    assert legacy == "refresh_tokens_before202610"
+    assert legacy_partition_boundary("refresh_tokens", legacy) == month
+    assert partition_month("refresh_tokens", legacy) is None
+
+
+def test_maintenance_dry_run_decides_without_ddl(monkeypatch, caplog):
+    existing = [
+        "refresh_tokens_before202609", "refresh_tokens_default",
+        "refresh_tokens_p202609", "refresh_tokens_p202610", "refresh_tokens_p202611", "refresh_tokens_p202612",
+    ]
+    monkeypatch.setattr(partitioning, "is_partitioned", lambda conn, table: table == "refresh_tokens")
+    monkeypatch.setattr(partitioning, "list_partitions", lambda conn, table: existing)
+    monkeypatch.setattr(partitioning, "default_rows", lambda conn, table: 7)
+
+    report = maintain_partitions(
+        conn=None,   # any DDL would fail on it
+        now=datetime(2026, 12, 15, tzinfo=timezone.utc),
+        premake=2,
+        retention={"refresh_tokens": 3},
+        dry_run=True,
+    )
+
+    assert list(report) == ["refresh_tokens"]
+    # keeps October..December; the legacy rows all lie before September
+    assert report["refresh_tokens"] == {
+        "created": ["refresh_tokens_p202701", "refresh_tokens_p202702"],
+        "dropped": ["refresh_tokens_before202609", "refresh_tokens_p202609"],
+        "failed": [],
+        "months_ahead": 0,
+        "default_rows": 7,
+    }
+    assert "no partition for next month" in caplog.text
+    assert "7 rows in its default partition" in caplog.text
+
+
+def test_legacy_partition_is_kept_until_retention_passes_its_boundary(monkeypatch):
+    existing = ["refresh_tokens_before202609", "refresh_tokens_p202609", "refresh_tokens_p202610"]
+    monkeypatch.setattr(partitioning, "is_partitioned", lambda conn, table: table == "refresh_tokens")
+    monkeypatch.setattr(partitioning, "list_partitions", lambda conn, table: existing)
+    monkeypatch.setattr(partitioning, "default_rows", lambda conn, table: 0)
+
+    report = maintain_partitions(
+        conn=None, now=datetime(2026, 10, 2, tzinfo=timezone.utc), premake=0,
+        retention={"refresh_tokens": 3}, dry_run=True,
+    )
+
+    assert report["refresh_tokens"]["created"] == []
+    assert report["refresh_tokens"]["dropped"] == []
+
+
+class _Connection:
+    def __init__(self):
+        self.log = []
+
+    def commit(self):
+        self.log.append("commit")
+
+    def rollback(self):
+        self.log.append("rollback")
+
+
+def test_maintenance_commits_each_step_and_carries_on_after_a_failure(monkeypatch, caplog):
+    existing = ["refresh_tokens_p202607", "refresh_tokens_p202608", "refresh_tokens_p202609", "refresh_tokens_p202610"]
+    conn = _Connection()
+
+    def create(conn, table, month):
+        conn.log.append(("create", partition_name(table, month)))
+
+    def drop(conn, table, name):
+        if name == "refresh_tokens_p202607":
+            raise RuntimeError("canceling statement due to lock timeout")
+        conn.log.append(("drop", name))
+
+    monkeypatch.setattr(partitioning, "is_partitioned", lambda conn, table: table == "refresh_tokens")
+    monkeypatch.setattr(partitioning, "list_partitions", lambda conn, table: existing)
+    monkeypatch.setattr(partitioning, "default_rows", lambda conn, table: 0)
+    monkeypatch.setattr(partitioning, "create_partition", create)
+    monkeypatch.setattr(partitioning, "drop_partition", drop)
+
+    report = maintain_partitions(
+        conn=conn, now=datetime(2026, 10, 2, tzinfo=timezone.utc), premake=1, retention={"refresh_tokens": 2},
+    )
+
+    assert report["refresh_tokens"]["created"] == ["refresh_tokens_p202611"]
+    assert report["refresh_tokens"]["dropped"] == ["refresh_tokens_p202608"]
+    assert report["refresh_tokens"]["failed"] == ["refresh_tokens_p202607"]
+    assert conn.log == [
+        "commit", ("create", "refresh_tokens_p202611"), "commit",
+        "commit", "rollback",
+        "commit", ("drop", "refresh_tokens_p202608"), "commit",
+    ]
+    assert "refresh_tokens: drop of refresh_tokens_p202607 failed" in caplog.text
+
+
+# ---------------------------------------------------------
+# partition_table_online (Postgres)
+# ---------------------------------------------------------
+@pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL not set (Postgres only)")
+def test_partition_table_online_attaches_the_old_table():
+    from alembic.operations import Operations
+    from alembic.runtime.migration import MigrationContext
+
+    from app.common.db.online_migrations import partition_table_online
+
+    engine = create_engine(
+        make_url(DATABASE_URL).set(drivername="postgresql+psycopg"),
+        connect_args={"options": f"-csearch_path={SCHEMA}"},
+    )
+    now = int(datetime.now(timezone.utc).timestamp())
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            conn.execute(text("CREATE TABLE users (user_id int PRIMARY KEY)"))
+            conn.execute(text(
+                "CREATE TABLE login_attempt (attempt_id serial PRIMARY KEY, "
+                "user_id int REFERENCES users (user_id) ON DELETE SET NULL, "
+                "ip_address varchar(45) NOT NULL, created_at int NOT NULL)"
+            ))
+            conn.execute(text("CREATE INDEX idx_login_attempt_user_id ON login_attempt (user_id)"))
+            conn.execute(text("INSERT INTO users VALUES (1)"))
+            conn.execute(text(
+                "INSERT INTO login_attempt (user_id, ip_address, created_at) "
+                "VALUES (1, '10.0.0.1', :old), (NULL, '10.0.0.2', :now)"
+            ), {"old": now - 400 * 86400, "now": now})
+
+        with engine.connect() as conn:
+            context = MigrationContext.configure(conn)
+            with Operations.context(context), context.begin_transaction():
+                partition_table_online(
+                    "login_attempt", "attempt_id",
+                    foreign_keys=["FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE SET NULL"],
+                    indexes={"idx_login_attempt_user_id": ["user_id"], "idx_login_attempt_ip_address": ["ip_address"]},
+                )
+
+        boundary = add_months(month_start(), 2)
+        with engine.begin() as conn:
+            partitions = partitioning.list_partitions(conn, "login_attempt")
+            assert legacy_partition_name("login_attempt", boundary) in partitions
+            assert partition_name("login_attempt", boundary) in partitions
+            assert "login_attempt_default" in partitions
+
+            # old rows stayed, new ones get the next id, the parent owns the indexes
+            conn.execute(text("INSERT INTO login_attempt (ip_address, created_at) VALUES ('10.0.0.3', :now)"),
+                         {"now": now})
+            ids = conn.execute(text("SELECT attempt_id FROM login_attempt ORDER BY attempt_id")).scalars().all()
+            assert ids == [1, 2, 3]
+            indexes = set(conn.execute(text(
+                "SELECT indexname FROM pg_indexes WHERE tablename = 'login_attempt' AND schemaname = :schema"
+            ), {"schema": SCHEMA}).scalars())
+            assert {"login_attempt_pkey", "idx_login_attempt_user_id", "idx_login_attempt_ip_address"} <= indexes
+
+            # ATTACH adopted the old table's indexes and foreign key instead of building new ones
+            legacy = legacy_partition_name("login_attempt", boundary)
+            assert conn.execute(text("SELECT count(*) FROM pg_indexes WHERE tablename = :t AND schemaname = :s"),
+                                {"t": legacy, "s": SCHEMA}).scalar() == 3
+            assert conn.execute(text(
+                "SELECT count(*) FROM pg_constraint WHERE conrelid = CAST(:t AS regclass) AND contype = 'f'"
+            ), {"t": legacy}).scalar() == 1
+
+            # a month nobody made lands in the default partition, and moves out once it is made
+            far = add_months(boundary, 12)
+            conn.execute(text("INSERT INTO login_attempt (ip_address, created_at) VALUES ('10.0.0.4', :at)"),
+                         {"at": month_bounds(far)[0] + 60})
+            assert partitioning.default_rows(conn, "login_attempt") == 1
+            partitioning.create_partition(conn, "login_attempt", far)
+            assert partitioning.default_rows(conn, "login_attempt") == 0
+            assert conn.execute(text(f'SELECT count(*) FROM "{partition_name("login_attempt", far)}"')).scalar() == 1
+
+            conn.execute(text("DELETE FROM users"))
+            assert conn.execute(text("SELECT count(*) FROM login_attempt WHERE user_id IS NULL")).scalar() == 4
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        engine.dispose()
@@ -0,0 +1,195 @@
+import os
+
+import pytest
+import pytest_asyncio
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from sqlalchemy import Integer, create_engine, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+from sqlalchemy.pool import StaticPool
+from starlette.requests import Request
+from starlette.responses import Response
+
+from tests.utils.queries import assert_max_queries
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+SCHEMA = "query_budget_test"
+
+
+# every budget runs in-process on sqlite; with TEST_DATABASE_URL also on Postgres
+ENGINES = [
+    "sqlite",
+    pytest.param("postgres", marks=pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL not set")),
+]
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class Row(_Base):
+    __tablename__ = "rows"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+
+# ---------------------------------------------------------
+# assert_max_queries itself (sqlite, no app)
+# ---------------------------------------------------------
+def test_budget_overrun_fails_with_the_statement_list():
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        with pytest.raises(AssertionError) as failure:
+            with assert_max_queries(2, engine):
+                for pk in (1, 2, 3):
+                    session.execute(select(Row).where(Row.id == pk)).all()
+
+    message = str(failure.value)
+    assert "Expected at most 2 queries, got 3" in message
+    assert "Possible N+1" in message
+
+
+def test_budget_within_limit_passes():
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        with assert_max_queries(1, engine) as recorder:
+            session.execute(select(Row)).all()
+
+    assert recorder.count == 1
+
+
+# ---------------------------------------------------------
+# IAM login / register / user list (sqlite, and Postgres when available)
+# ---------------------------------------------------------
+@pytest_asyncio.fixture(params=ENGINES)
+async def iam_engine(request):
+    from app.modules.iam.models.profile import Profile
+    from app.modules.iam.models.refresh_tokens import RefreshToken
+    from app.modules.iam.models.user import User
+
+    tables = [Profile.__table__, User.__table__, RefreshToken.__table__]
+    postgres = request.param == "postgres"
+    if postgres:
+        engine = create_async_engine(DATABASE_URL, connect_args={"server_settings": {"search_path": SCHEMA}})
+    else:
+        # one in-memory database shared by every session of the test
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+
+    async with engine.begin() as conn:
+        if postgres:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(lambda sync: Profile.metadata.create_all(sync, tables=tables))
+    try:
+        yield engine
+    finally:
+        if postgres:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+def _registration(name="alice"):
+    from app.modules.iam.schemas.user import UserCreate
+
+    return UserCreate.model_validate({
+        "username": name,
+        "password": "Str0ng!Passw0rd",
+        "confirm_password": "Str0ng!Passw0rd",
+        "profile": {
+            "first_name": "Alice",
+            "last_name": "Smith",
+            "email_address": f"{name}@example.com",
+            "phone_number": "0712345678",
+        },
+    })
+
+
+def _request():
+    return Request({"type": "http", "headers": [(b"user-agent", b"pytest")], "client": ("127.0.0.1", 1)})
+
+
+@pytest.mark.asyncio
+async def test_register_budget(iam_engine):
+    from app.modules.iam.services.user_service import UserService
+
+    async with AsyncSession(iam_engine, expire_on_commit=False) as db:
+        # uniqueness check + profile insert + user insert + refresh
+        with assert_max_queries(4, iam_engine):
+            await UserService().register_user(db, _registration())
+
+
+@pytest.mark.asyncio
+async def test_login_budget(iam_engine):
+    from app.modules.iam.controllers.http.auth_controller import controller
+    from app.modules.iam.services.user_service import UserService
+
+    async with AsyncSession(iam_engine, expire_on_commit=False) as db:
+        await UserService().register_user(db, _registration())
+
+    async with AsyncSession(iam_engine, expire_on_commit=False) as db:
+        # email lookup + refresh token read + refresh token insert
+        with assert_max_queries(3, iam_engine):
+            user, errors = await UserService.validate_credentials(db, "alice@example.com", "Str0ng!Passw0rd")
+            assert errors is None
+            await controller.generate_refresh_token(user, _request(), Response(), db)
+
+    async with AsyncSession(iam_engine, expire_on_commit=False) as db:
+        # token reuse is written behind: no insert, no update
+        with assert_max_queries(2, iam_engine):
+            user, errors = await UserService.validate_credentials(db, "alice@example.com", "Str0ng!Passw0rd")
+            await controller.generate_refresh_token(user, _request(), Response(), db)
+
+
+@pytest.mark.asyncio
+async def test_user_list_budget(iam_engine):
+    from app.modules.iam.models.searches.user_search import UserSearch
+    from app.modules.iam.services.user_service import UserService
+
+    for name in ("alice", "bob", "carol"):
+        async with AsyncSession(iam_engine, expire_on_commit=False) as db:
+            data = _registration(name)
+            data.profile.phone_number = f"07{abs(hash(name)) % 10**8:08d}"
+            await UserService().register_user(db, data)
+
+    FastAPICache.init(InMemoryBackend(), prefix="test")
+    async with AsyncSession(iam_engine) as db:
+        # count + page; must not grow with the number of users
+        with assert_max_queries(2, iam_engine):
+            page = await UserSearch().search(db)
+        # the grid's total is cached: the next page view skips the count
+        with assert_max_queries(1, iam_engine):
+            again = await UserSearch().search(db)
+
+    assert page["total"] == again["total"] == 3
+    assert again["total_kind"] == "cached"
+
+
+@pytest.mark.asyncio
+async def test_user_index_budget(iam_engine):
+    import json
+
+    from app.modules.iam.controllers.http.user_controller import controller
+    from app.modules.iam.models.searches.user_search import UserSearch
+    from app.modules.iam.services.user_service import UserService
+
+    for name in ("alice", "bob", "carol"):
+        async with AsyncSession(iam_engine, expire_on_commit=False) as db:
+            data = _registration(name)
+            data.profile.phone_number = f"07{abs(hash(name)) % 10**8:08d}"
+            await UserService().register_user(db, data)
+
+    async with AsyncSession(iam_engine) as db:
+        # count + page + the page's profiles in one IN (...)
+        with assert_max_queries(3, iam_engine):
+            response = await controller.index(q=UserSearch(), db=db)
+
+    items = json.loads(response.body)["data"]["items"]
+    assert sorted(item["profile"]["email_address"] for item in items) == [
+        "alice@example.com", "bob@example.com", "carol@example.com",
+    ]
@@ -0,0 +1,47 @@
+from sqlalchemy import Integer, create_engine, select, text, update
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+from app.common.db.sessions import _has_written
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class Counter(_Base):
+    __tablename__ = "counters"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    hits: Mapped[int] = mapped_column(Integer, default=0)
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    return Session(engine)
+
+
+def test_reads_leave_the_connection_releasable():
+    with _session() as session:
+        session.execute(select(Counter)).all()
+        assert not _has_written(session.connection())
+
+
+def test_core_write_on_the_session_connection_is_seen():
+    with _session() as session:
+        session.connection().execute(update(Counter).values(hits=Counter.hits + 1))
+        assert _has_written(session.connection())
+
+
+def test_raw_sql_counts_as_a_write():
+    with _session() as session:
+        session.connection().exec_driver_sql("UPDATE counters SET hits = 0")
+        assert _has_written(session.connection())
+
+
+def test_flag_is_reset_for_the_next_transaction():
+    with _session() as session:
+        session.execute(text("DELETE FROM counters"))
+        session.commit()
+
+        session.execute(select(Counter)).all()
+        assert not _has_written(session.connection())
@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy import Boolean, Integer, String
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.pool import StaticPool
+
+from app.common.base.base_repository import BaseRepository
+from app.common.db.mixins.soft_delete import has_global_criteria
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Note(Base):
+    # has the column but never opted in to the global criteria
+    __tablename__ = "notes"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    body: Mapped[str] = mapped_column(String)
+    is_deleted: Mapped[bool] = mapped_column(Boolean, default=False)
+
+
+class NoteRepository(BaseRepository):
+    model = Note
+
+
+@pytest.mark.asyncio
+async def test_list_active_filters_models_without_global_criteria():
+    assert not has_global_criteria(Note)
+
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        async with AsyncSession(engine) as db:
+            db.add_all([Note(id=1, body="live"), Note(id=2, body="gone", is_deleted=True)])
+            await db.commit()
+
+            repo = NoteRepository(db)
+            assert [note.id for note in await repo.list_active()] == [1]
+            assert sorted(note.id for note in await repo.list()) == [1, 2]
+    finally:
+        await engine.dispose()
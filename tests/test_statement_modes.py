@@ -0,0 +1,13 @@
+from app.common.db import sessions
+
+URL = "postgresql+asyncpg://u:p@localhost/db"
+
+
+def test_pgbouncer_mode_has_no_statement_cache_unless_set(monkeypatch):
+    monkeypatch.setattr(sessions.settings, "DB_PREPARED_STATEMENT_CACHE_SIZE", None)
+    assert sessions.engine_options(URL, "pgbouncer")["connect_args"]["prepared_statement_cache_size"] == 0
+    assert sessions.engine_options(URL, "direct")["connect_args"]["prepared_statement_cache_size"] == 100
+
+    # PgBouncer >= 1.21 with max_prepared_statements: opted in explicitly
+    monkeypatch.setattr(sessions.settings, "DB_PREPARED_STATEMENT_CACHE_SIZE", 50)
+    assert sessions.engine_options(URL, "pgbouncer")["connect_args"]["prepared_statement_cache_size"] == 50
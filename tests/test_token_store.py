@@ -0,0 +1,68 @@
+import os
+import uuid
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.modules.iam.models.profile import Profile
+from app.modules.iam.models.user import User
+from app.modules.iam.services.token_store import PURPOSES, EphemeralTokenStore, TokenRateLimited
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+SCHEMA = "token_store_test"
+
+
+def test_database_fallback_is_rate_limited():
+    # no cache initialized -> no Redis -> users column
+    store = EphemeralTokenStore()
+    user = User(user_id=uuid.uuid4())
+
+    store._issue_db(PURPOSES["password_reset"], user)
+    with pytest.raises(TokenRateLimited) as limited:
+        store._issue_db(PURPOSES["password_reset"], user)
+
+    assert limited.value.retry_after > 0
+
+
+@pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL not set (Postgres only)")
+@pytest.mark.asyncio
+async def test_database_fallback_is_single_use_and_burned_after_wrong_guesses():
+    engine = create_async_engine(DATABASE_URL, connect_args={"server_settings": {"search_path": SCHEMA}})
+    store = EphemeralTokenStore()
+    spec = PURPOSES["password_reset"]
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            await conn.run_sync(
+                lambda sync: Profile.metadata.create_all(sync, tables=[Profile.__table__, User.__table__])
+            )
+
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            profile = Profile(id=uuid.uuid4().hex, first_name="A", last_name="B",
+                              email_address="a@example.com", phone_number="0712345678")
+            user = User(username="alice", profile_id=profile.id, password_hash="x", status=10)
+            db.add_all([profile, user])
+            await db.commit()
+
+            token = await store.issue(db, "password_reset", user)
+            await db.commit()
+            assert await store.consume(db, "password_reset", token) == user.user_id
+            assert await store.consume(db, "password_reset", token) is None
+            await db.commit()
+
+            # a fresh link, guessed at: burned after max_attempts, even for the right secret
+            user.password_reset_token = None
+            token = await store.issue(db, "password_reset", user)
+            await db.commit()
+            user_id, secret, expires = token.split(".")
+            for _ in range(spec.max_attempts):
+                assert await store.consume(db, "password_reset", f"{user_id}.wrong.{expires}") is None
+                await db.commit()
+            assert await store.consume(db, "password_reset", token) is None
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
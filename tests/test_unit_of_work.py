@@ -0,0 +1,142 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy.exc import OperationalError
+
+from app.common.db.unit_of_work import UnitOfWork, after_commit
+from app.common.exceptions import TransactionRetriesExhausted
+
+
+class FakeSession:
+    def __init__(self):
+        self.info = {}
+        self.commits = 0
+        self.rollbacks = 0
+
+    def in_transaction(self):
+        return False
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+class PgError(Exception):
+    def __init__(self, pgcode):
+        self.pgcode = pgcode
+
+
+def deadlock():
+    return OperationalError("UPDATE ...", {}, PgError("40P01"))
+
+
+@pytest.mark.asyncio
+async def test_retries_deadlock_and_runs_hooks_once():
+    session = FakeSession()
+    uow = UnitOfWork(session, backoff=0)
+    attempts, fired = [], []
+
+    async def logic():
+        attempts.append(1)
+        uow.after_commit(fired.append, len(attempts))
+        if len(attempts) < 3:
+            raise deadlock()
+        return "ok"
+
+    assert await uow.run(logic) == "ok"
+    assert len(attempts) == 3
+    assert session.rollbacks == 2 and session.commits == 1
+    # hooks queued by failed attempts are discarded
+    assert fired == [3]
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_retries():
+    session = FakeSession()
+
+    async def logic():
+        raise deadlock()
+
+    with pytest.raises(TransactionRetriesExhausted) as exc:
+        await UnitOfWork(session, retries=2, backoff=0).run(logic)
+    assert exc.value.retry_after == 1
+    assert session.rollbacks == 3
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_errors_propagate_without_hooks():
+    session = FakeSession()
+    fired = []
+
+    async def logic():
+        after_commit(session, fired.append, "x")
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await UnitOfWork(session).run(logic)
+    assert fired == []
+    assert "unit_of_work" not in session.info
+
+
+# ---------------------------------------------------------
+# Settings save (SettingService.update_settings runs in a UnitOfWork)
+# ---------------------------------------------------------
+@pytest_asyncio.fixture
+async def settings_client():
+    from fastapi import FastAPI
+    from httpx import ASGITransport, AsyncClient
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.pool import StaticPool
+
+    from app.common.db.sessions import get_db
+    from app.modules.main.controllers.setting_controller import router
+    from app.modules.main.models.system_setting import SystemSetting
+
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync: SystemSetting.metadata.create_all(sync, tables=[SystemSetting.__table__]))
+
+    async def db():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_db] = db
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_settings_save_reaches_config_after_commit(settings_client, monkeypatch):
+    from config.config import config
+
+    saved = {}
+    monkeypatch.setattr(config, "set_manual", lambda key, value: saved.update({key: value}))
+
+    etag = (await settings_client.get("/general")).headers["ETag"]
+    response = await settings_client.post("/general", json={"company_name": "Acme"}, headers={"If-Match": etag})
+
+    assert response.status_code == 200
+    assert saved == {"company_name": "Acme"}
+    assert (await settings_client.get("/general")).json()["dataPayload"]["data"]["company_name"] == "Acme"
+
+
+@pytest.mark.asyncio
+async def test_settings_save_answers_503_once_retries_run_out(settings_client, monkeypatch):
+    from app.modules.main.repositories.settings_repository import SettingsRepository
+
+    async def get_by_keys(self, keys):
+        raise deadlock()
+
+    monkeypatch.setattr(SettingsRepository, "get_by_keys", get_by_keys)
+
+    etag = (await settings_client.get("/general")).headers["ETag"]
+    response = await settings_client.post("/general", json={"company_name": "Acme"}, headers={"If-Match": etag})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
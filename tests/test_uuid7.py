@@ -0,0 +1,27 @@
+import time
+
+from app.common.db.mixins.uuid_mixin import uuid7, uuid7_hex
+
+
+def test_uuid7_version_and_variant():
+    value = uuid7()
+    assert value.version == 7
+    assert value.variant == "specified in RFC 4122"
+
+
+def test_uuid7_is_monotonic_and_unique():
+    values = [uuid7() for _ in range(10_000)]
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+
+
+def test_uuid7_embeds_millisecond_timestamp():
+    before = time.time_ns() // 1_000_000
+    value = uuid7()
+    after = time.time_ns() // 1_000_000
+    # the counter may borrow a millisecond under heavy load
+    assert before <= value.int >> 80 <= after + 1
+
+
+def test_uuid7_hex_fits_profile_id():
+    assert len(uuid7_hex()) == 32
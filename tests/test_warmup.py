@@ -0,0 +1,74 @@
+import asyncio
+
+from app.common.db import warmup as warmup_module
+from app.common.db.warmup import Warmup, register_primer
+
+
+class FakeConnection:
+    closed = False
+
+    async def start(self):
+        return self
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeEngine:
+    def __init__(self):
+        self.connections = []
+
+    def connect(self):
+        conn = FakeConnection()
+        self.connections.append(conn)
+        return conn
+
+
+class FakeSession:
+    def __init__(self, executed, bind=None):
+        self.executed = executed
+        self.bind = bind
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt):
+        if stmt == "broken":
+            raise RuntimeError("boom")
+        self.executed.append((self.bind, stmt))
+
+    async def rollback(self):
+        pass
+
+
+def test_warm_up_uses_every_pool_connection(monkeypatch):
+    monkeypatch.setattr(warmup_module.settings, "DB_POOL_SIZE", 3)
+    monkeypatch.setattr(warmup_module, "_hot_queries", {"ok": lambda: "SELECT ok", "bad": lambda: "broken"})
+    monkeypatch.setattr(warmup_module, "_primers", {})
+    primed = []
+
+    @register_primer("settings")
+    async def prime(session):
+        primed.append(session)
+
+    executed = []
+    engine = FakeEngine()
+    state = Warmup()
+    asyncio.run(state.warm_up(engine, lambda bind=None: FakeSession(executed, bind)))
+
+    assert len(engine.connections) == 3
+    assert all(c.closed for c in engine.connections)
+    assert {bind for bind, _ in executed} == set(engine.connections)
+    assert len(primed) == 1
+    assert list(state.errors) == ["hot query bad"]
+
+
+def test_disabled_warm_up_is_ready_at_once(monkeypatch):
+    monkeypatch.setattr(warmup_module.settings, "DB_WARMUP_ENABLED", False)
+    state = Warmup()
+    asyncio.run(state.start(FakeEngine(), None))
+
+    assert state.ready
@@ -0,0 +1,142 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table
+from sqlalchemy.dialects import postgresql
+
+from app.common.db import write_behind as write_behind_module
+from app.common.db.write_behind import WriteBehindBuffer, _update_from_values
+
+tokens = Table(
+    "refresh_tokens", MetaData(),
+    Column("token_id", Integer, primary_key=True),
+    Column("last_used_at", Integer),
+)
+
+
+def test_touches_coalesce_per_key():
+    buffer = WriteBehindBuffer()
+    buffer.touch(object, 1, last_used_at=10)
+    buffer.touch(object, 1, last_used_at=20)
+    buffer.touch(object, 2, last_used_at=30)
+
+    assert buffer.pending == 2
+    assert buffer._pending[object] == {1: {"last_used_at": 20}, 2: {"last_used_at": 30}}
+
+
+def test_update_from_values_is_one_statement():
+    sql, params = _update_from_values(
+        postgresql.dialect(), tokens, tokens.c.token_id, ("last_used_at",),
+        [(1, {"last_used_at": 10}), (2, {"last_used_at": 20})],
+    )
+
+    assert sql.startswith('UPDATE "refresh_tokens" AS t SET "last_used_at" = v."last_used_at" FROM (VALUES ')
+    assert sql.count("CAST(") == 4
+    assert sql.endswith('WHERE t."token_id" = v."token_id"')
+    assert params == {"token_id_0": 1, "last_used_at_0": 10, "token_id_1": 2, "last_used_at_1": 20}
+
+
+class _Connection:
+    dialect = postgresql.dialect()
+
+    def __init__(self, log):
+        self.log = log
+
+    async def execute(self, statement, params):
+        self.log.append(("execute", str(statement)))
+
+
+class _Engine:
+    def __init__(self, log):
+        self.log = log
+
+    @asynccontextmanager
+    async def begin(self):
+        yield _Connection(self.log)
+        self.log.append(("commit",))
+
+
+@pytest.mark.asyncio
+async def test_flush_invalidates_cached_rows_after_commit(monkeypatch):
+    log = []
+
+    async def invalidate(model, *pks):
+        log.append(("invalidate", model, sorted(pks)))
+
+    monkeypatch.setattr(write_behind_module.model_cache, "invalidate", invalidate)
+
+    class Token:
+        __table__ = tokens
+        __tablename__ = "refresh_tokens"
+        __mapper__ = type("Mapper", (), {"primary_key": [tokens.c.token_id]})
+
+    buffer = WriteBehindBuffer()
+    buffer._engine, buffer._lock = _Engine(log), asyncio.Lock()
+    buffer.touch(Token, 1, last_used_at=10)
+    buffer.touch(Token, 2, last_used_at=20)
+    await buffer.flush()
+
+    assert [entry[0] for entry in log] == ["execute", "commit", "invalidate"]
+    assert log[-1] == ("invalidate", Token, [1, 2])
+
+
+class _Token:
+    __table__ = tokens
+    __tablename__ = "refresh_tokens"
+    __mapper__ = type("Mapper", (), {"primary_key": [tokens.c.token_id]})
+
+
+class _SlowConnection(_Connection):
+    async def execute(self, statement, params):
+        self.log.append(("executing",))
+        await asyncio.sleep(0.05)
+        self.log.append(("execute", str(statement)))
+
+
+class _SlowEngine(_Engine):
+    @asynccontextmanager
+    async def begin(self):
+        yield _SlowConnection(self.log)
+        self.log.append(("commit",))
+
+
+@pytest.mark.asyncio
+async def test_cancelled_flush_requeues_its_rows(monkeypatch):
+    async def invalidate(model, *pks):
+        pass
+
+    monkeypatch.setattr(write_behind_module.model_cache, "invalidate", invalidate)
+    log = []
+    buffer = WriteBehindBuffer()
+    buffer._engine, buffer._lock = _SlowEngine(log), asyncio.Lock()
+    buffer.touch(_Token, 1, last_used_at=10)
+
+    flush = asyncio.create_task(buffer.flush())
+    while not log:
+        await asyncio.sleep(0)
+    flush.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await flush
+
+    assert buffer.pending == 1
+    assert buffer._pending[_Token] == {1: {"last_used_at": 10}}
+
+
+@pytest.mark.asyncio
+async def test_stop_lets_a_running_flush_commit(monkeypatch):
+    async def invalidate(model, *pks):
+        log.append(("invalidate",))
+
+    monkeypatch.setattr(write_behind_module.model_cache, "invalidate", invalidate)
+    monkeypatch.setattr(write_behind_module.settings, "WRITE_BEHIND_MAX_PENDING", 1)
+    log = []
+    buffer = WriteBehindBuffer()
+    await buffer.start(_SlowEngine(log))
+    buffer.touch(_Token, 1, last_used_at=10)
+    while not log:
+        await asyncio.sleep(0)
+    await buffer.stop()
+
+    assert [entry[0] for entry in log] == ["executing", "execute", "commit", "invalidate"]
+    assert buffer.pending == 0
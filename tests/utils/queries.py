@@ -0,0 +1,29 @@
+from contextlib import contextmanager
+
+from app.common.db.instrumentation import normalize_sql, record_queries
+
+# a statement repeated this many times inside one budget is reported as N+1
+N_PLUS_ONE_THRESHOLD = 3
+
+
+def format_queries(recorder) -> str:
+    lines = [f"{i:>3}. {normalize_sql(sql)[:300]}" for i, sql in enumerate(recorder.statements, 1)]
+    repeated = recorder.repeated(N_PLUS_ONE_THRESHOLD)
+    if repeated:
+        lines.append("Possible N+1 (same statement repeated):")
+        lines += [f"  x{times}  {sql[:300]}" for sql, times in repeated]
+    return "\n".join(lines)
+
+
+@contextmanager
+def assert_max_queries(limit: int, engine=None):
+    """
+    with assert_max_queries(3):
+        client.get("/users/")
+    """
+    with record_queries(engine) as recorder:
+        yield recorder
+
+    assert recorder.count <= limit, (
+        f"Expected at most {limit} queries, got {recorder.count}:\n{format_queries(recorder)}"
+    )